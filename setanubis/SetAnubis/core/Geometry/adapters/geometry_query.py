@@ -3,8 +3,18 @@ from dataclasses import dataclass, field
 from typing import Iterable, Optional, List, Tuple
 import numpy as np
 from ..domain.interfaces import IGeometry
-from ..domain.types import Vec3, IntersectionsResult
+from ..domain.types import Vec3, IntersectionsResult, BatchIntersectionsResult
 from SetAnubis.core.Geometry.domain.defineGeometry import ATLASCavern
+from SetAnubis.core.Geometry.domain import intervals as ray_intervals
+
+
+def _rays_xyz(xyz, name: str, n_rays: int) -> np.ndarray:
+    """(x, y, z) arrays of n_rays points -> (n_rays, 3) array."""
+    arr = np.asarray(xyz, dtype=float)
+    if arr.shape[:1] != (3,):
+        raise ValueError(f"{name} must be (x, y, z) arrays of shape (3, n), got {arr.shape}")
+    return np.broadcast_to(arr.reshape(3, -1), (3, n_rays)).T
+
 
 @dataclass
 class CavernQuery(IGeometry):
@@ -37,7 +47,52 @@ class CavernQuery(IGeometry):
                  tracking_only: bool = False) -> bool:
         return bool(self.cavern.inATLAS(x, y, z, trackingOnly=bool(tracking_only)))
 
+    def in_cavern_batch(self, x: np.ndarray, y: np.ndarray, z: np.ndarray,
+                        max_radius: Optional[float] = None) -> np.ndarray:
+        mr = "" if (max_radius is None or np.isinf(max_radius)) else float(max_radius)
+        return self.cavern.inCavernBatch(x, y, z, maxRadius=mr)
+
+    def in_shaft_batch(self, x: np.ndarray, y: np.ndarray, z: np.ndarray,
+                       shafts: Iterable[str] = ("PX14",),
+                       include_cavern_cone: bool = True) -> np.ndarray:
+        return self.cavern.inShaftBatch(x, y, z, shafts=list(shafts), includeCavernCone=include_cavern_cone)
+
+    def in_atlas_batch(self, x: np.ndarray, y: np.ndarray, z: np.ndarray,
+                       tracking_only: bool = False) -> np.ndarray:
+        return self.cavern.inATLASBatch(x, y, z, trackingOnly=bool(tracking_only))
     
+    def cavern_ray_intervals(self, origin: np.ndarray, direction: np.ndarray,
+                             max_radius: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        mr = "" if (max_radius is None or np.isinf(max_radius)) else float(max_radius)
+        return self.cavern.cavernRayIntervals(origin, direction, maxRadius=mr)
+
+    def shaft_ray_intervals(self, origin: np.ndarray, direction: np.ndarray,
+                            shafts: Iterable[str] = ("PX14",),
+                            include_cavern_cone: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        return self.cavern.shaftRayIntervals(origin, direction, shafts=list(shafts), includeCavernCone=include_cavern_cone)
+
+    def atlas_ray_intervals(self, origin: np.ndarray, direction: np.ndarray,
+                            tracking_only: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        return self.cavern.ATLASRayIntervals(origin, direction, trackingOnly=bool(tracking_only))
+
+    def station_hits_ray_intervals(self, origin: np.ndarray, direction: np.ndarray,
+                                   n_hits: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        t where a decay point at origin + t*direction, moving along the ray, gets at least n_hits station hits
+        (nRPCsPerLayer per station layer crossed, the RPC efficiency is not applied).
+        Only the simple ceiling and shaft station layouts are supported.
+        """
+        self._ensure_rpc_catalog()
+        d = self._anubis_dict or {}
+
+        if isinstance(d, dict) and {"r", "theta", "phi"} <= set(d.keys()):
+            stations = self.cavern.intersectANUBISstationsSimpleRayIntervals(origin, direction, d)
+        elif isinstance(d, dict) and {"x", "y", "z", "RPCradius"} <= set(d.keys()):
+            stations = self.cavern.intersectANUBISstationsShaftRayIntervals(origin, direction, d)
+        else:
+            raise NotImplementedError("Station ray intervals need the simple or shaft station layout.")
+        return ray_intervals.at_least(stations, n_hits, [self.cavern.nRPCsPerLayer] * len(stations))
+
     def coordsToOrigin(self, x, y, z, origin=[]):
         return self.cavern.coordsToOrigin(x,y,z,origin)
     
@@ -111,3 +166,54 @@ class CavernQuery(IGeometry):
             return IntersectionsResult(points=[tuple(p) for p in points], station_indices=stations)
 
         return IntersectionsResult(points=[], station_indices=[])
+
+    def intersect_stations_simple_batch(self, theta: np.ndarray, phi: np.ndarray,
+                                        positions: np.ndarray,
+                                        extrema_positions: Optional[np.ndarray] = None,
+                                        return_points: bool = False) -> BatchIntersectionsResult:
+        """
+        Batched intersect_stations_simple. positions/extrema_positions are (x, y, z) arrays (shape (3, n)).
+        The simple ceiling stations are solved in one pass, other station layouts loop on the scalar version.
+        """
+        self._ensure_rpc_catalog()
+        d = self._anubis_dict or {}
+
+        if isinstance(d, dict) and {"r", "theta", "phi"} <= set(d.keys()):
+            n, mask, rays, stations, points = self.cavern.intersectANUBISstationsSimpleBatch(
+                theta, phi, d, positions, extremaPositions=extrema_positions, returnPoints=return_points
+            )
+            return BatchIntersectionsResult(n_hits=n, station_mask=mask, ray_index=rays,
+                                            station_index=stations, points=points)
+
+        return self._intersect_stations_loop(theta, phi, positions, extrema_positions, return_points)
+
+    def _intersect_stations_loop(self, theta, phi, positions, extrema_positions, return_points) -> BatchIntersectionsResult:
+        theta = np.atleast_1d(np.asarray(theta, dtype=float))
+        phi = np.atleast_1d(np.asarray(phi, dtype=float))
+        pos = _rays_xyz(positions, "positions", theta.size)
+        ext = None if extrema_positions is None else _rays_xyz(extrema_positions, "extrema_positions", theta.size)
+
+        n_hits = np.zeros(theta.size, dtype=np.int64)
+        station_mask = np.zeros(theta.size, dtype=np.int64)
+        rays: List[int] = []
+        station_idx: List[int] = []
+        points: List[tuple] = []
+        for k in range(theta.size):
+            extrema = None if (ext is None or not np.isfinite(ext[k]).all()) else tuple(ext[k])
+            res = self.intersect_stations_simple(float(theta[k]), float(phi[k]), tuple(pos[k]), extrema)
+            n_hits[k] = len(res.points)
+            for s in res.station_indices:
+                station_mask[k] |= np.int64(1) << int(s)
+            if return_points:
+                sts = list(res.station_indices) or [0] * len(res.points)
+                for p, s in zip(res.points, sts):
+                    rays.append(k); station_idx.append(int(s)); points.append(tuple(p))
+
+        if not return_points:
+            return BatchIntersectionsResult(n_hits=n_hits, station_mask=station_mask)
+        return BatchIntersectionsResult(
+            n_hits=n_hits, station_mask=station_mask,
+            ray_index=np.asarray(rays, dtype=np.int64),
+            station_index=np.asarray(station_idx, dtype=np.int64),
+            points=np.asarray(points, dtype=float).reshape(-1, 3),
+        )
@@ -4,8 +4,8 @@ import numpy as np
 import pandas as pd
 
 from ..domain.interfaces import IGeometry
-from ..domain.utils import eta_to_theta, extract_xyz
-from ..domain.types import IntersectionsResult
+from ..domain.utils import eta_to_theta, extract_xyz, extract_xyz_arrays
+from ..domain.types import IntersectionsResult, BatchIntersectionsResult
 
 def _mm_to_m_tuple(pos):
     x, y, z = pos
@@ -36,6 +36,34 @@ class GeometrySelectionAdapter:
                   max_radius: Optional[float] = None) -> bool:
         return self.geometry.in_atlas(x,y,z,max_radius)
     
+    def inCavernBatch(self, x: np.ndarray, y: np.ndarray, z: np.ndarray,
+                      max_radius: Optional[float] = None) -> np.ndarray:
+        return self.geometry.in_cavern_batch(x, y, z, max_radius)
+
+    def inShaftBatch(self, x: np.ndarray, y: np.ndarray, z: np.ndarray,
+                     shafts=("PX14",), include_cavern_cone: bool = True) -> np.ndarray:
+        return self.geometry.in_shaft_batch(x, y, z, shafts, include_cavern_cone)
+
+    def inATLASBatch(self, x: np.ndarray, y: np.ndarray, z: np.ndarray,
+                     tracking_only: bool = False) -> np.ndarray:
+        return self.geometry.in_atlas_batch(x, y, z, tracking_only)
+
+    def cavernRayIntervals(self, origin: np.ndarray, direction: np.ndarray,
+                           max_radius: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        return self.geometry.cavern_ray_intervals(origin, direction, max_radius)
+
+    def shaftRayIntervals(self, origin: np.ndarray, direction: np.ndarray,
+                          shafts=("PX14",), include_cavern_cone: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        return self.geometry.shaft_ray_intervals(origin, direction, shafts, include_cavern_cone)
+
+    def ATLASRayIntervals(self, origin: np.ndarray, direction: np.ndarray,
+                          tracking_only: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        return self.geometry.atlas_ray_intervals(origin, direction, tracking_only)
+
+    def stationHitsRayIntervals(self, origin: np.ndarray, direction: np.ndarray,
+                                n_hits: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self.geometry.station_hits_ray_intervals(origin, direction, n_hits)
+
     def coordsToOrigin(self, x, y, z, origin=[]):
         return self.geometry.coordsToOrigin(x,y,z,origin)
     
@@ -119,4 +147,47 @@ class GeometrySelectionAdapter:
         except Exception:
             stations = [int(s) for s in stations if isinstance(s, (int, np.integer))]
 
-        return (points, stations)
\ No newline at end of file
+        return (points, stations)
+
+    def checkIntersectionsWithANUBISBatch(
+        self,
+        df: pd.DataFrame,
+        decay_vertex_col: str,
+        min_p_llp: float,
+        return_points: bool = False,
+    ) -> BatchIntersectionsResult:
+        """
+        checkIntersectionsWithANUBIS for every row of df in one call.
+        Rays below min_p_llp get no hits. The result is aligned with the rows of df.
+        """
+        n = len(df.index)
+        if "p" in df.columns:
+            p = pd.to_numeric(df["p"], errors="coerce").to_numpy(dtype=float)
+        elif all(k in df.columns for k in ("px", "py", "pz")):
+            p = np.sqrt(df["px"].to_numpy(dtype=float)**2 + df["py"].to_numpy(dtype=float)**2 + df["pz"].to_numpy(dtype=float)**2)
+        else:
+            p = np.full(n, np.nan)
+        eligible = ~(p < float(min_p_llp))
+
+        theta = 2.0 * np.arctan(np.exp(-df["eta"].to_numpy(dtype=float)))
+        phi = df["phi"].to_numpy(dtype=float)
+
+        x_mm, y_mm, z_mm = extract_xyz_arrays(df[decay_vertex_col].tolist())
+        X, Y, Z = _coords_to_origin_if_possible(self.geometry, x_mm * 1e-3, y_mm * 1e-3, z_mm * 1e-3)
+
+        rows = np.flatnonzero(eligible)
+        res = self.geometry.intersect_stations_simple_batch(
+            theta[rows], phi[rows], (np.asarray(X)[rows], np.asarray(Y)[rows], np.asarray(Z)[rows]),
+            None, return_points,
+        )
+
+        n_hits = np.zeros(n, dtype=np.int64)
+        station_mask = np.zeros(n, dtype=np.int64)
+        n_hits[rows] = res.n_hits
+        station_mask[rows] = res.station_mask
+        if not return_points:
+            return BatchIntersectionsResult(n_hits=n_hits, station_mask=station_mask)
+        return BatchIntersectionsResult(
+            n_hits=n_hits, station_mask=station_mask,
+            ray_index=rows[res.ray_index], station_index=res.station_index, points=res.points,
+        )
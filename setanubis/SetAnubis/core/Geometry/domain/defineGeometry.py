@@ -8,6 +8,7 @@ plt.ion()
 from sympy import Point3D, Line3D, Plane
 import json
 import pickle
+from SetAnubis.core.Geometry.domain import intervals as rayIntervals
 
 #=========================================================#
 # NOTE: The ATLAS Coordinate system is assumed throughout #
@@ -230,6 +231,37 @@ class ATLASCavern():
         else:
             return False
 
+    # Cone below a shaft opening, with the IP as its tip: returns (coneTip, unit axis, base radius, height)
+    def _shaftCone(self, shaft):
+        coneTip = np.array([self.IP["x"], self.IP["y"], self.IP["z"]]) # Take the IP as the cone's tip
+
+        xSign = np.sign(self.shaftParams[shaft]["Centre"]["x"])
+        if xSign==0:
+            xSign=1
+        zSign = np.sign(self.shaftParams[shaft]["Centre"]["z"])
+        if zSign==0:
+            zSign=1
+        x1 = self.shaftParams[shaft]["Centre"]["x"] - xSign*(self.shaftParams[shaft]["radius"])# + self.IP["x"])
+        x2 = self.shaftParams[shaft]["Centre"]["x"] + xSign*(self.shaftParams[shaft]["radius"])# - self.IP["x"])
+        z1 = self.shaftParams[shaft]["Centre"]["z"] - zSign*(self.shaftParams[shaft]["radius"])# + self.IP["z"])
+        z2 = self.shaftParams[shaft]["Centre"]["z"] + zSign*(self.shaftParams[shaft]["radius"])# - self.IP["z"])
+        l1 = np.sqrt( np.power(z1,2) + np.power(self.shaftParams[shaft]["Centre"]["y"],2)) 
+        l2 = np.sqrt( np.power(z2,2) + np.power(self.shaftParams[shaft]["Centre"]["y"],2)) 
+        coneOpeningAngle = np.arccos(np.clip(z1/l1,-1.0,1.0)) - np.arccos(np.clip(z2/l2,-1.0,1.0))
+
+        coneBaseR = l2*np.sin(coneOpeningAngle/2) # The base Radius of the cone
+        coneHeight = l2*np.cos(coneOpeningAngle/2) # The total height of the cone from base to tip
+
+        baseCentre = np.array([ coneHeight*np.cos(coneOpeningAngle/2 + np.arccos(np.clip(x2/l2,-1.0,1.0))),
+                                coneHeight*np.sin(coneOpeningAngle/2 + np.arccos(np.clip(z2/l2,-1.0,1.0))),
+                                coneHeight*np.cos(coneOpeningAngle/2 + np.arccos(np.clip(z2/l2,-1.0,1.0)))])
+
+        #direction vector of the cone
+        divV=baseCentre - coneTip
+        divV/=np.linalg.norm(divV)
+
+        return coneTip, divV, coneBaseR, coneHeight
+
     def inShaft(self, x, y, z, shafts=["PX14"], includeCavernCone=True):
         #Assume x, y, z provided relative to the Cavern Centre
         inShaft=[]
@@ -239,34 +271,9 @@ class ATLASCavern():
                                np.power(z - self.shaftParams[shaft]["Centre"]["z"],2)) < self.shaftParams[shaft]["radius"]
             
             if includeCavernCone and (y < self.shaftParams[shaft]["Centre"]["y"]):
-                coneTip = np.array([self.IP["x"], self.IP["y"], self.IP["z"]]) # Take the IP as the cone's tip
+                coneTip, divV, coneBaseR, coneHeight = self._shaftCone(shaft)
                 point = np.array([x,y,z])
                 
-                xSign = np.sign(self.shaftParams[shaft]["Centre"]["x"])
-                if xSign==0:
-                    xSign=1
-                zSign = np.sign(self.shaftParams[shaft]["Centre"]["z"])
-                if zSign==0:
-                    zSign=1
-                x1 = self.shaftParams[shaft]["Centre"]["x"] - xSign*(self.shaftParams[shaft]["radius"])# + self.IP["x"])
-                x2 = self.shaftParams[shaft]["Centre"]["x"] + xSign*(self.shaftParams[shaft]["radius"])# - self.IP["x"])
-                z1 = self.shaftParams[shaft]["Centre"]["z"] - zSign*(self.shaftParams[shaft]["radius"])# + self.IP["z"])
-                z2 = self.shaftParams[shaft]["Centre"]["z"] + zSign*(self.shaftParams[shaft]["radius"])# - self.IP["z"])
-                l1 = np.sqrt( np.power(z1,2) + np.power(self.shaftParams[shaft]["Centre"]["y"],2)) 
-                l2 = np.sqrt( np.power(z2,2) + np.power(self.shaftParams[shaft]["Centre"]["y"],2)) 
-                coneOpeningAngle = np.arccos(np.clip(z1/l1,-1.0,1.0)) - np.arccos(np.clip(z2/l2,-1.0,1.0))
-
-                coneBaseR = l2*np.sin(coneOpeningAngle/2) # The base Radius of the cone
-                coneHeight = l2*np.cos(coneOpeningAngle/2) # The total height of the cone from base to tip
-
-                baseCentre = np.array([ coneHeight*np.cos(coneOpeningAngle/2 + np.arccos(np.clip(x2/l2,-1.0,1.0))),
-                                        coneHeight*np.sin(coneOpeningAngle/2 + np.arccos(np.clip(z2/l2,-1.0,1.0))),
-                                        coneHeight*np.cos(coneOpeningAngle/2 + np.arccos(np.clip(z2/l2,-1.0,1.0)))])
-
-                #direction vector of the cone
-                divV=baseCentre - coneTip
-                divV/=np.linalg.norm(divV)
-                
                 pointH = np.dot(divV, point - coneTip) # Project point along the cone axis -- gives height from tip.
 
                 pointMaxR = (coneBaseR / coneHeight) * pointH # Using similar triangles get the radius of the circular section for pointH
@@ -306,6 +313,134 @@ class ATLASCavern():
         else:
             return False
 
+    #============================================================#
+    # Array versions of inCavern, inShaft and inATLAS            #
+    #============================================================#
+    # x, y, z are NumPy arrays (relative to the Cavern Centre), the return is a boolean mask of the same length.
+    # The conditions are the same as the scalar functions above, evaluated element-wise.
+    def inCavernBatch(self, x, y, z, maxRadius="", radiusOrigin=[]):
+        x, y, z = np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(z, dtype=float)
+        if len(radiusOrigin)==0:
+            radiusOrigin = (self.centreOfCurvature["x"], self.centreOfCurvature["y"], 0)
+
+        with np.errstate(invalid="ignore"):
+            if maxRadius=="" or maxRadius is None:
+                radialAcceptance = np.ones(x.shape, dtype=bool)
+            else:
+                radialAcceptance = np.sqrt(np.power(x - radiusOrigin[0],2) + np.power(y - radiusOrigin[1],2)) < maxRadius
+
+            return ((x > self.CavernX[0]) & (x < self.CavernX[1]) &
+                    (y > self.CavernY[0]) & (y < self.obtainCavernYFromX(x)) &
+                    (z > self.CavernZ[0]) & (z < self.CavernZ[1]) &
+                    radialAcceptance)
+
+    def inShaftBatch(self, x, y, z, shafts=["PX14"], includeCavernCone=True):
+        x, y, z = np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(z, dtype=float)
+        if len(shafts)==0:
+            return np.zeros(x.shape, dtype=bool)
+
+        # As in inShaft, only the first shaft of the list is evaluated.
+        shaft = list(shafts)[0]
+        centre = self.shaftParams[shaft]["Centre"]
+
+        with np.errstate(invalid="ignore"):
+            withinY = (y < centre["y"] + self.shaftParams[shaft]["height"]) | (y > centre["y"])
+            withinXZ = np.sqrt(np.power(x - centre["x"],2) + np.power(z - centre["z"],2)) < self.shaftParams[shaft]["radius"]
+            inCylinder = withinY & withinXZ
+
+            if not includeCavernCone:
+                return inCylinder
+
+            coneTip, divV, coneBaseR, coneHeight = self._shaftCone(shaft)
+            dx, dy, dz = x - coneTip[0], y - coneTip[1], z - coneTip[2]
+
+            pointH = divV[0]*dx + divV[1]*dy + divV[2]*dz
+            pointMaxR = (coneBaseR / coneHeight) * pointH
+            pointR = np.sqrt( (dx*dx + dy*dy + dz*dz) - np.power(pointH,2))
+
+            belowShaft = y < centre["y"]
+            withinCone = (pointR < pointMaxR) & belowShaft
+
+        return np.where(belowShaft, withinCone, inCylinder)
+
+    def inATLASBatch(self, x, y, z, trackingOnly=False):
+        x, y, z = np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(z, dtype=float)
+        rTarget = self.radiusATLAStracking if trackingOnly else self.radiusATLAS
+
+        with np.errstate(invalid="ignore"):
+            r = np.sqrt(np.power(x - self.IP["x"],2) + np.power(y - self.IP["y"],2))
+            return (r < rTarget) & (z > self.ATLAS_Z[0]) & (z < self.ATLAS_Z[1])
+
+    #============================================================#
+    # Ray versions of inCavern, inShaft and inATLAS              #
+    #============================================================#
+    # Points origin + t*direction, with origin and direction (x, y, z) arrays of shape (3, nRays) relative to the Cavern Centre.
+    # The return is the set of t where the check of the array version holds, as padded (lo, hi) arrays (see intervals.py).
+    # The ends are solved from the boundaries of each volume (planes, cylinders, cone) instead of testing points along the ray.
+    @staticmethod
+    def _rayArrays(origin, direction):
+        origin, direction = np.asarray(origin, dtype=float), np.asarray(direction, dtype=float)
+        if origin.shape[:1] != (3,) or direction.shape[:1] != (3,):
+            raise ValueError(f"origin and direction must be (x, y, z) arrays of shape (3, nRays), got {origin.shape} and {direction.shape}")
+        o, d = np.broadcast_arrays(origin.reshape(3, -1), direction.reshape(3, -1))
+        return o, d
+
+    def cavernRayIntervals(self, origin, direction, maxRadius="", radiusOrigin=[]):
+        (ox, oy, oz), (dx, dy, dz) = self._rayArrays(origin, direction)
+        if len(radiusOrigin)==0:
+            radiusOrigin = (self.centreOfCurvature["x"], self.centreOfCurvature["y"], 0)
+        a, b = self.centreOfCurvature["x"], self.centreOfCurvature["y"]
+
+        # Below the ceiling arch, y < b + sqrt(R^2 - (x-a)^2): below the centre of curvature or inside the arch circle
+        underArch = rayIntervals.intersect(
+            rayIntervals.quadratic_below(dx*dx, 2*dx*(ox - a), np.power(ox - a,2) - self.archRadius**2),
+            rayIntervals.union(rayIntervals.linear_below(oy, dy, b),
+                               rayIntervals.inside_circle(ox, dx, oy, dy, a, b, self.archRadius)))
+        parts = [rayIntervals.linear_below(-ox, -dx, -self.CavernX[0]), rayIntervals.linear_below(ox, dx, self.CavernX[1]),
+                 rayIntervals.linear_below(-oy, -dy, -self.CavernY[0]), underArch,
+                 rayIntervals.linear_below(-oz, -dz, -self.CavernZ[0]), rayIntervals.linear_below(oz, dz, self.CavernZ[1])]
+        if not (maxRadius=="" or maxRadius is None):
+            parts.append(rayIntervals.inside_circle(ox, dx, oy, dy, radiusOrigin[0], radiusOrigin[1], maxRadius))
+        return rayIntervals.intersect(*parts)
+
+    def shaftRayIntervals(self, origin, direction, shafts=["PX14"], includeCavernCone=True):
+        (ox, oy, oz), (dx, dy, dz) = self._rayArrays(origin, direction)
+        if len(shafts)==0:
+            return rayIntervals.interval(np.full(ox.shape, np.inf), np.full(ox.shape, np.inf))
+
+        # As in inShaftBatch, only the first shaft of the list is evaluated.
+        shaft = list(shafts)[0]
+        centre = self.shaftParams[shaft]["Centre"]
+        withinY = rayIntervals.union(rayIntervals.linear_below(oy, dy, centre["y"] + self.shaftParams[shaft]["height"]),
+                                     rayIntervals.linear_below(-oy, -dy, -centre["y"]))
+        withinXZ = rayIntervals.inside_circle(ox, dx, oz, dz, centre["x"], centre["z"], self.shaftParams[shaft]["radius"])
+        inCylinder = rayIntervals.intersect(withinY, withinXZ)
+        if not includeCavernCone:
+            return inCylinder
+
+        # Cone: pointR < (coneBaseR/coneHeight)*pointH <=> pointH > 0 and |point-coneTip|^2 < (1+k^2)*pointH^2
+        coneTip, divV, coneBaseR, coneHeight = self._shaftCone(shaft)
+        k = coneBaseR / coneHeight
+        px, py, pz = ox - coneTip[0], oy - coneTip[1], oz - coneTip[2]
+        h0 = divV[0]*px + divV[1]*py + divV[2]*pz
+        h1 = divV[0]*dx + divV[1]*dy + divV[2]*dz
+        withinCone = rayIntervals.intersect(
+            rayIntervals.linear_below(-k*h0, -k*h1),
+            rayIntervals.quadratic_below(dx*dx + dy*dy + dz*dz - (1 + k*k)*h1*h1,
+                                         2*(px*dx + py*dy + pz*dz - (1 + k*k)*h0*h1),
+                                         px*px + py*py + pz*pz - (1 + k*k)*h0*h0))
+
+        belowShaft = rayIntervals.linear_below(oy, dy, centre["y"])
+        aboveShaft = rayIntervals.linear_below(-oy, -dy, -centre["y"])
+        return rayIntervals.union(rayIntervals.intersect(belowShaft, withinCone), rayIntervals.intersect(aboveShaft, inCylinder))
+
+    def ATLASRayIntervals(self, origin, direction, trackingOnly=False):
+        (ox, oy, oz), (dx, dy, dz) = self._rayArrays(origin, direction)
+        rTarget = self.radiusATLAStracking if trackingOnly else self.radiusATLAS
+        return rayIntervals.intersect(rayIntervals.inside_circle(ox, dx, oy, dy, self.IP["x"], self.IP["y"], rTarget),
+                                      rayIntervals.linear_below(-oz, -dz, -self.ATLAS_Z[0]),
+                                      rayIntervals.linear_below(oz, dz, self.ATLAS_Z[1]))
+
     def intersectANUBISstations(self, x, y, z, ANUBISstations, origin=[], verbose=False):
         # (x,y,z) is the position of a particle
         # ANUBISstations is a dictionary of RPCs, with a list of: 
@@ -563,6 +698,144 @@ class ATLASCavern():
 
         return nIntersections, intersections, intersectionStations
     
+    def intersectANUBISstationsSimpleBatch(self, theta, phi, ANUBISstations, positions, extremaPositions=None, returnPoints=False):
+        # Array version of intersectANUBISstationsSimple: every station shell is solved for all rays at once.
+        #   theta, phi: arrays (nRays,) of the particle directions
+        #   positions: (x, y, z) arrays, i.e. shape (3, nRays), relative to the cavern centre
+        #   extremaPositions: optional, same layout. Rays with NaN extrema are left unconstrained.
+        # Returns (nIntersections, stationMask, hitRays, hitStations, hitPoints):
+        #   - nIntersections: (nRays,) number of hits per ray (RPC singlets included)
+        #   - stationMask: (nRays,) int64 with bit i set if station layer i is hit
+        #   - hitRays, hitStations, hitPoints: flat arrays of every hit, sorted by ray then station (None unless returnPoints)
+        # NOTE: the station index is the real layer index (the scalar version reports 0 for every hit).
+        theta = np.atleast_1d(np.asarray(theta, dtype=float))
+        phi = np.atleast_1d(np.asarray(phi, dtype=float))
+        positions = np.asarray(positions, dtype=float)
+        if positions.shape[:1] != (3,):
+            raise ValueError(f"positions must be (x, y, z) arrays of shape (3, nRays), got {positions.shape}")
+        c, d, e = (np.atleast_1d(positions[0]), np.atleast_1d(positions[1]), np.atleast_1d(positions[2]))
+        nRays = theta.shape[0]
+
+        if extremaPositions is not None:
+            extremaPositions = np.asarray(extremaPositions, dtype=float)
+            if extremaPositions.shape[:1] != (3,):
+                raise ValueError(f"extremaPositions must be (x, y, z) arrays of shape (3, nRays), got {extremaPositions.shape}")
+
+        nIntersections = np.zeros(nRays, dtype=np.int64)
+        stationMask = np.zeros(nRays, dtype=np.int64)
+        hitRays, hitStations, hitPoints = [], [], []
+
+        for i, keep, intX, intY, intZ in self._simpleStationCrossings(theta, phi, ANUBISstations, (c, d, e), extremaPositions):
+            rays = np.flatnonzero(keep)
+            if rays.size == 0:
+                continue
+
+            # Each Simple RPC layer could contain several RPC singlets, each with the RPC efficiency
+            if self.RPCeff >= 1:
+                nHits = np.full(rays.size, self.nRPCsPerLayer, dtype=np.int64)
+            else:
+                hitVal = np.random.uniform(0, 1, size=(rays.size, self.nRPCsPerLayer))
+                nHits = np.count_nonzero(hitVal <= self.RPCeff, axis=1)
+
+            nIntersections[rays] += nHits
+            stationMask[rays[nHits > 0]] |= np.int64(1) << i
+
+            if returnPoints:
+                hitRays.append(np.repeat(rays, nHits))
+                hitStations.append(np.full(int(nHits.sum()), i, dtype=np.int64))
+                hitPoints.append(np.repeat(np.column_stack([intX[rays], intY[rays], intZ[rays]]), nHits, axis=0))
+
+        if not returnPoints:
+            return nIntersections, stationMask, None, None, None
+
+        if not hitRays:
+            return nIntersections, stationMask, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros((0, 3))
+
+        hitRays, hitStations, hitPoints = np.concatenate(hitRays), np.concatenate(hitStations), np.concatenate(hitPoints)
+        order = np.argsort(hitRays, kind="stable")
+        return nIntersections, stationMask, hitRays[order], hitStations[order], hitPoints[order]
+
+    def _simpleStationCrossings(self, theta, phi, ANUBISstations, positions, extremaPositions=None):
+        # Geometry of intersectANUBISstationsSimpleBatch, without the RPC efficiency:
+        # a list of (i, keep, intX, intY, intZ) per station layer i, keep being the rays with a valid intersection.
+        c, d, e = positions
+        out = []
+        a, b = self.centreOfCurvature["x"], self.centreOfCurvature["y"]
+        sanityThreshold = 1E-5
+
+        with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            valid = np.isfinite(theta) & np.isfinite(phi) & np.isfinite(c) & np.isfinite(d) & np.isfinite(e)
+            particleR = np.sqrt(np.power(c - a,2) + np.power(d - b,2))
+            m = np.tan(phi)
+            n = np.where(phi > 0, np.tan(theta), np.tan(-theta)) # Correctly determine if particle is up- or down-going
+            vertical = np.isclose(phi, np.pi/2) | np.isclose(phi, (3/2)*np.pi)
+
+            for i in range(len(ANUBISstations["r"])):
+                stationR = max(ANUBISstations["r"][i])
+                keep = valid & ~(particleR > stationR)
+
+                # Vertical trajectories: the upper solution y = b + sqrt(r^2 - (c-a)^2)
+                vY = b + np.sqrt(stationR*stationR - np.power(c - a,2))
+
+                # Quadratic in x for the other trajectories
+                A = np.power(m,2)+1
+                B = 2*(m*(d - b - (m*c)) - a)
+                C = (a*a + b*b + m*m*c*c + d*d - stationR*stationR - 2*(m*c*(d-b)  + b*d))
+                discriminant = np.power(B,2) - 4*A*C
+                sqrtDisc = np.sqrt(discriminant)
+                tX0, tX1 = (-B + sqrtDisc)/(2*A), (-B - sqrtDisc)/(2*A)
+                tY0, tY1 = m*(tX0-c)+d, m*(tX1-c)+d
+                pos0, pos1 = tY0 > 0, tY1 > 0
+
+                # With two +ve solutions, pick the one with the closest phi to the particle direction (first on ties)
+                phiDiff0 = np.abs(phi - self._directionPhi(tX0 - c, tY0 - d))
+                phiDiff1 = np.abs(phi - self._directionPhi(tX1 - c, tY1 - d))
+                takeFirst = np.where(pos0 & pos1, ~(phiDiff1 < phiDiff0), pos0)
+
+                intX = np.where(vertical, c, np.where(takeFirst, tX0, tX1))
+                intY = np.where(vertical, vY, np.where(takeFirst, tY0, tY1))
+                keep &= np.where(vertical, vY > 0, (discriminant > 0) & (pos0 | pos1))
+
+                # Intersection in zy
+                intZ = np.sqrt(np.power((intY - d),2)+np.power((intX-c),2))/n + e
+
+                # Within the circular section defined by the ANUBIS stations and within the cavern bounds
+                extremaX = [stationR * np.cos(tempPhi) + self.centreOfCurvature["x"] for tempPhi in ANUBISstations['phi']['CoC'][i]]
+                keep &= ~((intX < min(extremaX)) | (intX > max(extremaX)) | (intX < min(self.CavernX)) | (intX > max(self.CavernX)))
+
+                extremaZ = []
+                for j in [1,0]:
+                    norm = np.sqrt(np.power(self.CavernZ[j],2) + np.power(intY,2))
+                    uz, uy = self.CavernZ[j]/norm, intY/norm
+                    tempTheta = np.arccos(np.clip(uz / np.sqrt(np.power(uz,2) + np.power(uy,2)), -1, 1))
+                    onAxis = np.isclose(tempTheta, np.pi/2) | np.isclose(tempTheta, -np.pi/2)
+                    extremaZ.append(np.where(onAxis, self.IP["z"], intY/np.tan(tempTheta) + self.IP["z"]))
+                keep &= ~((intZ < np.minimum(*extremaZ)) | (intZ > np.maximum(*extremaZ)) |
+                          (intZ < min(self.CavernZ)) | (intZ > max(self.CavernZ)))
+
+                # Projected intersection point must not exceed the extremaPosition if given
+                if extremaPositions is not None:
+                    constrainedR = np.sqrt(np.power(extremaPositions[0]-c,2) + np.power(extremaPositions[1]-d,2) + np.power(extremaPositions[2]-e,2))
+                    intersectionR = np.sqrt(np.power(intX-c,2) + np.power(intY-d,2) + np.power(intZ-e,2))
+                    keep &= ~(intersectionR > constrainedR)
+
+                # Sanity Check that the intersection point is in the correct direction
+                dist = np.sqrt(np.power((intX-c),2) +  np.power((intY-d),2) + np.power((intZ-e),2))
+                checkTheta = np.arccos(np.clip((intZ-e)/dist, -1.0, 1.0))
+                checkPhi = self._directionPhi(intX - c, intY - d)
+                keep &= ~((np.abs(checkTheta-theta) > sanityThreshold) | (np.abs(checkPhi-phi) > sanityThreshold))
+
+                out.append((i, keep, intX, intY, intZ))
+        return out
+
+    # Signed angle of the (dx, dy) direction to the +x axis, computed as in intersectANUBISstationsSimple.
+    @staticmethod
+    def _directionPhi(dx, dy):
+        norm = np.sqrt(np.power(dx,2) + np.power(dy,2))
+        ux, uy = dx/norm, dy/norm
+        cosPhi = ux / np.sqrt(np.power(ux,2) + np.power(uy,2))
+        return np.sign(uy)*np.arccos(np.clip(cosPhi, -1, 1))
+
     def intersectANUBISstationsShaft(self, theta, phi, ANUBISstations, position=[], extremaPosition=[], verbose=False):
         #   - ANUBISstations in this case should provide a dictionary of the form: 
         #       {"x": [], "y": [[minY,maxY]...], "z": [], "RPCradius": [], "pipeCutoff": {"x": N, "z": M}
@@ -665,6 +938,69 @@ class ATLASCavern():
 
         return nIntersections, intersections, intersectingStations
 
+    #============================================================#
+    # Ray versions of the station intersections                  #
+    #============================================================#
+    # Decay points origin + t*direction (see cavernRayIntervals), the particle moving along the ray:
+    # the list, per station layer, of the t where intersectANUBISstationsSimple / intersectANUBISstationsShaft
+    # count that layer (nRPCsPerLayer hits each, the RPC efficiency is not applied).
+    @staticmethod
+    def _rayAngles(direction):
+        dx, dy, dz = direction
+        return np.arctan2(np.sqrt(dx*dx + dy*dy), dz), np.arctan2(dy, dx)
+
+    def intersectANUBISstationsSimpleRayIntervals(self, origin, direction, ANUBISstations):
+        # From a point inside a station circle (the only points checked), the crossing in the direction of the
+        # particle is the exit point of the ray through that circle: the same point, and so the same checks,
+        # for every point of the ray inside the circle. Each layer is then hit on its whole circle interval,
+        # or nowhere, decided by the checks at one point inside it.
+        origin, direction = self._rayArrays(origin, direction)
+        (ox, oy, oz), (dx, dy, dz) = origin, direction
+        theta, phi = self._rayAngles(direction)
+        a, b = self.centreOfCurvature["x"], self.centreOfCurvature["y"]
+
+        stations = []
+        for i in range(len(ANUBISstations["r"])):
+            stationR = max(ANUBISstations["r"][i])
+            circle = rayIntervals.inside_circle(ox, dx, oy, dy, a, b, stationR)
+            lo, hi = circle[0][:, 0], circle[1][:, 0]
+            with np.errstate(invalid="ignore"):
+                t = np.where(np.isfinite(lo) & np.isfinite(hi), 0.5*(lo + hi),
+                             np.where(np.isfinite(lo), lo + 1, np.where(np.isfinite(hi), hi - 1, 0.0)))
+            keep = self._simpleStationCrossings(theta, phi, ANUBISstations, origin + t*direction)[i][1]
+            stations.append(rayIntervals.empty_where(circle, ~keep))
+        return stations
+
+    def intersectANUBISstationsShaftRayIntervals(self, origin, direction, ANUBISstations):
+        # Along the ray, projX is constant and projZ linear in t: each condition of intersectANUBISstationsShaft
+        # (side of the station in y, inside the RPC circle, outside the pipe cut-outs) is a half-line or a quadratic in t.
+        (ox, oy, oz), (dx, dy, dz) = self._rayArrays(origin, direction)
+        theta, phi = self._rayAngles((dx, dy, dz))
+        pipeCutoff = ANUBISstations.get("pipeCutoff", {})
+
+        stations = []
+        with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            tanPhi, tanTheta = np.tan(phi), np.tan(theta)
+            # Below the station for up-going tracks (phi >= 0), above it otherwise
+            side = np.where(phi >= 0, 1.0, -1.0)
+            for idx in range(len(ANUBISstations["x"])):
+                stationY = ANUBISstations["y"][idx][0]
+                projX = ((stationY - oy)/tanPhi + ox - ANUBISstations["x"][idx], dx - dy/tanPhi)
+                projZ = ((stationY - oy)/tanTheta + oz - ANUBISstations["z"][idx], dz - dy/tanTheta)
+
+                parts = [rayIntervals.linear_below(side*oy, side*dy, side*stationY),
+                         rayIntervals.inside_circle(projX[0], projX[1], projZ[0], projZ[1], 0, 0, ANUBISstations["RPCradius"][idx])]
+                for coord, (p0, p1) in (("x", projX), ("z", projZ)):
+                    cutoff = pipeCutoff.get(coord, "")
+                    if cutoff == "" or cutoff == 0:
+                        continue
+                    if cutoff < 0:
+                        parts.append(rayIntervals.linear_below(-p0, -p1, -cutoff))
+                    else:
+                        parts.append(rayIntervals.linear_below(p0, p1, cutoff))
+                stations.append(rayIntervals.intersect(*parts))
+        return stations
+
     def SolidAngle(self, a, b, d):
         # Solid Angle of a rectangular Pyramid (See https://vixra.org/pdf/2001.0603v2.pdf, equation 27)
         alpha = a / (2*d)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Protocol, Iterable, Optional, Tuple, List
-from .types import Vec3, IntersectionsResult
+import numpy as np
+from .types import Vec3, IntersectionsResult, BatchIntersectionsResult
 
 class IGeometry(Protocol):
     @property
@@ -16,9 +17,35 @@ class IGeometry(Protocol):
     def in_atlas(self, x: float, y: float, z: float,
                  tracking_only: bool = False) -> bool: ...
 
+    # Array versions: x, y, z are arrays, return a boolean mask
+    def in_cavern_batch(self, x: np.ndarray, y: np.ndarray, z: np.ndarray,
+                        max_radius: Optional[float] = None) -> np.ndarray: ...
+    def in_shaft_batch(self, x: np.ndarray, y: np.ndarray, z: np.ndarray,
+                       shafts: Iterable[str] = ("PX14",),
+                       include_cavern_cone: bool = True) -> np.ndarray: ...
+    def in_atlas_batch(self, x: np.ndarray, y: np.ndarray, z: np.ndarray,
+                       tracking_only: bool = False) -> np.ndarray: ...
+
+    # Ray versions: points origin + t*direction ((3, n) arrays), return the padded (lo, hi) t intervals
+    # where the array version holds (see intervals.py)
+    def cavern_ray_intervals(self, origin: np.ndarray, direction: np.ndarray,
+                             max_radius: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]: ...
+    def shaft_ray_intervals(self, origin: np.ndarray, direction: np.ndarray,
+                            shafts: Iterable[str] = ("PX14",),
+                            include_cavern_cone: bool = True) -> Tuple[np.ndarray, np.ndarray]: ...
+    def atlas_ray_intervals(self, origin: np.ndarray, direction: np.ndarray,
+                            tracking_only: bool = False) -> Tuple[np.ndarray, np.ndarray]: ...
+    # t where a decay point, moving along the ray, has at least n_hits station hits (RPC efficiency not applied)
+    def station_hits_ray_intervals(self, origin: np.ndarray, direction: np.ndarray,
+                                   n_hits: int) -> Tuple[np.ndarray, np.ndarray]: ...
+
     def intersect_stations_simple(self, theta: float, phi: float,
                                   position: Vec3,
                                   extrema_position: Optional[Vec3] = None) -> IntersectionsResult: ...
+    def intersect_stations_simple_batch(self, theta: np.ndarray, phi: np.ndarray,
+                                        positions: np.ndarray,
+                                        extrema_positions: Optional[np.ndarray] = None,
+                                        return_points: bool = False) -> BatchIntersectionsResult: ...
 
 class IGeometryBuilder(Protocol):
     def build(self) -> "IGeometry": ...
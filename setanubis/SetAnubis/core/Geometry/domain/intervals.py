@@ -0,0 +1,133 @@
+from __future__ import annotations
+from typing import Optional, Sequence, Tuple
+import numpy as np
+
+# Sets of ray parameters t, one set per ray, as padded (lo, hi) arrays of shape (nRays, k):
+#   - each row holds disjoint open intervals (lo, hi) sorted by lo,
+#   - unused slots are (inf, inf).
+# Interval ends are exact (solutions of the linear/quadratic boundary equations); whether an end itself
+# belongs to the set is not tracked, it only matters on a set of measure zero.
+Intervals = Tuple[np.ndarray, np.ndarray]
+
+
+def _pad(lo, hi) -> Intervals:
+    lo, hi = np.broadcast_arrays(np.asarray(lo, dtype=float), np.asarray(hi, dtype=float))
+    lo, hi = np.atleast_2d(lo.T).T, np.atleast_2d(hi.T).T
+    ok = lo < hi
+    lo, hi = np.where(ok, lo, np.inf), np.where(ok, hi, np.inf)
+    order = np.argsort(lo, axis=1, kind="stable")
+    return np.take_along_axis(lo, order, axis=1), np.take_along_axis(hi, order, axis=1)
+
+
+def interval(lo, hi) -> Intervals:
+    """One interval (lo, hi) per ray (lo/hi broadcast to the number of rays)."""
+    return _pad(np.asarray(lo, dtype=float)[..., None], np.asarray(hi, dtype=float)[..., None])
+
+
+def linear_below(a0, a1, bound=0.0) -> Intervals:
+    """{t : a0 + a1*t < bound}, element-wise over rays. NaN coefficients give the empty set."""
+    a0, a1, bound = np.broadcast_arrays(np.asarray(a0, dtype=float), np.asarray(a1, dtype=float),
+                                        np.asarray(bound, dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        root = (bound - a0) / a1
+    const = np.isfinite(a0) & (a1 == 0) & (a0 < bound)
+    lo = np.where(a1 > 0, -np.inf, np.where(a1 < 0, root, np.where(const, -np.inf, np.inf)))
+    hi = np.where(a1 > 0, root, np.inf)
+    return interval(lo, hi)
+
+
+def quadratic_below(q2, q1, q0) -> Intervals:
+    """{t : q2*t^2 + q1*t + q0 < 0}, element-wise over rays: up to two intervals per ray."""
+    q2, q1, q0 = np.broadcast_arrays(np.asarray(q2, dtype=float), np.asarray(q1, dtype=float),
+                                     np.asarray(q0, dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        disc = q1 * q1 - 4.0 * q2 * q0
+        # numerically stable roots
+        q = -0.5 * (q1 + np.where(q1 < 0, -1.0, 1.0) * np.sqrt(np.maximum(disc, 0.0)))
+        r_a, r_b = q / q2, q0 / q
+        r1, r2 = np.minimum(r_a, r_b), np.maximum(r_a, r_b)
+    two_roots = disc > 0
+    up = q2 > 0
+    down = q2 < 0
+    # q2 > 0: between the roots; q2 < 0: outside the roots (everything without real roots)
+    lo0 = np.where(up & two_roots, r1, np.where(down, -np.inf, np.inf))
+    hi0 = np.where(up & two_roots, r2, np.where(down & two_roots, r1, np.inf))
+    lo1 = np.where(down & two_roots, r2, np.inf)
+    quad = _pad(np.stack([lo0, lo1], axis=-1), np.stack([hi0, np.full(hi0.shape, np.inf)], axis=-1))
+
+    flat = q2 == 0
+    if not flat.any():
+        return quad
+    lin = linear_below(q0, q1)
+    lo = np.concatenate([np.where(flat[:, None], np.inf, quad[0]), np.where(flat[:, None], lin[0], np.inf)], axis=1)
+    hi = np.concatenate([np.where(flat[:, None], np.inf, quad[1]), np.where(flat[:, None], lin[1], np.inf)], axis=1)
+    return _pad(lo, hi)
+
+
+def inside_circle(u0, du, v0, dv, cu, cv, radius) -> Intervals:
+    """{t : (u0 + du*t - cu)^2 + (v0 + dv*t - cv)^2 < radius^2}: a line crossing a circle (or a cylinder)."""
+    pu = np.asarray(u0, dtype=float) - cu
+    pv = np.asarray(v0, dtype=float) - cv
+    du, dv = np.asarray(du, dtype=float), np.asarray(dv, dtype=float)
+    return quadratic_below(du * du + dv * dv, 2.0 * (pu * du + pv * dv), pu * pu + pv * pv - radius * radius)
+
+
+def _combine(sets: Sequence[Intervals], weights: Sequence[int], need: int) -> Intervals:
+    """Points covered with a total weight >= need (each set counts with its weight where it holds)."""
+    lo = np.concatenate([s[0] for s in sets], axis=1)
+    hi = np.concatenate([s[1] for s in sets], axis=1)
+    w = np.concatenate([np.full(s[0].shape, wt, dtype=np.int64) for s, wt in zip(sets, weights)], axis=1)
+    w = np.where(lo < hi, w, 0)
+    pos = np.concatenate([lo, hi], axis=1)
+    delta = np.concatenate([w, -w], axis=1)
+    # at equal positions, openings first: touching pieces merge instead of leaving a point-sized gap
+    order = np.lexsort((-delta, pos), axis=1)
+    pos, delta = np.take_along_axis(pos, order, axis=1), np.take_along_axis(delta, order, axis=1)
+    cover = np.cumsum(delta, axis=1)
+    before = cover - delta
+    opens = (before < need) & (cover >= need)
+    closes = (before >= need) & (cover < need)
+
+    n = pos.shape[0]
+    k = max(int(opens.sum(axis=1).max(initial=0)), 1)
+    out_lo = np.full((n, k), np.inf)
+    out_hi = np.full((n, k), np.inf)
+    for mask, out in ((opens, out_lo), (closes, out_hi)):
+        row, col = np.nonzero(mask)
+        rank = np.cumsum(mask, axis=1)[row, col] - 1
+        out[row, rank] = pos[row, col]
+    return _pad(out_lo, out_hi)
+
+
+def intersect(*sets: Intervals) -> Intervals:
+    return _combine(sets, [1] * len(sets), len(sets))
+
+
+def union(*sets: Intervals) -> Intervals:
+    return _combine(sets, [1] * len(sets), 1)
+
+
+def at_least(sets: Sequence[Intervals], count: int, weights: Optional[Sequence[int]] = None) -> Intervals:
+    """Points inside at least `count` of the sets (each set counted `weights[i]` times if given)."""
+    sets = list(sets)
+    return _combine(sets, [1] * len(sets) if weights is None else [int(w) for w in weights], int(count))
+
+
+def difference(a: Intervals, b: Intervals) -> Intervals:
+    """Points of a not in b."""
+    return _combine([a, b], [1, -1], 1)
+
+
+def empty_where(s: Intervals, mask) -> Intervals:
+    """s with the rays of `mask` emptied."""
+    mask = np.asarray(mask, dtype=bool)[:, None]
+    return _pad(np.where(mask, np.inf, s[0]), np.where(mask, np.inf, s[1]))
+
+
+def to_csr(s: Intervals) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(offsets, start, stop): the intervals of ray i are [offsets[i], offsets[i+1])."""
+    lo, hi = s
+    valid = lo < hi
+    offsets = np.zeros(lo.shape[0] + 1, dtype=np.int64)
+    np.cumsum(valid.sum(axis=1), out=offsets[1:])
+    return offsets, lo[valid], hi[valid]
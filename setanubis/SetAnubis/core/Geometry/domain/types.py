@@ -1,6 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Sequence, Tuple, List
+from typing import Sequence, Tuple, List, Optional
+import numpy as np
 
 Vec3 = Tuple[float, float, float]
 FourVec = Tuple[float, float, float, float]
@@ -9,3 +10,22 @@ FourVec = Tuple[float, float, float, float]
 class IntersectionsResult:
     points: List[Vec3]
     station_indices: List[int]
+
+@dataclass(frozen=True)
+class BatchIntersectionsResult:
+    """
+    Intersections of many rays with the ANUBIS stations, in flat arrays.
+      n_hits[k]       : number of hits of ray k
+      station_mask[k] : bit i set if ray k hits station i
+      ray_index, station_index, points : one entry per hit, sorted by ray (only if points were requested)
+    """
+    n_hits: np.ndarray
+    station_mask: np.ndarray
+    ray_index: Optional[np.ndarray] = None
+    station_index: Optional[np.ndarray] = None
+    points: Optional[np.ndarray] = None
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """CSR offsets: hits of ray k are points[offsets[k]:offsets[k+1]]."""
+        return np.concatenate([[0], np.cumsum(self.n_hits)]).astype(np.int64)
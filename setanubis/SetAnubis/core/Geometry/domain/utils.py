@@ -1,4 +1,5 @@
 from __future__ import annotations
+import ast
 import numpy as np
 from typing import Tuple
 
@@ -10,3 +11,38 @@ def extract_xyz(fourvec_like) -> Tuple[float, float, float]:
     # (x,y,z) or (x,y,z,t)
     x, y, z = float(fourvec_like[0]), float(fourvec_like[1]), float(fourvec_like[2])
     return x, y, z
+
+def parse_xyz(vertex) -> Tuple[float, float, float]:
+    # Lenient extract_xyz: also '(x, y, z[, t])' strings and x/y/z (or 0/1/2) keyed dicts / Series.
+    # Raises ValueError / TypeError / IndexError if the vertex cannot be read.
+    v = ast.literal_eval(vertex) if isinstance(vertex, str) else vertex
+    if hasattr(v, "keys"):
+        keys = set(v.keys())
+        if {"x", "y", "z"} <= keys:
+            return float(v["x"]), float(v["y"]), float(v["z"])
+        if {0, 1, 2} <= keys:
+            return float(v[0]), float(v[1]), float(v[2])
+        if not hasattr(v, "to_list"):
+            raise ValueError(f"Unsupported vertex: {vertex!r}")
+        v = v.to_list()
+    if len(v) < 3:
+        raise ValueError("vertex sequence has less than 3 elements")
+    return extract_xyz(v)
+
+def extract_xyz_arrays(fourvecs) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Sequence of vertices -> x, y, z arrays: the one vertex-column parser of the batched cuts.
+    # Numeric (x,y,z[,t]) rows are converted in one go, other entries through parse_xyz; unreadable ones give NaN.
+    values = list(fourvecs)
+    try:
+        arr = np.asarray(values, dtype=float)
+        if arr.ndim == 2 and arr.shape[1] >= 3:
+            return arr[:, 0], arr[:, 1], arr[:, 2]
+    except (TypeError, ValueError):
+        pass
+    xyz = np.full((len(values), 3), np.nan, dtype=float)
+    for i, v in enumerate(values):
+        try:
+            xyz[i] = parse_xyz(v)
+        except Exception:
+            continue
+    return xyz[:, 0], xyz[:, 1], xyz[:, 2]
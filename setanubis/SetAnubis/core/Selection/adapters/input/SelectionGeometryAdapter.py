@@ -1,4 +1,5 @@
 from SetAnubis.core.Selection.ports.input.ISelectionGeometry import ISelectionGeometry
+from SetAnubis.core.Geometry.domain.utils import extract_xyz_arrays, parse_xyz
 from typing import Any, Dict, Iterable, List, Optional, Protocol, Tuple, Callable
 import pandas as pd
 import math
@@ -16,35 +17,10 @@ def _as_xyz(vertex: Any) -> Tuple[float, float, float]:
       - string like '(x, y, z)' or '(x, y, z, t)' -> parsed via ast.literal_eval
     Raises ValueError if cannot parse.
     """
-    v = vertex
-
-    # Strings like "(1.0, 2.0, 3.0)" or "[1,2,3,4]"
-    if isinstance(v, str):
-        v = ast.literal_eval(v)
-
-    # pandas Series
-    if isinstance(v, pd.Series):
-        if set(['x','y','z']).issubset(v.index):
-            return (float(v['x']), float(v['y']), float(v['z']))
-        if set([0,1,2]).issubset(v.index):
-            return (float(v[0]), float(v[1]), float(v[2]))
-        v = v.to_list()
-
-    # dict-like
-    if isinstance(v, dict):
-        if all(k in v for k in ('x','y','z')):
-            return (float(v['x']), float(v['y']), float(v['z']))
-        if all(k in v for k in (0,1,2)):
-            return (float(v[0]), float(v[1]), float(v[2]))
-        # fallthrough to try sequence
-
-    # sequence / np array
-    if isinstance(v, (list, tuple, np.ndarray)):
-        if len(v) < 3:
-            raise ValueError("vertex sequence has less than 3 elements")
-        return (float(v[0]), float(v[1]), float(v[2]))
-
-    raise ValueError(f"Unsupported vertex type: {type(vertex)}")
+    try:
+        return parse_xyz(vertex)
+    except (TypeError, IndexError) as exc:
+        raise ValueError(f"Unsupported vertex type: {type(vertex)}") from exc
 
 def _get_intersect_fn(geom_proxy) :
     """
@@ -58,6 +34,15 @@ def _get_intersect_fn(geom_proxy) :
         raise AttributeError("No intersect_stations_simple on geometry adapter")
     return fn
     
+def _get_intersect_batch_fn(geom_proxy) -> Optional[Callable]:
+    """
+    Get intersect_stations_simple_batch(θ, φ, (x,y,z) arrays, extrema=None) from geom_proxy, None if missing.
+    """
+    fn = getattr(geom_proxy, "intersect_stations_simple_batch", None)
+    if fn is None and hasattr(geom_proxy, "geometry"):
+        fn = getattr(geom_proxy.geometry, "intersect_stations_simple_batch", None)
+    return fn if callable(fn) else None
+
 class SelectionGeometryAdapter(ISelectionGeometry):
     """
     Proxy on the Selection side to the Geometry.
@@ -249,6 +234,68 @@ class SelectionGeometryAdapter(ISelectionGeometry):
         except Exception:
             return False
 
+    def in_cavern_batch(self, x_mm, y_mm, z_mm, rpc_max_radius) -> np.ndarray:
+        """
+        Array version of in_cavern: same mm -> m conversion and coordsToOrigin shift, one boolean per vertex.
+        """
+        X, Y, Z = self._mm_to_m_origin_arrays(x_mm, y_mm, z_mm)
+        fn = self._first_geometry_callable(["inCavernBatch", "in_cavern_batch"])
+        if fn is None:
+            return self._scalar_mask(self.in_cavern, x_mm, y_mm, z_mm, rpc_max_radius)
+
+        mr = None if (rpc_max_radius is None or math.isinf(rpc_max_radius)) else float(rpc_max_radius)
+        return self._as_mask(fn(X, Y, Z, mr), X)
+
+    def in_shaft_batch(self, x_mm, y_mm, z_mm, rpc_max_radius) -> np.ndarray:
+        """
+        Array version of in_shaft (cavern cone included when the geometry mode contains 'cone').
+        """
+        X, Y, Z = self._mm_to_m_origin_arrays(x_mm, y_mm, z_mm)
+        fn = self._first_geometry_callable(["inShaftBatch", "in_shaft_batch"])
+        if fn is None:
+            return self._scalar_mask(self.in_shaft, x_mm, y_mm, z_mm, rpc_max_radius)
+
+        includeCone = "cone" in self.geoMode.lower()
+        return self._as_mask(fn(X, Y, Z, ("PX14",), includeCone), X)
+
+    def in_atlas_batch(self, x_mm, y_mm, z_mm, strict) -> np.ndarray:
+        """
+        Array version of in_atlas.
+        """
+        X, Y, Z = self._mm_to_m_origin_arrays(x_mm, y_mm, z_mm)
+        fn = self._first_geometry_callable(["inATLASBatch", "in_atlas_batch"])
+        if fn is None:
+            return self._scalar_mask(self.in_atlas, x_mm, y_mm, z_mm, strict)
+
+        return self._as_mask(fn(X, Y, Z, bool(strict)), X)
+
+    def in_cavern_ray_intervals(self, ux, uy, uz, rpc_max_radius) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Distances (mm) along the rays from the IP with unit directions (ux, uy, uz) where in_cavern holds.
+        """
+        mr = None if (rpc_max_radius is None or math.isinf(rpc_max_radius)) else float(rpc_max_radius)
+        return self._ray_intervals(["cavernRayIntervals", "cavern_ray_intervals"], ux, uy, uz, mr)
+
+    def in_shaft_ray_intervals(self, ux, uy, uz, rpc_max_radius) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Distances (mm) along the rays where in_shaft holds (cavern cone included as in in_shaft_batch).
+        """
+        includeCone = "cone" in self.geoMode.lower()
+        return self._ray_intervals(["shaftRayIntervals", "shaft_ray_intervals"], ux, uy, uz, ("PX14",), includeCone)
+
+    def in_atlas_ray_intervals(self, ux, uy, uz, strict) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Distances (mm) along the rays where in_atlas holds.
+        """
+        return self._ray_intervals(["ATLASRayIntervals", "atlas_ray_intervals"], ux, uy, uz, bool(strict))
+
+    def station_hits_ray_intervals(self, ux, uy, uz, n_hits) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Distances (mm) along the rays where a decay gets at least n_hits station hits (as llp_intersections_batch
+        with the LLP flying along the ray, RPC efficiency not applied).
+        """
+        return self._ray_intervals(["stationHitsRayIntervals", "station_hits_ray_intervals"], ux, uy, uz, int(n_hits))
+
     def llp_intersections(
         self,
         row: pd.Series,
@@ -264,6 +311,30 @@ class SelectionGeometryAdapter(ISelectionGeometry):
         # (row, decay_vertex_col, min_p_llp, plot_trajectory)
         return fn(row, decay_vertex_col, min_p_llp, plot_trajectory)
 
+    def llp_intersections_batch(
+        self,
+        llps_df: pd.DataFrame,
+        decay_vertex_col: str,
+        min_p_llp: float,
+        return_points: bool = False,
+    ):
+        """
+        llp_intersections for every row at once. Return an object with n_hits / station_mask arrays
+        aligned with llps_df (and flat ray_index / station_index / points if return_points).
+        """
+        fn = self._resolve_callable(self._INTERSECTIONS_BATCH)
+        return fn(llps_df, decay_vertex_col, min_p_llp, return_points)
+
+    _INTERSECTIONS_BATCH = ["checkIntersectionsWithANUBISBatch", "check_intersections_with_anubis_batch"]
+
+    def has_llp_intersections_batch(self) -> bool:
+        """True if the wrapped geometry provides the batched intersections (else use llp_intersections)."""
+        try:
+            self._resolve_callable(self._INTERSECTIONS_BATCH)
+        except AttributeError:
+            return False
+        return True
+
     def decay_hits(
         self,
         llps_df: pd.DataFrame,
@@ -291,6 +362,10 @@ class SelectionGeometryAdapter(ISelectionGeometry):
         if ch.empty:
             return llps_df.iloc[0:0]
 
+        batch_fn = _get_intersect_batch_fn(self._g)
+        if batch_fn is not None:
+            return self._decay_hits_batch(llps_df, ch, batch_fn, nIntersections, nTracks, prodVertex)
+
         intersect_fn = _get_intersect_fn(self._g)
 
         has_eta_phi = ("eta" in ch.columns) and ("phi" in ch.columns)
@@ -369,6 +444,50 @@ class SelectionGeometryAdapter(ISelectionGeometry):
 
         return llps_df.loc[llps_df.index.intersection(keep)]
     
+    def _decay_hits_batch(
+        self,
+        llps_df: pd.DataFrame,
+        ch: pd.DataFrame,
+        batch_fn: Callable,
+        nIntersections: int,
+        nTracks: int,
+        prodVertex: str,
+    ) -> pd.DataFrame:
+        """
+        decay_hits on arrays: one intersection call for all children, then tracks counted per LLPindex.
+        """
+        if "LLPindex" not in ch.columns or prodVertex not in ch.columns:
+            return llps_df.iloc[0:0]
+
+        # Children of the LLPs still in llps_df only, as codes 0..len(llps_df)-1
+        codes = llps_df.index.get_indexer(pd.to_numeric(ch["LLPindex"], errors="coerce"))
+        ch, codes = ch[codes >= 0], codes[codes >= 0]
+        if ch.empty:
+            return llps_df.iloc[0:0]
+
+        # direction
+        if ("eta" in ch.columns) and ("phi" in ch.columns):
+            eta = pd.to_numeric(ch["eta"], errors="coerce").to_numpy(dtype=float)
+            phi = pd.to_numeric(ch["phi"], errors="coerce").to_numpy(dtype=float)
+        elif all(c in ch.columns for c in ("px", "py", "pz")):
+            px = ch["px"].to_numpy(dtype=float); py = ch["py"].to_numpy(dtype=float); pz = ch["pz"].to_numpy(dtype=float)
+            p = np.sqrt(px*px + py*py + pz*pz)
+            eta = 0.5 * np.log(np.maximum(p + pz, 1e-300) / np.maximum(p - pz, 1e-300))
+            phi = np.arctan2(py, px)
+        else:
+            return llps_df.iloc[0:0]
+        theta = 2.0 * np.arctan(np.exp(-eta))
+
+        # mm -> m, then coordsToOrigin (like LLPs)
+        X, Y, Z = self._mm_to_m_origin_arrays(*extract_xyz_arrays(ch[prodVertex].tolist()))
+
+        res = batch_fn(theta, phi, (X, Y, Z), None)
+        # parité legacy : count the number of intersection, no unique station.
+        valid_track = np.asarray(res.n_hits) >= int(nIntersections)
+
+        tracks_per_llp = np.bincount(codes[valid_track], minlength=len(llps_df.index))
+        return llps_df[tracks_per_llp >= max(int(nTracks), 1)]
+
     def _coords_to_origin_if_possible(self, x_m: float, y_m: float, z_m: float):
         candidates = [self._g]
         if hasattr(self._g, "geometry"):
@@ -381,6 +500,59 @@ class SelectionGeometryAdapter(ISelectionGeometry):
                 return cto(x_m, y_m, z_m)
         return (x_m, y_m, z_m)
     
+    def _first_geometry_callable(self, names: List[str]) -> Optional[Callable]:
+        """
+        Same lookup order as the scalar checks: self._g, self._g.geometry, self._g.geometry.cavern.
+        """
+        candidates = [self._g]
+        if hasattr(self._g, "geometry"):
+            candidates.append(self._g.geometry)
+            if hasattr(self._g.geometry, "cavern"):
+                candidates.append(self._g.geometry.cavern)
+        for obj in candidates:
+            fn = self._first_attr(obj, names)
+            if callable(fn):
+                return fn
+        return None
+
+    def _ray_intervals(self, names: List[str], ux, uy, uz, *args) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Call a ray-interval method of the geometry on rays from the IP (mm frame -> geometry frame), back in mm.
+        """
+        fn = self._first_geometry_callable(names)
+        if fn is None:
+            raise AttributeError(f"No {names[0]} on geometry adapter")
+        ux, uy, uz = (np.asarray(u, dtype=float) for u in (ux, uy, uz))
+        zero = np.zeros(ux.shape)
+        origin = np.stack(self._mm_to_m_origin_arrays(zero, zero, zero))
+        # 1 mm along the direction: the geometry ray parameter is then in mm
+        direction = np.stack(self._mm_to_m_origin_arrays(ux, uy, uz)) - origin
+        lo, hi = fn(origin, direction, *args)
+        return np.asarray(lo, dtype=float), np.asarray(hi, dtype=float)
+
+    def _mm_to_m_origin_arrays(self, x_mm, y_mm, z_mm):
+        x_m = np.asarray(x_mm, dtype=float) * 1e-3
+        y_m = np.asarray(y_mm, dtype=float) * 1e-3
+        z_m = np.asarray(z_mm, dtype=float) * 1e-3
+        X, Y, Z = self._coords_to_origin_if_possible(x_m, y_m, z_m)
+        return np.asarray(X, dtype=float), np.asarray(Y, dtype=float), np.asarray(Z, dtype=float)
+
+    @staticmethod
+    def _as_mask(values, like: np.ndarray) -> np.ndarray:
+        # NaN coordinates (unparsable vertices) never pass, like the scalar path returning False on error.
+        return np.asarray(values, dtype=bool) & np.isfinite(like)
+
+    @staticmethod
+    def _scalar_mask(check: Callable, x_mm, y_mm, z_mm, arg) -> np.ndarray:
+        """
+        Fallback when the geometry has no array version: loop on the scalar check.
+        """
+        x_mm, y_mm, z_mm = np.asarray(x_mm, dtype=float), np.asarray(y_mm, dtype=float), np.asarray(z_mm, dtype=float)
+        return np.fromiter(
+            (check((x, y, z), arg) for x, y, z in zip(x_mm, y_mm, z_mm)),
+            count=x_mm.size, dtype=bool,
+        )
+
     def _mm_to_m_xyz(self, decay_vertex_mm):
         x_mm, y_mm, z_mm = _as_xyz(decay_vertex_mm)
         return (x_mm * 1e-3, y_mm * 1e-3, z_mm * 1e-3)
\ No newline at end of file
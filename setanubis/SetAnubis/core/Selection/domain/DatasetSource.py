@@ -1,36 +1,74 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Callable, Dict, List, Optional, Tuple, Protocol, Any
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Protocol, Any, Union
+from contextlib import contextmanager
 import os, gzip, pickle, hashlib, io
+import numpy as np
 import pandas as pd
 
+try:
+    import fcntl
+except ImportError:  # non-POSIX: no inter-process lock on the cache
+    fcntl = None
+
 from SetAnubis.core.Selection.domain.LLPAnalyzer import LLPAnalyzer
+from SetAnubis.core.Selection.domain.HepMCFrameBuilder import HepmcColumns
+from SetAnubis.core.Selection.domain import bundle_store
+
+@contextmanager
+def cache_build_lock(path: Optional[str]):
+    """
+    Exclusive inter-process lock on `<path>.lock`, so parallel workers never build the same cache entry at once.
+    No-op without a path or on platforms without fcntl.
+    """
+    if not path or fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f"{path}.lock", "a+") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
 
 class BundleIO:
     """
-    Save and load bundles (dict[str->DataFrame] and full df) implementation with gzip+pickle.
+    Save and load bundles (dict[str->DataFrame] and full df) in the columnar format of bundle_store:
+    a bundle is a directory with one table file per DataFrame, read lazily (table by table, column by
+    column) and memory-mapped when uncompressed. compression: None, "zlib", "lz4" or "zstd".
+    Writes go through a temporary file, readers never see a partial cache file.
+    A HepmcColumns full df is saved as a bundle directory of its tables (HepmcColumns.to_tables).
+    Files of the former gzip+pickle format are still loaded.
     """
     @staticmethod
-    def save_bundle(bundle: Dict[str, pd.DataFrame], filepath: str) -> None:
-        os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
-        with gzip.open(filepath, "wb") as f:
-            pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+    def save_bundle(bundle: Dict[str, pd.DataFrame], filepath: str, compression: Optional[str] = None) -> None:
+        bundle_store.write_bundle(bundle, filepath, compression)
 
     @staticmethod
     def load_bundle(filepath: str) -> Dict[str, pd.DataFrame]:
+        if os.path.isdir(filepath):
+            return bundle_store.read_bundle(filepath)
         with gzip.open(filepath, "rb") as f:
             return pickle.load(f)
 
     @staticmethod
-    def save_df(df: pd.DataFrame, filepath: str) -> None:
-        os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
-        with gzip.open(filepath, "wb") as f:
-            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    def save_df(df: Union[pd.DataFrame, HepmcColumns], filepath: str, compression: Optional[str] = None) -> None:
+        if isinstance(df, HepmcColumns):
+            bundle_store.write_bundle(df.to_tables(), filepath, compression)
+        else:
+            bundle_store.write_table(df, filepath, compression)
 
     @staticmethod
-    def load_df(filepath: str) -> pd.DataFrame:
+    def load_df(filepath: str, columns: Optional[List[str]] = None) -> Union[pd.DataFrame, HepmcColumns]:
+        if bundle_store.is_bundle_dir(filepath):
+            return HepmcColumns.from_tables(bundle_store.read_bundle(filepath), columns)
+        if bundle_store.is_table_file(filepath):
+            return bundle_store.read_table(filepath, columns)
         with gzip.open(filepath, "rb") as f:
-            return pickle.load(f)
+            df = pickle.load(f)
+        return df if columns is None else df[list(columns)]
 
 
 def _sha1_bytes(b: bytes) -> str:
@@ -62,9 +100,29 @@ def _fingerprint_df(df: pd.DataFrame) -> str:
     return _sha1_bytes(meta + buf.getvalue())
 
 
+def _split_events(df: pd.DataFrame, chunk_events: int) -> Iterator[pd.DataFrame]:
+    """Rows of chunk_events consecutive eventNumbers at a time (original index kept)."""
+    ev = df["eventNumber"].to_numpy()
+    uniq = np.unique(ev)
+    for lo in range(0, uniq.size, chunk_events):
+        hi = uniq[min(lo + chunk_events, uniq.size) - 1]
+        yield df[(ev >= uniq[lo]) & (ev <= hi)]
+
+
 class HepmcLoader(Protocol):
-    """Abstraction: multiples HepMC -> DataFrame events."""
-    def __call__(self, hepmc_paths: List[str]) -> pd.DataFrame: ...
+    """
+    Abstraction: multiples HepMC -> DataFrame events, or HepmcColumns (e.g. HepmcFrameBuilder.build_from_file
+    with columnar=True), which LLPAnalyzer reads without rebuilding the object columns.
+    """
+    def __call__(self, hepmc_paths: List[str]) -> Union[pd.DataFrame, HepmcColumns]: ...
+
+
+class HepmcChunkLoader(Protocol):
+    """
+    Abstraction: multiples HepMC -> DataFrames of chunk_events consecutive events.
+    eventNumber and row index continue across chunks (e.g. HepmcFrameBuilder.iter_frames_from_files).
+    """
+    def __call__(self, hepmc_paths: List[str], chunk_events: int) -> Iterator[pd.DataFrame]: ...
 
 
 @dataclass(frozen=True)
@@ -85,19 +143,35 @@ class EventsBundleSource:
     events_df: Optional[pd.DataFrame] = None
     hepmc_paths: Optional[List[str]] = None
     hepmc_loader: Optional[HepmcLoader] = None
+    # streaming: events are read chunk_events at a time (iter_bundles)
+    hepmc_chunk_loader: Optional[HepmcChunkLoader] = None
+    chunk_events: Optional[int] = None
 
     cfg: SourceConfig = field(default_factory=SourceConfig)
 
     cache_dir: Optional[str] = None
     df_cache_key: Optional[str] = None 
     force_recompute: bool = False
+    cache_compression: Optional[str] = None  # None (memory-mapped), "zlib", "lz4", "zstd"
 
     def _paths(self, prefix: str) -> Tuple[Optional[str], Optional[str]]:
         if not self.cache_dir:
             return None, None
         os.makedirs(self.cache_dir, exist_ok=True)
-        return (os.path.join(self.cache_dir, f"{prefix}_df.pkl.gz"),
-                os.path.join(self.cache_dir, f"{prefix}_bundle.pkl.gz"))
+        return (os.path.join(self.cache_dir, f"{prefix}_df.cols"),
+                os.path.join(self.cache_dir, f"{prefix}_bundle.cols"))
+
+    @staticmethod
+    def _readable(path: Optional[str]) -> Optional[str]:
+        """
+        Cache file to read for `path`: path itself, or its former gzip+pickle name (`*.pkl.gz`) when only
+        that one exists (caches written before the columnar format). New entries are always written to path.
+        """
+        if path and not os.path.exists(path):
+            legacy = f"{path[: -len('.cols')]}.pkl.gz" if path.endswith(".cols") else None
+            if legacy and os.path.exists(legacy):
+                return legacy
+        return path
 
     def materialize(self) -> Dict[str, pd.DataFrame]:
         if self.ready_bundle is not None:
@@ -112,12 +186,14 @@ class EventsBundleSource:
             pkey = _fingerprint_paths(self.hepmc_paths)
             df_path, bundle_path = self._paths(f"hepmc-{pkey}")
 
-            if (not self.force_recompute) and df_path and os.path.exists(df_path):
-                df = BundleIO.load_df(df_path)
-            else:
-                df = self.hepmc_loader(self.hepmc_paths)
-                if df_path:
-                    BundleIO.save_df(df, df_path)
+            with cache_build_lock(df_path):
+                cached = self._readable(df_path)
+                if (not self.force_recompute) and cached and os.path.exists(cached):
+                    df = BundleIO.load_df(cached)
+                else:
+                    df = self.hepmc_loader(self.hepmc_paths)
+                    if df_path:
+                        BundleIO.save_df(df, df_path, self.cache_compression)
         else:
             raise ValueError("Provide either ready_bundle, events_df, or (hepmc_paths + hepmc_loader).")
 
@@ -125,17 +201,86 @@ class EventsBundleSource:
             if self.events_df is not None:
                 bkey = self.df_cache_key or _fingerprint_df(self.events_df)
                 _, bundle_path = self._paths(f"bundle-{bkey}")
-            if (not self.force_recompute) and bundle_path and os.path.exists(bundle_path):
-                return BundleIO.load_bundle(bundle_path)
+        else:
+            bundle_path = None
 
-        analyzer = LLPAnalyzer(df, pt_min_cfg=self.cfg.pt_min_cfg)
-        bundle = analyzer.create_sample_dataframes(llpid=self.cfg.llp_pid)
+        # Check again under the lock: another worker may have just built this bundle.
+        with cache_build_lock(bundle_path):
+            cached = self._readable(bundle_path)
+            if (not self.force_recompute) and cached and os.path.exists(cached):
+                return BundleIO.load_bundle(cached)
+
+            analyzer = LLPAnalyzer(df, pt_min_cfg=self.cfg.pt_min_cfg)
+            bundle = analyzer.create_sample_dataframes(llpid=self.cfg.llp_pid)
 
-        if self.cache_dir and bundle_path:
-            BundleIO.save_bundle(bundle, bundle_path)
+            if bundle_path:
+                BundleIO.save_bundle(bundle, bundle_path, self.cache_compression)
 
         return bundle
 
+    def _bundle_of(self, df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        analyzer = LLPAnalyzer(df, pt_min_cfg=self.cfg.pt_min_cfg)
+        return analyzer.create_sample_dataframes(llpid=self.cfg.llp_pid)
+
+    def _event_frames(self, chunk_events: int) -> Optional[Iterator[pd.DataFrame]]:
+        if self.events_df is not None:
+            return _split_events(self.events_df, chunk_events)
+        if self.hepmc_paths and self.hepmc_chunk_loader:
+            return self.hepmc_chunk_loader(self.hepmc_paths, chunk_events)
+        return None
+
+    def _chunk_cache_prefix(self, chunk_events: int) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        if self.events_df is not None:
+            key = f"df-{self.df_cache_key or _fingerprint_df(self.events_df)}"
+        else:
+            key = f"hepmc-{_fingerprint_paths(self.hepmc_paths)}"
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return os.path.join(self.cache_dir, f"{key}_c{chunk_events}")
+
+    def iter_bundles(self, chunk_events: Optional[int] = None) -> Iterator[Dict[str, pd.DataFrame]]:
+        """
+        Stream partial bundles, each built from chunk_events consecutive events: peak memory follows
+        the chunk, not the sample. Concatenating the partial tables gives the materialize() bundle.
+
+        With a cache_dir, chunk bundles are spilled to disk and a later run replays them one at a time.
+        Sources without a chunked input (ready_bundle, or hepmc_loader only) yield materialize() once.
+        """
+        chunk_events = int(chunk_events or self.chunk_events or 0)
+        frames = self._event_frames(chunk_events) if chunk_events > 0 else None
+        if frames is None:
+            yield self.materialize()
+            return
+
+        prefix = self._chunk_cache_prefix(chunk_events)
+        manifest = f"{prefix}_chunks.txt" if prefix else None
+        # Same lock as materialize: one worker spills the chunks, the others wait and replay them.
+        with cache_build_lock(manifest):
+            replay = bool(manifest) and not self.force_recompute and os.path.exists(manifest)
+            if not replay:
+                n_chunks = 0
+                for df in frames:
+                    bundle = self._bundle_of(df)
+                    del df
+                    if prefix:
+                        BundleIO.save_bundle(bundle, f"{prefix}_chunk{n_chunks:05d}_bundle.cols", self.cache_compression)
+                    n_chunks += 1
+                    yield bundle
+
+                # the manifest marks a complete spill (written last, atomically)
+                if manifest:
+                    tmp = f"{manifest}.{os.getpid()}.tmp"
+                    with open(tmp, "w") as fh:
+                        fh.write(str(n_chunks))
+                    os.replace(tmp, manifest)
+                return
+
+        with open(manifest) as fh:
+            n_chunks = int(fh.read().strip() or 0)
+        for i in range(n_chunks):
+            yield BundleIO.load_bundle(self._readable(f"{prefix}_chunk{i:05d}_bundle.cols"))
+
     @classmethod
     def from_bundle_dict(cls, bundle: Dict[str, pd.DataFrame]) -> "EventsBundleSource":
         return cls(ready_bundle=bundle)
@@ -153,6 +298,7 @@ class EventsBundleSource:
         cache_dir: Optional[str] = None,
         df_cache_key: Optional[str] = None,
         force_recompute: bool = False,
+        cache_compression: Optional[str] = None,
     ) -> "EventsBundleSource":
         return cls(
             events_df=df,
@@ -160,6 +306,7 @@ class EventsBundleSource:
             cache_dir=cache_dir,
             df_cache_key=df_cache_key,
             force_recompute=force_recompute,
+            cache_compression=cache_compression,
         )
 
     @classmethod
@@ -170,6 +317,7 @@ class EventsBundleSource:
         cfg: Optional[SourceConfig] = None,
         cache_dir: Optional[str] = None,
         force_recompute: bool = False,
+        cache_compression: Optional[str] = None,
     ) -> "EventsBundleSource":
         return cls(
             hepmc_paths=hepmc_paths,
@@ -177,4 +325,27 @@ class EventsBundleSource:
             cfg=cfg or SourceConfig(),
             cache_dir=cache_dir,
             force_recompute=force_recompute,
+            cache_compression=cache_compression,
+        )
+
+    @classmethod
+    def from_hepmc_chunks(
+        cls,
+        hepmc_paths: List[str],
+        hepmc_chunk_loader: HepmcChunkLoader,
+        chunk_events: int,
+        cfg: Optional[SourceConfig] = None,
+        cache_dir: Optional[str] = None,
+        force_recompute: bool = False,
+        cache_compression: Optional[str] = None,
+    ) -> "EventsBundleSource":
+        """Streaming source: use iter_bundles() / SelectionPipeline.run_streaming()."""
+        return cls(
+            hepmc_paths=hepmc_paths,
+            hepmc_chunk_loader=hepmc_chunk_loader,
+            chunk_events=chunk_events,
+            cfg=cfg or SourceConfig(),
+            cache_dir=cache_dir,
+            force_recompute=force_recompute,
+            cache_compression=cache_compression,
         )
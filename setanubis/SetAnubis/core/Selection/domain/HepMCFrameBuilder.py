@@ -1,11 +1,17 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Iterable, Tuple, List, Dict, Any, Optional, Callable, Set
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from typing import Iterable, Iterator, Tuple, List, Dict, Any, Optional, Callable, Sequence, Set, Union
+import copy
+import itertools
 import math
+import multiprocessing
 import numpy as np
 import pandas as pd
 
 from SetAnubis.core.ModelCore.adapters.input.SetAnubisInteface import SetAnubisInterface
+from SetAnubis.core.Selection.domain.pid_table import PidPropertyTable, UNKNOWN_CHARGE
+from SetAnubis.core.Selection.domain.hepmc_index import HepmcEventIndex
 Four = Tuple[float, float, float, float]
 
 
@@ -17,6 +23,134 @@ class HepmcFrameOptions:
     progress_every: Optional[int] = 100      # None -> No callback
     stop_after_events: Optional[int] = None  # safety limitation
     compute_met: bool = False                # if None, 0 everywhere
+    numpy_fast_path: bool = True             # columnar mode: read pyhepmc events through their array accessors
+
+
+class _GrowableBuffer:
+    """Typed 1D numpy buffer with amortised O(1) appends (capacity doubling)."""
+
+    def __init__(self, dtype: Any, capacity: int = 1024) -> None:
+        self._data = np.empty(max(int(capacity), 1), dtype=dtype)
+        self.size = 0
+
+    def extend(self, values: Any) -> None:
+        values = np.asarray(values, dtype=self._data.dtype)
+        need = self.size + values.size
+        if need > self._data.size:
+            grown = np.empty(max(need, 2 * self._data.size), dtype=self._data.dtype)
+            grown[: self.size] = self._data[: self.size]
+            self._data = grown
+        self._data[self.size: need] = values
+        self.size = need
+
+    def finish(self) -> np.ndarray:
+        return self._data[: self.size].copy()
+
+
+def _split_csr(offsets: np.ndarray, ids: np.ndarray) -> List[List[int]]:
+    flat = ids.tolist()
+    bounds = offsets.tolist()
+    return [flat[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+@dataclass
+class HepmcColumns:
+    """
+    Columnar output of HepmcFrameBuilder.build_columnar_from_events.
+      - particles : one row per particle, only numeric columns (vertices split in *_x/_y/_z/_t).
+      - parent/children ids of particle i : parent_ids[parent_offsets[i]:parent_offsets[i+1]] (same for children).
+    """
+    particles: pd.DataFrame
+    parent_offsets: np.ndarray
+    parent_ids: np.ndarray
+    children_offsets: np.ndarray
+    children_ids: np.ndarray
+
+    def parents_of(self, i: int) -> np.ndarray:
+        return self.parent_ids[self.parent_offsets[i]: self.parent_offsets[i + 1]]
+
+    def children_of(self, i: int) -> np.ndarray:
+        return self.children_ids[self.children_offsets[i]: self.children_offsets[i + 1]]
+
+    def to_legacy_frame(self) -> pd.DataFrame:
+        """Same layout as build_from_events: 4-tuple vertices and list-valued parent/children columns."""
+        df = self.particles
+        out = {}
+        for c in HepmcFrameBuilder.COLUMNS:
+            if c in ("prodVertex", "decayVertex"):
+                xyzt = df[[f"{c}_x", f"{c}_y", f"{c}_z", f"{c}_t"]].to_numpy()
+                out[c] = list(map(tuple, xyzt.tolist()))
+            elif c == "parentIndices":
+                out[c] = _split_csr(self.parent_offsets, self.parent_ids)
+            elif c == "childrenIndices":
+                out[c] = _split_csr(self.children_offsets, self.children_ids)
+            else:
+                out[c] = df[c].to_numpy()
+        return pd.DataFrame(out)
+
+    def to_tables(self) -> Dict[str, pd.DataFrame]:
+        """particles + one single-column table per CSR array (bundle_store.write_bundle layout)."""
+        tables = {"particles": self.particles}
+        for name in ("parent_offsets", "parent_ids", "children_offsets", "children_ids"):
+            tables[name] = pd.DataFrame({name: getattr(self, name)})
+        return tables
+
+    @classmethod
+    def from_tables(cls, tables: Dict[str, pd.DataFrame], columns: Optional[Sequence[str]] = None) -> "HepmcColumns":
+        """Inverse of to_tables; `columns` keeps only some particle columns."""
+        particles = tables["particles"] if columns is None else tables["particles"][list(columns)]
+        links = {name: tables[name][name].to_numpy()
+                 for name in ("parent_offsets", "parent_ids", "children_offsets", "children_ids")}
+        return cls(particles=particles, **links)
+
+    @classmethod
+    def concat(cls, parts: Sequence["HepmcColumns"]) -> "HepmcColumns":
+        particles = pd.concat([c.particles for c in parts], ignore_index=True)
+        n_par = particles["nParents"].to_numpy()
+        n_ch = particles["nChildren"].to_numpy()
+        return cls(
+            particles=particles,
+            parent_offsets=np.concatenate([[0], np.cumsum(n_par)]).astype(np.int64),
+            parent_ids=np.concatenate([c.parent_ids for c in parts]).astype(np.int64),
+            children_offsets=np.concatenate([[0], np.cumsum(n_ch)]).astype(np.int64),
+            children_ids=np.concatenate([c.children_ids for c in parts]).astype(np.int64),
+        )
+
+
+Frame = Union[pd.DataFrame, HepmcColumns]
+
+
+def _build_runs(
+    builder: "HepmcFrameBuilder",
+    index: HepmcEventIndex,
+    runs: List[Tuple[int, int]],
+    columnar: bool,
+) -> Tuple[Optional[Frame], List[int], int]:
+    """Parse contiguous event runs of an indexed file (in the caller or in a pool worker)."""
+    parts: List[Frame] = []
+    unknown: Set[int] = set()
+    n_events = 0
+    for start, stop in runs:
+        events = index.iter_events(start, stop)
+        frame, unk = builder.build_columnar_from_events(events) if columnar else builder.build_from_events(events)
+        # event numbers are positions in the file
+        df = frame.particles if columnar else frame
+        df["eventNumber"] = df["eventNumber"].to_numpy() + start
+        parts.append(frame)
+        unknown.update(unk)
+        n_events += stop - start
+    if not parts:
+        return None, [], 0
+    merged = HepmcColumns.concat(parts) if columnar else pd.concat(parts, ignore_index=True)
+    return merged, sorted(unknown), n_events
+
+
+def _iter_file_events(hepmc_paths: Sequence[str]) -> Iterator[Any]:
+    import pyhepmc
+
+    for path in hepmc_paths:
+        with pyhepmc.open(path) as stream:
+            yield from stream
 
 
 class HepmcFrameBuilder:
@@ -40,16 +174,34 @@ class HepmcFrameBuilder:
         "weight", "status", "ctau"
     ]
 
+    # Columnar mode: numeric dtypes per column; vertices split, parents/children kept as CSR arrays.
+    COLUMNAR_DTYPES: Dict[str, Any] = {
+        "eventNumber": np.int64, "particleIndex": np.int64,
+        "px": np.float64, "py": np.float64, "pz": np.float64, "pt": np.float64, "E": np.float64, "mass": np.float64,
+        "prodVertex_x": np.float64, "prodVertex_y": np.float64, "prodVertex_z": np.float64, "prodVertex_t": np.float64,
+        "prodVertexDist": np.float64,
+        "decayVertex_x": np.float64, "decayVertex_y": np.float64, "decayVertex_z": np.float64, "decayVertex_t": np.float64,
+        "decayVertexDist": np.float64,
+        "boost": np.float64, "phi": np.float64, "eta": np.float64, "METx": np.float64, "METy": np.float64,
+        "MET": np.float64, "theta": np.float64, "beta": np.float64,
+        "PID": np.int64, "charge": np.float64, "nParents": np.int64, "nChildren": np.int64,
+        "weight": np.float64, "status": np.int64, "ctau": np.float64,
+    }
+    COLUMNAR_BLOCK_EVENTS = 256
+
     def __init__(
         self,
         neo_manager : SetAnubisInterface,
         *,
         options: HepmcFrameOptions = HepmcFrameOptions(),
         progress_hook: Optional[Callable[[int], None]] = None,
+        pid_table: Optional[PidPropertyTable] = None,
     ) -> None:
         self.neo : SetAnubisInterface = neo_manager
         self.opt = options
         self.progress_hook = progress_hook
+        # charge/mass per PID, resolved once per model (share it between builders of the same model)
+        self.pid_table = pid_table if pid_table is not None else PidPropertyTable(neo_manager)
 
 
     def build_from_events(self, events: Iterable[Any]) -> Tuple[pd.DataFrame, List[int]]:
@@ -151,6 +303,329 @@ class HepmcFrameBuilder:
 
         return df, sorted(unknown_pids)
 
+    def build_from_file(
+        self,
+        path: str,
+        *,
+        n_workers: int = 1,
+        columnar: bool = False,
+        events: Optional[Sequence[int]] = None,
+        index: Optional[HepmcEventIndex] = None,
+        mp_context: Optional[str] = None,
+    ) -> Tuple[Frame, List[int]]:
+        """
+        Build the frame of an uncompressed ASCII HepMC file through its byte-offset event index
+        (HepmcEventIndex, stored next to the file and reused by later runs).
+
+        n_workers > 1 parses contiguous event ranges in a local process pool. `events` restricts the
+        build to the given event positions (e.g. index.sample(n)); stop_after_events keeps the first ones.
+        eventNumber is always the position of the event in the file, whatever the split.
+
+        Returns:
+            (df, unknown_pids), or (HepmcColumns, unknown_pids) with columnar=True.
+        """
+        if index is None:
+            index = HepmcEventIndex.load_or_build(path)
+        selected = np.arange(len(index)) if events is None else np.unique(np.asarray(events, dtype=np.int64))
+        if self.opt.stop_after_events is not None:
+            selected = selected[: self.opt.stop_after_events]
+
+        worker = self._unbounded_copy()
+        groups = index.split(max(int(n_workers), 1), selected)
+        results: List[Tuple[int, Tuple[Optional[Frame], List[int], int]]] = []
+        done = 0
+        if n_workers <= 1 or len(groups) <= 1:
+            for g, runs in enumerate(groups):
+                results.append((g, _build_runs(worker, index, runs, columnar)))
+                done += results[-1][1][2]
+                if self.progress_hook:
+                    self.progress_hook(done)
+        else:
+            ctx = multiprocessing.get_context(mp_context) if mp_context else None
+            with ProcessPoolExecutor(max_workers=min(int(n_workers), len(groups)), mp_context=ctx) as pool:
+                futures = {pool.submit(_build_runs, worker, index, runs, columnar): g for g, runs in enumerate(groups)}
+                for fut in as_completed(futures):
+                    results.append((futures[fut], fut.result()))
+                    done += results[-1][1][2]
+                    if self.progress_hook:
+                        self.progress_hook(done)
+
+        results.sort(key=lambda r: r[0])
+        frames = [frame for _, (frame, _, _) in results if frame is not None]
+        unknown = sorted({pid for _, (_, unk, _) in results for pid in unk})
+        if not frames:
+            return (self.build_columnar_from_events([]) if columnar else self.build_from_events([]))[0], unknown
+        merged = HepmcColumns.concat(frames) if columnar else pd.concat(frames, ignore_index=True)
+        return merged, unknown
+
+    def _unbounded_copy(self) -> "HepmcFrameBuilder":
+        """Copy building whatever it is given: the caller applies stop_after_events, callbacks stay with it."""
+        worker = copy.copy(self)
+        worker.opt = replace(self.opt, stop_after_events=None)
+        worker.progress_hook = None
+        return worker
+
+    def iter_frames(
+        self,
+        events: Iterable[Any],
+        chunk_events: int,
+        *,
+        first_event: int = 0,
+        first_row: int = 0,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        build_from_events on consecutive chunks of chunk_events events, one frame alive at a time.
+        eventNumber and the row index continue from chunk to chunk (starting at first_event/first_row),
+        so concatenating the chunks gives the frame of a single build.
+        """
+        if chunk_events <= 0:
+            raise ValueError("chunk_events must be positive.")
+        worker = self._unbounded_copy()
+        it = iter(events)
+        if self.opt.stop_after_events is not None:
+            it = itertools.islice(it, self.opt.stop_after_events)
+        while True:
+            chunk = list(itertools.islice(it, chunk_events))
+            if not chunk:
+                return
+            df, _ = worker.build_from_events(chunk)
+            df["eventNumber"] = df["eventNumber"].to_numpy() + first_event
+            df.index = pd.RangeIndex(first_row, first_row + len(df))
+            first_event += len(chunk)
+            first_row += len(df)
+            if self.progress_hook:
+                self.progress_hook(first_event)
+            yield df
+
+    def iter_frames_from_files(self, hepmc_paths: Sequence[str], chunk_events: int) -> Iterator[pd.DataFrame]:
+        """iter_frames over several HepMC files read one after the other (numbering continues across files)."""
+        return self.iter_frames(_iter_file_events(hepmc_paths), chunk_events)
+
+    def build_columnar_from_events(self, events: Iterable[Any]) -> Tuple[HepmcColumns, List[int]]:
+        """
+        Same content as build_from_events, written into typed growable numpy buffers:
+        no object column, vertices as float64 x/y/z/t, parents/children as offsets + flat ids.
+
+        Each event is read as arrays (pyhepmc `numpy` accessors + GenEventData links when available,
+        particle objects otherwise); kinematics and charges are then derived with whole-array operations
+        on blocks of COLUMNAR_BLOCK_EVENTS events.
+
+        Returns:
+            (HepmcColumns, unknown_pids). Missing status/id are stored as -1, a missing pid as 0,
+            unknown charges as the UNKNOWN_CHARGE sentinel (-0.555) that LLPAnalyzer excludes.
+        """
+        names = list(self.COLUMNAR_DTYPES)
+        buffers = {c: _GrowableBuffer(dt) for c, dt in self.COLUMNAR_DTYPES.items()}
+        parent_ids, children_ids = _GrowableBuffer(np.int64), _GrowableBuffer(np.int64)
+        unknown_pids: Set[int] = set()
+
+        def flush(block: List[Dict[str, np.ndarray]]) -> None:
+            raw = {k: np.concatenate([r[k] for r in block]) for k in block[0]}
+            cols = self._derive_columns(raw)
+            pids = cols["PID"]
+            known, charges, _ = self.pid_table.lookup(pids)
+            cols["charge"] = np.where(known, charges, UNKNOWN_CHARGE)
+            unknown_pids.update(int(x) for x in np.unique(pids[~known & (pids != 0)]))
+            for c in names:
+                buffers[c].extend(cols[c])
+            parent_ids.extend(raw["parentIds"])
+            children_ids.extend(raw["childrenIds"])
+            block.clear()
+
+        block: List[Dict[str, np.ndarray]] = []
+        event_number = 0
+        for event in events:
+            if self.opt.stop_after_events is not None and event_number >= self.opt.stop_after_events:
+                break
+
+            raw = self._read_event_arrays(event) if self.opt.numpy_fast_path else None
+            if raw is None:
+                raw = self._read_event_objects(event)
+            n = raw["px"].size
+            raw["eventNumber"] = np.full(n, event_number, dtype=np.int64)
+            raw["weight"] = np.full(n, self._get_event_weight(event))
+            block.append(raw)
+            if len(block) >= self.COLUMNAR_BLOCK_EVENTS:
+                flush(block)
+
+            event_number += 1
+            if self.opt.progress_every and self.progress_hook and (event_number % self.opt.progress_every == 0):
+                self.progress_hook(event_number)
+        if block:
+            flush(block)
+
+        particles = pd.DataFrame({c: buffers[c].finish() for c in names})
+        n_par = particles["nParents"].to_numpy()
+        n_ch = particles["nChildren"].to_numpy()
+        return HepmcColumns(
+            particles=particles,
+            parent_offsets=np.concatenate([[0], np.cumsum(n_par)]).astype(np.int64),
+            parent_ids=parent_ids.finish(),
+            children_offsets=np.concatenate([[0], np.cumsum(n_ch)]).astype(np.int64),
+            children_ids=children_ids.finish(),
+        ), sorted(unknown_pids)
+
+    def _read_event_arrays(self, event: Any) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Raw per-particle arrays of a pyhepmc event without touching particle objects.
+        None when the event does not expose the pyhepmc array API (caller falls back to objects).
+        """
+        api = getattr(event, "numpy", None)
+        if api is None or not hasattr(event, "write_data"):
+            return None
+        try:
+            from pyhepmc import GenEventData
+        except ImportError:
+            return None
+
+        part, vert = api.particles, api.vertices
+        n = len(part.pid)
+        # links: (particle > 0, vertex < 0) particle enters the vertex; (vertex < 0, particle > 0) vertex produces it
+        data = GenEventData()
+        event.write_data(data)
+        l1, l2 = np.asarray(data.links1, dtype=np.int64), np.asarray(data.links2, dtype=np.int64)
+        ins, outs = (l1 > 0) & (l2 < 0), (l1 < 0) & (l2 > 0)
+        in_part, in_vtx = l1[ins], -l2[ins] - 1
+        out_part, out_vtx = l2[outs], -l1[outs] - 1
+
+        n_vtx = len(vert.x)
+        vpos = np.stack([np.asarray(vert.x, dtype=float), np.asarray(vert.y, dtype=float),
+                         np.asarray(vert.z, dtype=float), np.asarray(vert.t, dtype=float)], axis=1)
+
+        prod = np.full(n, -1, dtype=np.int64)
+        prod[out_part - 1] = out_vtx
+        end = np.full(n, -1, dtype=np.int64)
+        end[in_part - 1] = in_vtx
+
+        # particles without production vertex hang from the root vertex, located at the event position
+        root = self._event_position(event)
+        prod_v = np.where((prod >= 0)[:, None], vpos[np.maximum(prod, 0)] if n_vtx else root, root)
+        end_v = np.where((end >= 0)[:, None], vpos[np.maximum(end, 0)] if n_vtx else -1.0, -1.0)
+
+        parent_n, parent_ids = self._gather_by_vertex(in_vtx, in_part, prod, n_vtx)
+        child_n, child_ids = self._gather_by_vertex(out_vtx, out_part, end, n_vtx)
+
+        return {
+            "particleIndex": np.asarray(part.id, dtype=np.int64),
+            "px": np.asarray(part.px, dtype=float), "py": np.asarray(part.py, dtype=float),
+            "pz": np.asarray(part.pz, dtype=float), "E": np.asarray(part.e, dtype=float),
+            "mass": np.asarray(part.generated_mass, dtype=float),
+            "prodVertex": prod_v, "hasProdVertex": np.ones(n, dtype=bool),
+            "decayVertex": end_v, "hasDecayVertex": end >= 0,
+            "PID": np.asarray(part.pid, dtype=np.int64), "status": np.asarray(part.status, dtype=np.int64),
+            "nParents": parent_n, "parentIds": parent_ids,
+            "nChildren": child_n, "childrenIds": child_ids,
+        }
+
+    @staticmethod
+    def _gather_by_vertex(link_vtx: np.ndarray, link_part: np.ndarray, vtx_of: np.ndarray, n_vtx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """For every particle, the particles linked to its vertex vtx_of[i] (-1: none), in link order."""
+        order = np.argsort(link_vtx, kind="stable")
+        sorted_part = link_part[order]
+        per_vtx = np.bincount(link_vtx, minlength=n_vtx) if n_vtx else np.zeros(0, dtype=np.int64)
+        start = np.concatenate([[0], np.cumsum(per_vtx)[:-1]]) if n_vtx else per_vtx
+        has = vtx_of >= 0
+        counts = np.where(has, per_vtx[np.maximum(vtx_of, 0)] if n_vtx else 0, 0).astype(np.int64)
+        first = np.where(has, start[np.maximum(vtx_of, 0)] if n_vtx else 0, 0)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        gather = np.repeat(first - offsets[:-1], counts) + np.arange(offsets[-1])
+        return counts, sorted_part[gather]
+
+    @staticmethod
+    def _event_position(event: Any) -> np.ndarray:
+        pos = getattr(event, "event_pos", None)
+        pos = pos() if callable(pos) else pos
+        if pos is None:
+            return np.zeros(4)
+        return np.array([float(pos.x), float(pos.y), float(pos.z), float(pos.t)])
+
+    def _read_event_objects(self, event: Any) -> Dict[str, np.ndarray]:
+        """Raw per-particle arrays read from particle objects (any pyhepmc-like event)."""
+        mom, mass, ids, pids, status = [], [], [], [], []
+        prod_v, has_prod, end_v, has_end = [], [], [], []
+        n_par, n_ch, par_ids, ch_ids = [], [], [], []
+        for p in event.particles:
+            px, py, pz, E = self._get_momentum(p)
+            mom.append((px, py, pz, E))
+            mass.append(self._get_mass(p, E, math.sqrt(px*px + py*py + pz*pz)))
+            for vtx, out, has in ((getattr(p, "production_vertex", None), prod_v, has_prod),
+                                  (getattr(p, "end_vertex", None), end_v, has_end)):
+                ok = vtx is not None and getattr(vtx, "position", None) is not None
+                out.append((float(vtx.position.x), float(vtx.position.y), float(vtx.position.z), float(vtx.position.t)) if ok else (0.0,) * 4)
+                has.append(ok)
+
+            parents, children = getattr(p, "parents", []), getattr(p, "children", [])
+            n_par.append(len(parents) if parents else 0)
+            n_ch.append(len(children) if children else 0)
+            if parents:
+                par_ids.extend(x.id for x in parents)
+            if children:
+                ch_ids.extend(x.id for x in children)
+
+            idx, pid, st = getattr(p, "id", None), getattr(p, "pid", None), getattr(p, "status", None)
+            ids.append(-1 if idx is None else idx)
+            pids.append(0 if pid is None else pid)
+            status.append(-1 if st is None else st)
+
+        mom_arr = np.asarray(mom, dtype=float).reshape(-1, 4)
+        has_end_arr = np.asarray(has_end, dtype=bool)
+        return {
+            "particleIndex": np.asarray(ids, dtype=np.int64),
+            "px": mom_arr[:, 0], "py": mom_arr[:, 1], "pz": mom_arr[:, 2], "E": mom_arr[:, 3],
+            "mass": np.asarray(mass, dtype=float),
+            "prodVertex": np.asarray(prod_v, dtype=float).reshape(-1, 4), "hasProdVertex": np.asarray(has_prod, dtype=bool),
+            "decayVertex": np.where(has_end_arr[:, None], np.asarray(end_v, dtype=float).reshape(-1, 4), -1.0),
+            "hasDecayVertex": has_end_arr,
+            "PID": np.asarray(pids, dtype=np.int64), "status": np.asarray(status, dtype=np.int64),
+            "nParents": np.asarray(n_par, dtype=np.int64), "parentIds": np.asarray(par_ids, dtype=np.int64),
+            "nChildren": np.asarray(n_ch, dtype=np.int64), "childrenIds": np.asarray(ch_ids, dtype=np.int64),
+        }
+
+    def _derive_columns(self, raw: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Array version of the per-particle kinematics of build_from_events (same conventions)."""
+        px, py, pz, E, mass = raw["px"], raw["py"], raw["pz"], raw["E"], raw["mass"]
+        n = px.size
+        pt = np.hypot(px, py)
+        pabs = np.sqrt(px*px + py*py + pz*pz)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            phi = np.arctan2(py, px)
+            phi = np.where(np.isclose(phi, -np.pi), np.pi, phi)
+
+            theta = np.where(pabs != 0.0, np.arccos(np.clip(pz / pabs, -1.0, 1.0)), 0.0)
+
+            # eta: longitudinal particles get sign(pz)*1E9, finite values clipped to +-1E9
+            longitudinal = (pabs - pz == 0) | (pabs + pz == 0)
+            eta = np.where(longitudinal, np.sign(pz) * 1E9, 0.5 * np.log((pabs + pz) / (pabs - pz)))
+            eta = np.clip(eta, -1E9, 1E9)
+
+            beta = np.where(E > 0.0, np.clip(pabs / E, 0.0, 0.999999999999), 0.0)
+            inv = 1.0 - beta*beta
+            gamma = np.where(beta <= 0.0, 1.0, np.where(inv > 0.0, 1.0 / np.sqrt(inv), np.inf))
+            boost = np.where(mass == 0, np.nan, np.sqrt(pabs*pabs + mass*mass) / mass)
+
+            prod_v = np.where(raw["hasProdVertex"][:, None], raw["prodVertex"], 0.0)
+            end_v = raw["decayVertex"]
+            prod_r = np.where(raw["hasProdVertex"], np.sqrt((prod_v[:, :3] ** 2).sum(axis=1)), 0.0)
+            end_r = np.where(raw["hasDecayVertex"], np.sqrt((end_v[:, :3] ** 2).sum(axis=1)), 0.0)
+
+            denom = gamma * beta
+            ctau = np.where((denom > 0.0) & np.isfinite(denom), end_r / denom, 0.0)
+
+        cols: Dict[str, np.ndarray] = {
+            "eventNumber": raw["eventNumber"], "particleIndex": raw["particleIndex"], "weight": raw["weight"],
+            "px": px, "py": py, "pz": pz, "pt": pt, "E": E, "mass": mass,
+            "prodVertexDist": prod_r, "decayVertexDist": end_r,
+            "boost": boost, "phi": phi, "eta": eta, "theta": theta, "beta": beta,
+            "METx": np.zeros(n), "METy": np.zeros(n), "MET": np.zeros(n),
+            "PID": raw["PID"], "status": raw["status"],
+            "nParents": raw["nParents"], "nChildren": raw["nChildren"], "ctau": ctau,
+        }
+        for k, axis in enumerate("xyzt"):
+            cols[f"prodVertex_{axis}"] = prod_v[:, k]
+            cols[f"decayVertex_{axis}"] = end_v[:, k]
+        return cols
+
     def _get_momentum(self, p: Any) -> Tuple[float, float, float, float]:
         mom = getattr(p, "momentum", None)
         if mom is None:
@@ -253,18 +728,9 @@ class HepmcFrameBuilder:
         return w if w is not None else 1.0
 
     def _get_charge_from_neo(self, pid: Optional[int], unknown_pids: Set[int]) -> Optional[float]:
-        info = self.neo.get_particle(pid) if hasattr(self.neo, "get_particle") else self.neo.get_particle_info(pid)
         if pid is None:
             return None
-        try:
-            info = self.neo.get_particle(pid) if hasattr(self.neo, "get_particle") else self.neo.get_particle_info(pid)
-        except Exception:
-            info = None
-        if isinstance(info, dict) and "charge" in info:
-            ch = info["charge"]
-            try:
-                return float(ch)
-            except Exception:
-                return None
-        unknown_pids.add(int(pid))
-        return None
+        charge = self.pid_table.charge(pid)
+        if charge is None:
+            unknown_pids.add(int(pid))
+        return charge
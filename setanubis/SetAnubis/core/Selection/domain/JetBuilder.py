@@ -1,6 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -44,6 +44,56 @@ class JetClustering:
         seq = fastjet._pyjet.AwkwardClusterSequence(ak_arr, self._def)
         return seq.inclusive_jets()
 
+    def cluster_events(
+        self,
+        px: np.ndarray,
+        py: np.ndarray,
+        pz: np.ndarray,
+        E: np.ndarray,
+        offsets: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Cluster many events in one fastjet call.
+        Constituents of event i are rows offsets[i]:offsets[i+1] of the flat arrays.
+        Return flat jet (px, py, pz, E) and jet offsets per event, jets in inclusive_jets order.
+        """
+        offsets = np.asarray(offsets, dtype=np.int64)
+        counts = np.diff(offsets)
+        if counts.size == 0 or offsets[-1] == 0:
+            empty = np.zeros(0, dtype=float)
+            return empty, empty, empty, empty, np.zeros(counts.size + 1, dtype=np.int64)
+
+        flat = ak.zip({
+            "px": np.asarray(px, dtype=float), "py": np.asarray(py, dtype=float),
+            "pz": np.asarray(pz, dtype=float), "E": np.asarray(E, dtype=float),
+        })
+        jets = fastjet.ClusterSequence(ak.unflatten(flat, counts), self._def).inclusive_jets()
+
+        jet_offsets = np.zeros(counts.size + 1, dtype=np.int64)
+        np.cumsum(ak.to_numpy(ak.num(jets)), out=jet_offsets[1:])
+        flat_jets = ak.flatten(jets)
+        return (
+            ak.to_numpy(flat_jets["px"]).astype(float),
+            ak.to_numpy(flat_jets["py"]).astype(float),
+            ak.to_numpy(flat_jets["pz"]).astype(float),
+            ak.to_numpy(flat_jets["E"]).astype(float),
+            jet_offsets,
+        )
+
+
+
+@dataclass(frozen=True)
+class _Constituents:
+    """Jet constituents sorted by event: rows start[i]:stop[i] belong to events[i] (sorted, unique)."""
+    events: np.ndarray
+    start: np.ndarray
+    stop: np.ndarray
+    px: np.ndarray
+    py: np.ndarray
+    pz: np.ndarray
+    E: np.ndarray
+    weight: np.ndarray
+    has_weight: np.ndarray
 
 
 class JetDFBuilder:
@@ -109,30 +159,49 @@ class JetDFBuilder:
 
 
     @staticmethod
-    def _group_by_event(df: pd.DataFrame) -> Dict[int, pd.DataFrame]:
+    def _constituent_table(df: pd.DataFrame, source: int) -> Optional[pd.DataFrame]:
         if df is None or df.empty:
-            return {}
-        return {int(k): v for k, v in df.groupby("eventNumber", sort=False)}
-
-    @staticmethod
-    def _event_weight(charged: pd.DataFrame, neutral: pd.DataFrame) -> float:
-        has_c = charged is not None and not charged.empty and ("weight" in charged.columns)
-        has_n = neutral is not None and not neutral.empty and ("weight" in neutral.columns)
-        if not (has_c or has_n):
-            return float("nan")
-
-        parts = []
-        if has_c:
-            parts.append(charged["weight"])
-        if has_n:
-            parts.append(neutral["weight"])
-
-        w = pd.concat(parts, ignore_index=True)
-        if w.empty:
-            return float("nan")
-        uniq = pd.unique(w.to_numpy())
-        return float(uniq[0])
+            return None
+        has_w = "weight" in df.columns
+        return pd.DataFrame({
+            "eventNumber": df["eventNumber"].to_numpy().astype(np.int64),
+            "px": df["px"].to_numpy(dtype=float), "py": df["py"].to_numpy(dtype=float),
+            "pz": df["pz"].to_numpy(dtype=float), "E": df["E"].to_numpy(dtype=float),
+            "weight": df["weight"].to_numpy(dtype=float) if has_w else np.full(len(df), np.nan),
+            "hasWeight": np.full(len(df), has_w),
+            "source": np.full(len(df), source, dtype=np.int8),
+        })
 
+    @classmethod
+    def _grouped_constituents(
+        cls,
+        charged_final_states: pd.DataFrame,
+        neutral_final_states: pd.DataFrame,
+        events: Optional[np.ndarray] = None,
+    ) -> Optional[_Constituents]:
+        """
+        Constituents sorted by event (charged before neutral, input order kept), restricted to `events`
+        if given. None if there are none.
+        """
+        parts = [t for t in (cls._constituent_table(charged_final_states, 0),
+                             cls._constituent_table(neutral_final_states, 1)) if t is not None]
+        if not parts:
+            return None
+        const = pd.concat(parts, ignore_index=True)
+        if events is not None:
+            const = const[const["eventNumber"].isin(events)]
+        if const.empty:
+            return None
+
+        const = const.sort_values(["eventNumber", "source"], kind="stable")
+        ev_sorted = const["eventNumber"].to_numpy()
+        uniq, start = np.unique(ev_sorted, return_index=True)
+        return _Constituents(
+            events=uniq, start=start, stop=np.append(start[1:], len(ev_sorted)),
+            px=const["px"].to_numpy(), py=const["py"].to_numpy(),
+            pz=const["pz"].to_numpy(), E=const["E"].to_numpy(),
+            weight=const["weight"].to_numpy(), has_weight=const["hasWeight"].to_numpy(),
+        )
 
     def build(
         self,
@@ -140,102 +209,112 @@ class JetDFBuilder:
         charged_final_states: pd.DataFrame,
         neutral_final_states: pd.DataFrame,
     ) -> pd.DataFrame:
-        # Pre-group to avoid O(N) search for each events
-        c_groups = self._group_by_event(charged_final_states)
-        n_groups = self._group_by_event(neutral_final_states)
-
-        # buffers (faster than append on DataFrame)
-        out_event   = []
-        out_p       = []
-        out_pt      = []
-        out_px      = []
-        out_py      = []
-        out_pz      = []
-        out_E       = []
-        out_eta     = []
-        out_phi     = []
-        out_weight  = []
-
-        for ev in event_numbers:
-            ev = int(ev)
-            cdf = c_groups.get(ev)
-            ndf = n_groups.get(ev)
-
-            if (cdf is None or cdf.empty) and (ndf is None or ndf.empty):
-                continue
-
-            if cdf is None or cdf.empty:
-                px = ndf["px"].to_numpy(dtype=float, copy=False)
-                py = ndf["py"].to_numpy(dtype=float, copy=False)
-                pz = ndf["pz"].to_numpy(dtype=float, copy=False)
-                E  = ndf["E" ].to_numpy(dtype=float, copy=False)
-            elif ndf is None or ndf.empty:
-                px = cdf["px"].to_numpy(dtype=float, copy=False)
-                py = cdf["py"].to_numpy(dtype=float, copy=False)
-                pz = cdf["pz"].to_numpy(dtype=float, copy=False)
-                E  = cdf["E" ].to_numpy(dtype=float, copy=False)
-            else:
-                px = np.concatenate([
-                    cdf["px"].to_numpy(dtype=float, copy=False),
-                    ndf["px"].to_numpy(dtype=float, copy=False)
-                ])
-                py = np.concatenate([
-                    cdf["py"].to_numpy(dtype=float, copy=False),
-                    ndf["py"].to_numpy(dtype=float, copy=False)
-                ])
-                pz = np.concatenate([
-                    cdf["pz"].to_numpy(dtype=float, copy=False),
-                    ndf["pz"].to_numpy(dtype=float, copy=False)
-                ])
-                E  = np.concatenate([
-                    cdf["E" ].to_numpy(dtype=float, copy=False),
-                    ndf["E" ].to_numpy(dtype=float, copy=False)
-                ])
-
-            if px.size == 0:
-                continue
-
-            jets = self.clustering.cluster_event(px, py, pz, E)
-            if len(jets) == 0:
-                continue
-
-            w = self._event_weight(cdf, ndf)
-
-            jpx = np.fromiter((j.px for j in jets), count=len(jets), dtype=float)
-            jpy = np.fromiter((j.py for j in jets), count=len(jets), dtype=float)
-            jpz = np.fromiter((j.pz for j in jets), count=len(jets), dtype=float)
-            jE  = np.fromiter((j.E  for j in jets), count=len(jets), dtype=float)
-
-            _, jeta, jphi = self.__to_spherical_vec(jpx, jpy, jpz)
-
-            jpt  = _pt(jpx, jpy)
-            jp   = _p(jpx, jpy, jpz)
-
-            out_event.extend([ev] * len(jets))
-            out_p.extend(jp.tolist())
-            out_pt.extend(jpt.tolist())
-            out_px.extend(jpx.tolist())
-            out_py.extend(jpy.tolist())
-            out_pz.extend(jpz.tolist())
-            out_E.extend(jE.tolist())
-            out_eta.extend(jeta.tolist())
-            out_phi.extend(jphi.tolist())
-            out_weight.extend([w] * len(jets))
+        """
+        Jets of the requested events (in that order), all events clustered in one batched call.
+        Constituents of an event are its charged then its neutral final states; the event weight
+        is the first weight found (charged first), NaN if no table has a weight column.
+        """
+        requested = np.asarray([int(ev) for ev in event_numbers], dtype=np.int64)
+        if requested.size == 0:
+            return self._empty_frame()
+        const = self._grouped_constituents(charged_final_states, neutral_final_states, requested)
+        return self._build_grouped(requested, const)
+
+    def _build_grouped(self, requested: np.ndarray, const: Optional[_Constituents]) -> pd.DataFrame:
+        """build() on constituents already grouped by _grouped_constituents."""
+        if const is None or requested.size == 0:
+            return self._empty_frame()
+        start, stop = const.start, const.stop
+
+        # requested order (duplicates kept), events without constituents dropped
+        pos = np.searchsorted(const.events, requested)
+        found = (pos < const.events.size) & (const.events[np.minimum(pos, const.events.size - 1)] == requested)
+        events, pos = requested[found], pos[found]
+        if events.size == 0:
+            return self._empty_frame()
+        counts = stop[pos] - start[pos]
+        offsets = np.zeros(events.size + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        gather = np.repeat(start[pos] - offsets[:-1], counts) + np.arange(offsets[-1])
+
+        px, py, pz, E = (col[gather] for col in (const.px, const.py, const.pz, const.E))
+        jpx, jpy, jpz, jE, jet_offsets = self.clustering.cluster_events(px, py, pz, E, offsets)
+        n_jets = np.diff(jet_offsets)
+
+        # event weight: first constituent coming from a table with a weight column
+        w_pos = np.flatnonzero(const.has_weight)
+        ev_weight = np.full(pos.size, np.nan)
+        if w_pos.size:
+            first_w = np.searchsorted(w_pos, start[pos])
+            idx = w_pos[np.minimum(first_w, w_pos.size - 1)]
+            ok = (first_w < w_pos.size) & (idx < stop[pos])
+            ev_weight[ok] = const.weight[idx[ok]]
+
+        _, jeta, jphi = self.__to_spherical_vec(jpx, jpy, jpz)
+        return self._jet_frame(
+            np.repeat(events, n_jets), _p(jpx, jpy, jpz), _pt(jpx, jpy), jpx, jpy, jpz, jE, jeta, jphi,
+            np.repeat(ev_weight, n_jets),
+        )
+
+    @classmethod
+    def _empty_frame(cls) -> pd.DataFrame:
+        return cls._jet_frame(*(np.zeros(0),) * 9)
 
+    @staticmethod
+    def _jet_frame(event, p, pt, px, py, pz, E, eta, phi, weight=None) -> pd.DataFrame:
         return pd.DataFrame({
-            "eventNumber": out_event,
-            "p": out_p,
-            "pt": out_pt,
-            "px": out_px,
-            "py": out_py,
-            "pz": out_pz,
-            "E": out_E,
-            "eta": out_eta,
-            "phi": out_phi,
-            "weight": out_weight,
+            "eventNumber": np.asarray(event, dtype=np.int64),
+            "p": p,
+            "pt": pt,
+            "px": px,
+            "py": py,
+            "pz": pz,
+            "E": E,
+            "eta": eta,
+            "phi": phi,
+            "weight": np.zeros(0) if weight is None else weight,
         })
 
 
+class LazyJetTable:
+    """
+    Stand-in for finalStatePromptJets: jets are clustered per event on first request and cached,
+    so only the events that still hold a candidate are ever clustered.
+    The constituents are grouped by event once; each request only gathers the rows of its new events.
+    """
+    def __init__(
+        self,
+        charged_final_states: pd.DataFrame,
+        neutral_final_states: pd.DataFrame,
+        builder: Optional[JetDFBuilder] = None,
+    ) -> None:
+        self.charged = charged_final_states
+        self.neutral = neutral_final_states
+        self.builder = builder or JetDFBuilder()
+        self._const = self.builder._grouped_constituents(self.charged, self.neutral)
+        self._done: set = set()
+        # jets of each request, in clustering order (appended, never concatenated in place)
+        self._parts: List[pd.DataFrame] = []
+
+    @property
+    def n_clustered_events(self) -> int:
+        return len(self._done)
+
+    def for_events(self, event_numbers: Iterable[int]) -> pd.DataFrame:
+        events = np.unique(np.asarray(list(event_numbers), dtype=np.int64))
+        todo = np.asarray([ev for ev in events.tolist() if ev not in self._done], dtype=np.int64)
+        if todo.size:
+            new = self.builder._build_grouped(todo, self._const)
+            if len(new):
+                self._parts.append(new)
+            self._done.update(todo.tolist())
+        hits = [part[part["eventNumber"].isin(events)] for part in self._parts]
+        hits = [h for h in hits if len(h)]
+        if not hits:
+            return JetDFBuilder._empty_frame()
+        return pd.concat(hits, ignore_index=True) if len(hits) > 1 else hits[0]
+
+
 def createJetDF(eventNumbers, chargedFinalStates, neutralFinalStates) -> pd.DataFrame:
 
     builder = JetDFBuilder()
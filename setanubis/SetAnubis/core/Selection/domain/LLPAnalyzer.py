@@ -1,7 +1,9 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from collections.abc import MutableMapping
 from typing import Dict, List, Tuple, Iterable, Optional
 import ast
+import itertools
 import math
 import numpy as np
 import pandas as pd
@@ -21,134 +23,260 @@ class Schema:
     )
 
     @staticmethod
-    def ensure(df: pd.DataFrame) -> None:
-        missing = [c for c in Schema.required if c not in df.columns]
+    def ensure(df: pd.DataFrame, columnar: bool = False) -> None:
+        # columnar input (HepmcColumns): children come from the CSR arrays, not a childrenIndices column
+        required = [c for c in Schema.required if not (columnar and c == "childrenIndices")]
+        missing = [c for c in required if c not in df.columns]
         if missing:
             raise ValueError(f"Colonnes manquantes dans df: {missing}")
 
 
+VERTEX_COLUMNS = ("prodVertex", "decayVertex")
+
+
+def _is_columnar(frame) -> bool:
+    """HepmcColumns (HepmcFrameBuilder.build_columnar_from_events): numeric particles table + CSR links."""
+    return hasattr(frame, "particles") and hasattr(frame, "children_offsets")
+
+
+def _to_list(x) -> List[int]:
+    if isinstance(x, (list, tuple, np.ndarray)):
+        return list(x)
+    if isinstance(x, str):
+        try:
+            v = ast.literal_eval(x)
+            return v if isinstance(v, list) else []
+        except Exception:
+            return []
+    return []
+
+
+def _pair_keys(events: np.ndarray, pidx: np.ndarray) -> np.ndarray:
+    """One int64 per (eventNumber, particleIndex); both fit in 32 bits."""
+    return (np.asarray(events, dtype=np.int64) << 32) + (np.asarray(pidx, dtype=np.int64) + (1 << 31))
+
+
 class EventGraph:
     """
-    Graph representation by event:
-     O(1) access to children of an event/particleIndex 
-     O(1) access if a PID and nChildren of an event/particleIndex 
-     O(1) of the pandas line index from event/particleIndex
+    Array graph of all events, from a DataFrame or a HepmcColumns (its particles table and its
+    children offsets/ids are used as they are). Particle i is row i of df (its global id):
+     - (event, particleIndex) -> row : searchsorted on sorted pair keys
+     - children rows of row i : child_rows[child_offsets[i]:child_offsets[i+1]] (CSR, -1 if not in df)
+     - pid / nchildren : one array each
+    The scalar accessors (row_of, children_of, pid_of, nchildren_of) are kept for single lookups.
     """
-    def __init__(self, df: pd.DataFrame) -> None:
-        Schema.ensure(df)
+    def __init__(self, frame) -> None:
+        columnar = _is_columnar(frame)
+        df = frame.particles if columnar else frame
+        Schema.ensure(df, columnar)
         self.df = df
+        self.labels = df.index.to_numpy()
 
-        self._row_index: Dict[Tuple[int, int], int] = {
-            (int(ev), int(pidx)): int(i)
-            for i, ev, pidx in zip(df.index, df["eventNumber"].to_list(), df["particleIndex"].to_list())
-        }
-
-        def _to_list(x) -> List[int]:
-            if isinstance(x, list):
-                return x
-            if isinstance(x, str):
-                try:
-                    v = ast.literal_eval(x)
-                    return v if isinstance(v, list) else []
-                except Exception:
-                    return []
-            return []
-
-        children_series = df["childrenIndices"].apply(_to_list)
+        events = df["eventNumber"].to_numpy(dtype=np.int64)
+        keys = _pair_keys(events, df["particleIndex"].to_numpy(dtype=np.int64))
+        self._order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[self._order]
 
-        # (event, pidx) -> [child_pidx, etc.]
-        self._children: Dict[Tuple[int, int], List[int]] = {
-            (int(ev), int(pidx)): list(children)
-            for ev, pidx, children in zip(df["eventNumber"].to_list(),
-                                          df["particleIndex"].to_list(),
-                                          children_series.to_list())
-        }
+        self.pid = df["PID"].to_numpy(dtype=np.int64)
+        self.nchildren = pd.to_numeric(df["nChildren"]).fillna(0).to_numpy(dtype=np.int64)
 
-        # (event, pidx) -> PID, nChildren
-        self._pid: Dict[Tuple[int, int], int] = {
-            (int(ev), int(pidx)): int(pid)
-            for ev, pidx, pid in zip(df["eventNumber"].to_list(),
-                                     df["particleIndex"].to_list(),
-                                     df["PID"].to_list())
-        }
-        self._nchildren: Dict[Tuple[int, int], int] = {
-            (int(ev), int(pidx)): int(nc) if not pd.isna(nc) else 0
-            for ev, pidx, nc in zip(df["eventNumber"].to_list(),
-                                    df["particleIndex"].to_list(),
-                                    df["nChildren"].to_list())
-        }
+        if columnar:
+            self.child_offsets = np.asarray(frame.children_offsets, dtype=np.int64)
+            self.child_pidx = np.asarray(frame.children_ids, dtype=np.int64)
+            counts = np.diff(self.child_offsets)
+        else:
+            children = df["childrenIndices"].to_list()
+            if set(map(type, children)) - {list}:
+                children = [_to_list(c) for c in children]
+            counts = np.fromiter(map(len, children), dtype=np.int64, count=len(children))
+            self.child_offsets = np.zeros(len(children) + 1, dtype=np.int64)
+            np.cumsum(counts, out=self.child_offsets[1:])
+            self.child_pidx = np.fromiter(itertools.chain.from_iterable(children), dtype=np.int64, count=int(self.child_offsets[-1]))
+        self.child_rows = self.rows_of(np.repeat(events, counts), self.child_pidx)
+
+    def rows_of(self, events: np.ndarray, pidx: np.ndarray) -> np.ndarray:
+        """Row positions of (event, particleIndex) pairs, -1 when absent (last row wins on duplicates)."""
+        keys = _pair_keys(events, pidx)
+        pos = np.searchsorted(self._sorted_keys, keys, side="right") - 1
+        found = (pos >= 0) & (self._sorted_keys[np.maximum(pos, 0)] == keys) if self._sorted_keys.size else np.zeros(keys.size, bool)
+        return np.where(found, self._order[np.maximum(pos, 0)] if self._sorted_keys.size else -1, -1)
+
+    def _row(self, event: int, pidx: int) -> int:
+        return int(self.rows_of(np.array([event]), np.array([pidx]))[0])
 
-    #$ O(1) access
     def row_of(self, event: int, pidx: int) -> Optional[int]:
-        return self._row_index.get((int(event), int(pidx)))
+        r = self._row(event, pidx)
+        return int(self.labels[r]) if r >= 0 else None
 
     def children_of(self, event: int, pidx: int) -> List[int]:
-        return self._children.get((int(event), int(pidx)), [])
+        r = self._row(event, pidx)
+        return self.child_pidx[self.child_offsets[r]: self.child_offsets[r + 1]].tolist() if r >= 0 else []
 
     def pid_of(self, event: int, pidx: int) -> int:
-        return self._pid.get((int(event), int(pidx)), 0)
+        r = self._row(event, pidx)
+        return int(self.pid[r]) if r >= 0 else 0
 
     def nchildren_of(self, event: int, pidx: int) -> int:
-        return self._nchildren.get((int(event), int(pidx)), 0)
+        r = self._row(event, pidx)
+        return int(self.nchildren[r]) if r >= 0 else 0
 
 
-# Hunter (itarative DFS without recursion)
 class ChildrenHunter:
+    """
+    Descendants of LLPs, all LLPs at once: level-by-level traversal of the CSR graph, one
+    (LLP, particle) pair visited at most once.
+    If a child is the same LLP as its parent and the parent has nChildren==1 (LLP -> LLP copy), the
+    edge is not followed (like Paul's script with continue): a particle is a descendant when a path
+    without such a copy edge reaches it.
+    """
     def __init__(self, graph: EventGraph, llp_pids):
         self.g = graph
         self.llp_pids = set(int(p) for p in llp_pids)
 
-    def hunt(self, event: int, particle_index: int) -> list[int]:
+    def hunt_rows(self, roots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        If children is identical LLP (from parent and parent has nChildren==1) then we doesn't add it and doesn't go further (like Paul's script with continu)
+        (owner, child_row) pairs: child_row is a descendant of roots[owner].
+        Pairs are grouped by discovery level; children missing from the frame are dropped.
         """
-        out: list[int] = []
-        seen: set[int] = set()
-
-        parent_pid0 = self.g.pid_of(event, particle_index)
-        parent_nc0 = self.g.nchildren_of(event, particle_index)
-
-        # Stack for exploration (child_idx, parent_pid, parent_nc)
-        stack: list[tuple[int, int, int]] = [
-            (c, parent_pid0, parent_nc0) for c in self.g.children_of(event, particle_index)
-        ]
-
-        while stack:
-            child_idx, parent_pid_cur, parent_nc_cur = stack.pop()
-            if child_idx in seen:
-                continue
-            seen.add(child_idx)
-
-            child_pid = self.g.pid_of(event, child_idx)
-
-            skip_child = (
-                (child_pid in self.llp_pids) and
-                (parent_pid_cur in self.llp_pids) and
-                (child_pid == parent_pid_cur) and
-                (parent_nc_cur == 1)
-            )
+        g = self.g
+        roots = np.asarray(roots, dtype=np.int64)
+        n_rows = max(len(g.pid), 1)
+        is_llp = np.isin(g.pid, np.fromiter(self.llp_pids, dtype=np.int64))
+
+        owner, parent = np.arange(roots.size, dtype=np.int64), roots
+        visited = np.zeros(0, dtype=np.int64)
+        out_owner: List[np.ndarray] = []
+        out_child: List[np.ndarray] = []
+        while owner.size:
+            start, deg = g.child_offsets[parent], g.child_offsets[parent + 1] - g.child_offsets[parent]
+            edge_start = np.zeros(deg.size + 1, dtype=np.int64)
+            np.cumsum(deg, out=edge_start[1:])
+            gather = np.repeat(start - edge_start[:-1], deg) + np.arange(edge_start[-1])
+            e_owner, e_parent, e_child = np.repeat(owner, deg), np.repeat(parent, deg), g.child_rows[gather]
+
+            present = e_child >= 0
+            e_owner, e_parent, e_child = e_owner[present], e_parent[present], e_child[present]
+
+            # LLP -> LLP copy edges are neither kept nor followed
+            skip = is_llp[e_child] & (g.pid[e_child] == g.pid[e_parent]) & (g.nchildren[e_parent] == 1)
+            e_owner, e_child = e_owner[~skip], e_child[~skip]
+
+            # each (LLP, particle) pair once: first edge of the level, pairs of earlier levels dropped
+            # (sort based: hashing these composite keys is slow)
+            pair = e_owner * n_rows + e_child
+            order = np.argsort(pair, kind="stable")
+            sorted_pair = pair[order]
+            is_first = np.ones(sorted_pair.size, dtype=bool)
+            is_first[1:] = sorted_pair[1:] != sorted_pair[:-1]
+            first = np.sort(order[is_first])
+            if visited.size:
+                pos = np.minimum(np.searchsorted(visited, pair[first]), visited.size - 1)
+                first = first[visited[pos] != pair[first]]
+            owner, parent = e_owner[first], e_child[first]
+            visited = np.sort(np.concatenate([visited, pair[first]]), kind="stable")
+            out_owner.append(owner)
+            out_child.append(parent)
+
+        if not out_owner:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(out_owner), np.concatenate(out_child)
 
-            #LLP -> LLP
-            if skip_child:
-                continue
+    def hunt(self, event: int, particle_index: int) -> list[int]:
+        """particleIndex of the descendants (present in the frame) of one particle."""
+        root = self.g._row(event, particle_index)
+        if root < 0:
+            return []
+        _, rows = self.hunt_rows(np.array([root]))
+        return self.g.df["particleIndex"].to_numpy()[rows].tolist()
 
-            out.append(child_idx)
-            child_nc = self.g.nchildren_of(event, child_idx)
-            for gc in self.g.children_of(event, child_idx):
-                stack.append((gc, child_pid, child_nc))
 
-        return out
+NEUTRINO_PIDS = (12, 14, 16, 18)
+SAMPLE_KEYS = ("finalStates", "LLPs", "LLPchildren", "finalStates_NoLLP",
+               "finalStates_Neutrinos", "chargedFinalStates", "neutralFinalStates")
+SPECIES_KEYS = ("LLPs", "LLPchildren")
+
+
+class SampleTables(MutableMapping):
+    """
+    Dict[str->df] of create_sample_dataframes, kept as row selections into one shared base table.
+    A table is taken from the base (base.iloc[rows] + its own extra columns) the first time it is read;
+    assigned tables replace the selection. Pickles as a plain dict of frames (bundle cache format).
+    `shared` caches the tables common to several species (all but SPECIES_KEYS), so they are built once.
+    """
+    def __init__(
+        self,
+        base: pd.DataFrame,
+        rows: Dict[str, np.ndarray],
+        extra_columns: Optional[Dict[str, Dict[str, np.ndarray]]] = None,
+        shared: Optional[Dict[str, pd.DataFrame]] = None,
+    ) -> None:
+        self.base = base
+        self._rows = dict(rows)
+        self._extra = dict(extra_columns or {})
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._shared = shared
+        self._keys: List[str] = list(rows)
+
+    def rows(self, key: str) -> np.ndarray:
+        """Positions in the base table of a (not reassigned) table."""
+        return self._rows[key]
+
+    def __getitem__(self, key: str) -> pd.DataFrame:
+        try:
+            return self._frames[key]
+        except KeyError:
+            pass
+        cache = self._shared if self._shared is not None and key not in SPECIES_KEYS else self._frames
+        if key in cache:
+            return cache[key]
+        frame = self.base.iloc[self._rows[key]]
+        extra = self._extra.get(key)
+        if extra:
+            frame = frame.assign(**extra)
+        cache[key] = frame
+        return frame
+
+    def __setitem__(self, key: str, value: pd.DataFrame) -> None:
+        if key not in self._keys:
+            self._keys.append(key)
+        self._rows.pop(key, None)
+        self._frames[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        self._keys.remove(key)
+        self._rows.pop(key, None)
+        self._frames.pop(key, None)
+
+    def __iter__(self):
+        return iter(list(self._keys))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __reduce__(self):
+        return (dict, (dict(self.items()),))
 
 
 class LLPAnalyzer:
     """
     API for launching the Dict[str->df] creation from a DataFrame using the above Graph.
+    The input frame is not copied: the sample tables are row selections into it (SampleTables),
+    optionally projected on `columns` (the Schema columns are always kept).
+    A HepmcColumns input is used without going through to_legacy_frame(): the tables are selections of
+    its numeric particles table, and only LLPs/LLPchildren get the 4-tuple prodVertex/decayVertex
+    columns the selection cuts read (built from the *_x/_y/_z/_t columns of their rows).
     """
-    def __init__(self, df: pd.DataFrame, pt_min_cfg: Dict[str, float]) -> None:
-        Schema.ensure(df)
-        self.df = df.copy()
+    def __init__(self, df, pt_min_cfg: Dict[str, float], columns: Optional[Iterable[str]] = None) -> None:
+        self.columnar = _is_columnar(df)
+        frame, df = (df, df.particles) if self.columnar else (None, df)
+        Schema.ensure(df, self.columnar)
+        if columns is not None:
+            keep = set(columns) | set(Schema.required)
+            keep |= {f"{v}_{a}" for v in VERTEX_COLUMNS if v in keep for a in "xyzt"}
+            df = df[[c for c in df.columns if c in keep]]
+        self.df = df
         self.pt_min_cfg = dict(pt_min_cfg)
-        self.graph = EventGraph(self.df)
+        self.graph = EventGraph(replace(frame, particles=df) if self.columnar else df)
 
     # atomique selection.
     def select_final_states(self) -> pd.DataFrame:
@@ -161,43 +289,62 @@ class LLPAnalyzer:
         return df[df["prodVertexDist"] < max_dist_mm]
 
     def select_neutrinos(self, df: pd.DataFrame) -> pd.DataFrame:
-        return df[df["PID"].isin([12, 14, 16, 18])]
+        return df[df["PID"].isin(NEUTRINO_PIDS)]
 
-    def _build_llp_children(self, llpid: int) -> Tuple[pd.DataFrame, List[int]]:
+    def _llp_children_rows(self, llpids: Iterable[int]) -> Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
         """
-        Construct LLPchildren (df index like the original df) and keep the index of the original df
+        Per LLP PID: (child rows, originating LLP row per child) after the LLPchildren filters, and the
+        originating LLP rows of every hunted child. All species are hunted in one pass. Children are grouped
+        by LLP (df order) then sorted by df row; a child shared by several LLPs is kept for the first one.
         """
-        llp_rows = self.select_llps(llpid)
-        hunter = ChildrenHunter(self.graph, llp_pids=[llpid])
-
-        #nice optimisation here -> no concat in loop, stocking pairs and do in one time after.
-        child_df_indices: List[int] = []
-        originating_llp_df_indices: List[int] = []
-
-        for llp_df_idx in llp_rows.index.to_list():
-            ev = int(self.df.at[llp_df_idx, "eventNumber"])
-            pidx = int(self.df.at[llp_df_idx, "particleIndex"])
-            child_particle_indices = hunter.hunt(ev, pidx)
-            if not child_particle_indices:
-                continue
-
-            # (event, child_particle_idx) -> row index Pandas
-            mapped = [self.graph.row_of(ev, cpi) for cpi in child_particle_indices]
-            mapped = [m for m in mapped if m is not None]
+        llpids = [int(p) for p in llpids]
+        llp_rows = np.flatnonzero(np.isin(self.graph.pid, llpids))
+        owner, child_rows = ChildrenHunter(self.graph, llp_pids=llpids).hunt_rows(llp_rows)
+        order = np.lexsort((child_rows, owner))
+        child_rows, origin = child_rows[order], llp_rows[owner[order]]
+        origin_pid = self.graph.pid[origin]
+
+        out = {}
+        for llpid in llpids:
+            mine = origin_pid == llpid
+            rows, orig = child_rows[mine], origin[mine]
+            hunted_origin = orig
+            keep = self.graph.pid[rows] != llpid
+            rows, orig = rows[keep], orig[keep]
+            # first occurrence of each df label
+            _, first = np.unique(self.graph.labels[rows], return_index=True)
+            first.sort()
+            out[llpid] = (rows[first], orig[first], hunted_origin)
+        return out
 
-            child_df_indices.extend(mapped)
-            originating_llp_df_indices.extend([int(llp_df_idx)] * len(mapped))
+    def _rows_mask(self, rows: np.ndarray) -> np.ndarray:
+        """Rows sharing a df index label with `rows` (labels, like the legacy index.isin selections)."""
+        mask = np.zeros(len(self.df), dtype=bool)
+        mask[rows] = True
+        if rows.size and not self.df.index.is_unique:
+            mask = self.df.index.isin(self.graph.labels[rows])
+        return mask
 
-        if not child_df_indices:
+    def _build_llp_children(self, llpid: int) -> Tuple[pd.DataFrame, List[int]]:
+        """
+        Construct LLPchildren (df index like the original df) and keep the index of the original df.
+        """
+        child_rows, origin, hunted_origin = self._llp_children_rows([llpid])[int(llpid)]
+        if hunted_origin.size == 0:
             # Empty df (right)
             return self.df.iloc[[]], []
-
-        llp_children = self.df.loc[child_df_indices].copy()
-        llp_children["LLPindex"] = originating_llp_df_indices
-        llp_children = llp_children[llp_children["PID"] != int(llpid)]
-        llp_children = llp_children[~llp_children.index.duplicated(keep="first")]
-
-        return llp_children, originating_llp_df_indices
+        llp_children = self.df.iloc[child_rows].assign(LLPindex=self.graph.labels[origin])
+        return llp_children, self.graph.labels[hunted_origin].tolist()
+
+    def _vertex_tuples(self, rows: np.ndarray) -> Dict[str, list]:
+        """prodVertex/decayVertex 4-tuples of some rows of a columnar input (nothing for a DataFrame input)."""
+        out = {}
+        for v in VERTEX_COLUMNS if self.columnar else ():
+            cols = [f"{v}_{a}" for a in "xyzt"]
+            if all(c in self.df.columns for c in cols):
+                xyzt = np.column_stack([self.df[c].to_numpy()[rows] for c in cols])
+                out[v] = list(map(tuple, xyzt.tolist()))
+        return out
 
     def _compute_event_met(self, final_states_no_llp: pd.DataFrame) -> pd.DataFrame:
         # Sum of px/py by event
@@ -206,47 +353,70 @@ class LLPAnalyzer:
         sums["MET"] = PhysicsUtils.pt(sums["METx"].to_numpy(), sums["METy"].to_numpy())
         return sums
 
-    def create_sample_dataframes(self, llpid: int) -> Dict[str, pd.DataFrame]:
-        final_states = self.select_final_states()
-        llp_children, originating_llp = self._build_llp_children(llpid)
-
-        llps_all = self.select_llps(llpid).copy()
-        if len(llp_children):
-            keep_llp_idx = set(llp_children["LLPindex"].tolist())
-            llps = llps_all[(llps_all.index.isin(keep_llp_idx)) | (llps_all["status"] == 1)].copy()
-        else:
-            llps = llps_all[llps_all["status"] == 1].copy()
-
-        children_df_indices = set(llp_children.index.tolist()) if len(llp_children) else set()
-        fs_no_llp = final_states[~final_states.index.isin(children_df_indices)]
-        fs_no_llp = fs_no_llp[fs_no_llp["PID"] != int(llpid)]
-
-        fs_neutrinos = self.select_neutrinos(fs_no_llp)
-        fs_no_llp_wo_nu = fs_no_llp[~fs_no_llp["PID"].isin([12, 14, 16, 18])]
-
-        charged = fs_no_llp_wo_nu[(fs_no_llp_wo_nu["charge"] != 0) & (fs_no_llp_wo_nu["charge"] != -0.555)]
-        charged = self.select_prompt(charged)
-        charged = charged[charged["pt"] > float(self.pt_min_cfg.get("chargedTrack", 0.0))]
+    def create_sample_dataframes(self, llpid: int) -> SampleTables:
+        return self.create_species_dataframes([llpid])[int(llpid)]
 
-        neutral = fs_no_llp_wo_nu[fs_no_llp_wo_nu["charge"] == 0]
-        neutral = self.select_prompt(neutral)
-
-        if not llps.empty:
-            met_by_event = self._compute_event_met(fs_no_llp_wo_nu)
-            llps["METx"] = llps["eventNumber"].map(met_by_event["METx"]).fillna(0.0).to_numpy()
-            llps["METy"] = llps["eventNumber"].map(met_by_event["METy"]).fillna(0.0).to_numpy()
-            llps["MET"] = PhysicsUtils.pt(llps["METx"].to_numpy(), llps["METy"].to_numpy())
-        else:
-            llps["METx"] = []
-            llps["METy"] = []
-            llps["MET"] = []
-
-        return {
-            "finalStates": final_states,
-            "LLPs": llps,
-            "LLPchildren": llp_children,
-            "finalStates_NoLLP": fs_no_llp_wo_nu, 
-            "finalStates_Neutrinos": fs_neutrinos,
-            "chargedFinalStates": charged,
-            "neutralFinalStates": neutral,
+    def create_species_dataframes(self, llpids: Iterable[int]) -> Dict[int, SampleTables]:
+        """
+        Sample tables of several LLP species from one graph pass: {llpid: tables}. LLPs and LLPchildren
+        are per species; the final-state tables exclude every species and all their children, and are
+        shared (materialised once) between the species. One species gives create_sample_dataframes.
+        """
+        llpids = list(dict.fromkeys(int(p) for p in llpids))
+        df = self.df
+        pid = self.graph.pid
+        status = df["status"].to_numpy()
+        charge = df["charge"].to_numpy()
+        prompt = df["prodVertexDist"].to_numpy() < 10.0
+
+        final_states = (self.graph.nchildren == 0) & (status == 1)
+        children = self._llp_children_rows(llpids)
+
+        is_llp = np.isin(pid, llpids)
+        all_children = np.concatenate([c[0] for c in children.values()]) if children else np.zeros(0, dtype=np.int64)
+        fs_no_llp = final_states & ~self._rows_mask(all_children) & ~is_llp
+        nu = np.isin(pid, NEUTRINO_PIDS)
+        fs_no_llp_wo_nu = fs_no_llp & ~nu
+
+        charged = fs_no_llp_wo_nu & (charge != 0) & (charge != -0.555) & prompt
+        charged &= df["pt"].to_numpy() > float(self.pt_min_cfg.get("chargedTrack", 0.0))
+        neutral = fs_no_llp_wo_nu & (charge == 0) & prompt
+
+        shared_rows = {
+            "finalStates": np.flatnonzero(final_states),
+            "finalStates_NoLLP": np.flatnonzero(fs_no_llp_wo_nu),
+            "finalStates_Neutrinos": np.flatnonzero(fs_no_llp & nu),
+            "chargedFinalStates": np.flatnonzero(charged),
+            "neutralFinalStates": np.flatnonzero(neutral),
         }
+        shared: Dict[str, pd.DataFrame] = {}
+        met_by_event = None
+
+        out = {}
+        for llpid in llpids:
+            child_rows, origin, hunted_origin = children[llpid]
+            llp_rows = np.flatnonzero((pid == llpid) & (self._rows_mask(origin) | (status == 1)))
+            if llp_rows.size:
+                if met_by_event is None:
+                    wo_nu = shared_rows["finalStates_NoLLP"]
+                    met_by_event = self._compute_event_met(df[["eventNumber", "px", "py"]].iloc[wo_nu])
+                events = df["eventNumber"].iloc[llp_rows]
+                metx = events.map(met_by_event["METx"]).fillna(0.0).to_numpy()
+                mety = events.map(met_by_event["METy"]).fillna(0.0).to_numpy()
+            else:
+                metx = mety = np.zeros(0)
+
+            rows = dict(shared_rows)
+            rows["LLPs"], rows["LLPchildren"] = llp_rows, child_rows
+            out[llpid] = SampleTables(
+                df,
+                rows={k: rows[k] for k in SAMPLE_KEYS},
+                extra_columns={
+                    "LLPs": {"METx": metx, "METy": mety, "MET": PhysicsUtils.pt(metx, mety),
+                             **self._vertex_tuples(llp_rows)},
+                    "LLPchildren": {**({"LLPindex": self.graph.labels[origin]} if hunted_origin.size else {}),
+                                    **self._vertex_tuples(child_rows)},
+                },
+                shared=shared,
+            )
+        return out
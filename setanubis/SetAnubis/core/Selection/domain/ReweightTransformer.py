@@ -1,10 +1,16 @@
 from __future__ import annotations
-from dataclasses import dataclass, replace
+from dataclasses import dataclass, fields, replace
 from typing import Dict, List, Optional, Protocol, Iterable, Tuple
+from concurrent.futures import ProcessPoolExecutor
 import ast
+import multiprocessing
 import numpy as np
 import pandas as pd
 
+from SetAnubis.core.Selection.domain.ray_intervals import (
+    DEFAULT_MAX_DISTANCE_MM, decay_probability, directions, fiducial_intervals,
+)
+
 
 class PhysicsConstants:
     # m/s
@@ -32,10 +38,18 @@ def _parse_fourvec(x) -> Tuple[float, float, float, float]:
     return (0.0, 0.0, 0.0, 0.0)
 
 
-def _add_fourvec(a: Tuple[float, float, float, float],
-                 b: Tuple[float, float, float, float]) -> Tuple[float, float, float, float]:
-    return (a[0] + b[0], a[1] + b[1], a[2] + b[2], a[3] + b[3])
+def _copy_on_write() -> bool:
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.get_option("mode.copy_on_write") is True
+
 
+def _shared_copy(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Independent copy of df. Under pandas copy-on-write it shares the column data, which is only copied
+    when one side is modified; without copy-on-write it is a deep copy.
+    """
+    return df.copy(deep=not _copy_on_write())
 
 
 @dataclass(frozen=True)
@@ -53,20 +67,17 @@ class DataBundle:
 
     @staticmethod
     def from_dict(d: Dict[str, pd.DataFrame]) -> "DataBundle":
-        # Copy to avoid mutability
-        return DataBundle(**{k: v.copy() for k, v in d.items()})
+        # Copy to avoid mutability (free under copy-on-write, see _shared_copy)
+        return DataBundle(**{k: _shared_copy(v) for k, v in d.items()})
 
     def to_dict(self) -> Dict[str, pd.DataFrame]:
         # Defensive copy.
-        return {
-            "finalStates": self.finalStates.copy(),
-            "LLPs": self.LLPs.copy(),
-            "LLPchildren": self.LLPchildren.copy(),
-            "finalStates_NoLLP": self.finalStates_NoLLP.copy(),
-            "finalStates_Neutrinos": self.finalStates_Neutrinos.copy(),
-            "chargedFinalStates": self.chargedFinalStates.copy(),
-            "neutralFinalStates": self.neutralFinalStates.copy(),
-        }
+        return {f.name: _shared_copy(getattr(self, f.name)) for f in fields(self)}
+
+
+def _string_seed(seed: str) -> int:
+    import hashlib
+    return int(hashlib.sha256(str(seed).encode("utf-8")).hexdigest()[:16], 16)
 
 
 #Random service (DIP)
@@ -76,26 +87,41 @@ class RandomProvider:
     Service RNG injecté (au lieu d'utiliser l'état global numpy).
     """
     def __init__(self, seed: Optional[int | str] = None) -> None:
-        # string → hash stable
         if seed is None or seed == "":
-            self._rng = np.random.default_rng()
+            self._seed_seq = np.random.SeedSequence()
         else:
-            # if string, derive an 64 bits int.
+            # if string, derive an 64 bits int (sha256: same value in every process, unlike hash()).
             if isinstance(seed, str):
-                seed_val = np.uint64(abs(hash(seed)) & ((1 << 63) - 1))
+                seed_val = _string_seed(seed)
             else:
                 seed_val = seed
-            self._rng = np.random.default_rng(seed_val)
+            self._seed_seq = np.random.SeedSequence(seed_val)
+        self._rng = np.random.default_rng(self._seed_seq)
 
     @property
     def rng(self) -> np.random.Generator:
         return self._rng
 
+    @property
+    def seed_sequence(self) -> np.random.SeedSequence:
+        """Root of the independent streams (see ReweightDecayPositions chunk_size)."""
+        return self._seed_seq
+
+
+def _exponential(rng):
+    """Exponential sampler of rng (Generator, or the np.random module); global numpy RNG if None (legacy)."""
+    return (np.random if rng is None else rng).exponential
+
+
+# LLP columns read by the reweight kernels (the only ones sent to the chunk workers)
+KERNEL_COLUMNS = ("boost", "beta")
+
 
 # Strategy: reweight kernels (OCP/LSP)
 class ReweightKernel(Protocol):
     """
-    reweight strategy : calculate a distance vertex (mm) for every LLps rows.
+    reweight strategy : calculate a distance vertex (mm) for every LLps rows, in one draw from rng.
+    Only the KERNEL_COLUMNS of df_llp are read.
     """
     name: str
 
@@ -111,12 +137,23 @@ class LifetimeKernel:
     """
     name = "weighted"
 
+    @staticmethod
+    def mean_decay_length_mm(df_llp: pd.DataFrame, lifetime_s) -> np.ndarray:
+        """
+        Mean lab decay length lifetime * gamma * beta * c [mm], shape (n,) or (n, m) for m lifetimes.
+        """
+        gamma = df_llp["boost"].to_numpy(dtype=float, copy=False)
+        beta = df_llp["beta"].to_numpy(dtype=float, copy=False)
+        scale = (gamma * beta * PhysicsConstants.C * PhysicsConstants.MM_PER_M)
+        lifetime = np.asarray(lifetime_s, dtype=float)
+        return scale * lifetime if lifetime.ndim == 0 else np.outer(scale, lifetime)
+
     def sample_decay_length_mm(self, df_llp: pd.DataFrame, lifetime_s: float,
-                               rng_ignored: np.random.Generator | None) -> np.ndarray:
+                               rng: np.random.Generator | None) -> np.ndarray:
         gamma = df_llp["boost"].to_numpy(dtype=float, copy=False)
         beta  = df_llp["beta"].to_numpy(dtype=float, copy=False)
         #  [s]
-        t_lab = np.random.exponential(scale=lifetime_s * gamma, size=gamma.shape)
+        t_lab = _exponential(rng)(scale=lifetime_s * gamma, size=gamma.shape)
         # mm
         L_mm = t_lab * beta * PhysicsConstants.C * PhysicsConstants.MM_PER_M
         return L_mm.astype(float)
@@ -131,11 +168,11 @@ class PositionKernel:
     name = "posWeighted"
 
     def sample_decay_length_mm(self, df_llp: pd.DataFrame, lifetime_s: float,
-                               rng_ignored: np.random.Generator | None) -> np.ndarray:
+                               rng: np.random.Generator | None) -> np.ndarray:
         gamma = df_llp["boost"].to_numpy(dtype=float, copy=False)
         beta  = df_llp["beta"].to_numpy(dtype=float, copy=False)
         scale_L_mm = lifetime_s * gamma * beta * PhysicsConstants.C * PhysicsConstants.MM_PER_M
-        L_mm = np.random.exponential(scale=scale_L_mm, size=gamma.shape)
+        L_mm = _exponential(rng)(scale=scale_L_mm, size=gamma.shape)
         return L_mm.astype(float)
 
 
@@ -147,45 +184,30 @@ class RestLifetimeKernel:
     name = "restWeighted"
 
     def sample_decay_length_mm(self, df_llp: pd.DataFrame, lifetime_s: float,
-                               rng_ignored: np.random.Generator | None) -> np.ndarray:
+                               rng: np.random.Generator | None) -> np.ndarray:
         gamma = df_llp["boost"].to_numpy(dtype=float, copy=False)
         beta  = df_llp["beta"].to_numpy(dtype=float, copy=False)
-        t_rest = np.random.exponential(scale=lifetime_s, size=gamma.shape)
+        t_rest = _exponential(rng)(scale=lifetime_s, size=gamma.shape)
         L_mm = t_rest * gamma * beta * PhysicsConstants.C * PhysicsConstants.MM_PER_M
         return L_mm.astype(float)
 
 
 # Transformer (SRP)
-def to_theta(eta): # Theta is polar angle [0,pi] where 0 is aligned with the +ve z axis
-    if eta == np.nan:
-        return 0 # When pseudorapidity is undefined aligned with longitudinal axis (z)
-    elif eta == -np.nan:
-        return np.pi
-    else:
-        return 2 * np.arctan(np.exp(-eta))
-
-def _to_cartesian(r: float, eta: float, phi: float):
-    """
-    - Input: distance L in mm, pseudo-rapidity eta, azimuth phi (rad)
-    - Output: (x,y,z) in mm
-    Stables relations:
-      cosθ = tanh(eta)
-      sinθ = 1/cosh(eta)
-    """
-    x = r * np.sin(to_theta(eta)) * np.cos(phi)
-    y = r * np.sin(to_theta(eta)) * np.sin(phi)
-    z = r * np.cos(to_theta(eta))
-    return [x, y, z]
+def _to_cartesian_arrays(r: np.ndarray, eta: np.ndarray, phi: np.ndarray) -> np.ndarray:
+    """(n, 3) positions in mm at distances r (mm) along the (eta, phi) directions."""
+    theta = 2 * np.arctan(np.exp(-eta))
+    sin_theta = np.sin(theta)
+    return np.column_stack([r * sin_theta * np.cos(phi), r * sin_theta * np.sin(phi), r * np.cos(theta)])
 
 
-def _get_reweighted_decay_position_row(row: pd.Series, dist_col: str):
-    """
-    Return a tuple (x,y,z) in mm (without 't', Paul doesn't use it for translation).
-    """
-    L = row[dist_col]
-    eta = row["eta"]
-    phi = row["phi"]
-    return _to_cartesian(L, eta, phi)
+def _fourvec_array(col: pd.Series) -> np.ndarray:
+    """(n, 4) float array of a column of parsed 4-vectors (see _parse_fourvec)."""
+    return np.asarray(col.tolist(), dtype=float).reshape(len(col), 4)
+
+
+def _as_tuples(arr: np.ndarray) -> List[Tuple[float, ...]]:
+    return list(map(tuple, arr.tolist()))
+
 
 class Transformer(Protocol):
     def apply(self, bundle: DataBundle) -> DataBundle:
@@ -199,6 +221,10 @@ class ReweightDecayPositions(Transformer):
     Add decayVertex_translation (4-vector, Δx,Δy,Δz,0)
     Add in LLPchildren:
         prodVertex_<name>, decayVertex_<name>
+
+    With chunk_size, the target LLPs are cut in chunks of chunk_size rows, each drawing from its own stream
+    spawned from the RandomProvider seed sequence: the result does not depend on n_workers (chunks drawn
+    in a local process pool when > 1). seed_for_compat draws stay on the global numpy RNG, unchunked.
     """
     def __init__(
         self,
@@ -206,160 +232,189 @@ class ReweightDecayPositions(Transformer):
         llp_pid: int,
         rng: Optional[RandomProvider] = None,
         kernels: Optional[Iterable[ReweightKernel]] = None,
-        seed_for_compat = None
+        seed_for_compat = None,
+        chunk_size: Optional[int] = None,
+        n_workers: int = 1,
+        mp_context: Optional[str] = None,
     ) -> None:
         self.lifetime_s = float(lifetime_s)
         self.llp_pid = int(llp_pid)
-        self.rng = rng.rng if isinstance(rng, RandomProvider) else RandomProvider().rng
+        provider = rng if isinstance(rng, RandomProvider) else RandomProvider()
+        self.rng = provider.rng
+        self.seed_sequence = provider.seed_sequence
         self.kernels: List[ReweightKernel] = list(kernels) if kernels is not None else [
             LifetimeKernel(), PositionKernel(), RestLifetimeKernel()
         ]
         self.seed_for_compat = seed_for_compat
+        self.chunk_size = chunk_size
+        self.n_workers = n_workers
+        self.mp_context = mp_context
+
+    def reseed(self, seed: int | str) -> None:
+        """Restart both the generator and the chunk streams from `seed`."""
+        provider = RandomProvider(seed)
+        self.rng, self.seed_sequence = provider.rng, provider.seed_sequence
 
     @staticmethod
     def _ensure_fourvectors(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
-        out = df.copy()
+        out = _shared_copy(df)
         for c in cols:
             if c in out.columns:
                 out[c] = out[c].map(_parse_fourvec)
         return out
 
-    @staticmethod
-    def _build_translation(original: pd.Series, reweighted_xyz: pd.Series) -> pd.Series:
+    def _draw_rng(self):
         """
-        Δ = reweighted_xyz( x,y,z ) - original( x,y,z ) ; Δt = 0
-        - original : 4-vector (x,y,z,t) (legacy from Paul)
-        - reweighted_xyz : 3-vector (x,y,z) (legacy from Paul)
+        Generator the kernels draw from: the injected RandomProvider, or the global numpy RNG seeded
+        with seed_for_compat (same draws as the legacy code).
         """
+        if self.seed_for_compat is None or self.seed_for_compat == "":
+            return self.rng
+        try:
+            s = int(self.seed_for_compat)
+        except ValueError:
+            s = _string_seed(self.seed_for_compat)
+        np.random.seed(s)
+        return np.random
+
+    def _sample_lengths(self, target: pd.DataFrame, rng) -> List[np.ndarray]:
+        """Decay lengths (mm) of the target LLPs, one array per kernel."""
+        if not self.chunk_size or rng is np.random:
+            return [kernel.sample_decay_length_mm(target, self.lifetime_s, rng) for kernel in self.kernels]
+
+        size = max(int(self.chunk_size), 1)
+        # workers get the kernel columns as plain arrays, not the LLP frame
+        columns = {c: target[c].to_numpy(dtype=float) for c in KERNEL_COLUMNS}
+        chunks = [{c: col[lo: lo + size] for c, col in columns.items()} for lo in range(0, len(target), size)]
+        streams = self.seed_sequence.spawn(len(chunks))
+        args = (chunks, [self.kernels] * len(chunks), [self.lifetime_s] * len(chunks), streams)
+        if self.n_workers <= 1 or len(chunks) <= 1:
+            parts = list(map(_sample_chunk, *args))
+        else:
+            ctx = multiprocessing.get_context(self.mp_context) if self.mp_context else None
+            with ProcessPoolExecutor(max_workers=min(int(self.n_workers), len(chunks)), mp_context=ctx) as pool:
+                parts = list(pool.map(_sample_chunk, *args))
+        return [np.concatenate([part[k] for part in parts]) for k in range(len(self.kernels))]
 
-        def _to_xyz3(v):
-            # v can be (x,y,z), (x,y,z,t) or str with the same form
-            if isinstance(v, (list, tuple)):
-                if len(v) == 3:
-                    x, y, z = v
-                    return float(x), float(y), float(z)
-                if len(v) == 4:
-                    x, y, z, _t = v
-                    return float(x), float(y), float(z)
-            if isinstance(v, str):
-                try:
-                    vv = ast.literal_eval(v)
-                    return _to_xyz3(vv)
-                except Exception:
-                    pass
-            # fallback
-            return 0.0, 0.0, 0.0
-
-        def _to_xyzt4(v):
-            if isinstance(v, (list, tuple)):
-                if len(v) == 4:
-                    x, y, z, t = v
-                    return float(x), float(y), float(z), float(t)
-                if len(v) == 3:
-                    x, y, z = v
-                    return float(x), float(y), float(z), 0.0
-            if isinstance(v, str):
-                try:
-                    vv = ast.literal_eval(v)
-                    return _to_xyzt4(vv)
-                except Exception:
-                    pass
-            return 0.0, 0.0, 0.0, 0.0
-
-        def _delta(a4, b3):
-            ax, ay, az, _at = _to_xyzt4(a4)
-            bx, by, bz = _to_xyz3(b3)
-            return (bx - ax, by - ay, bz - az, 0.0)
-
-        return pd.Series((_delta(a, b) for a, b in zip(original, reweighted_xyz)),
-                        index=original.index)
+    def apply(self, bundle: DataBundle) -> DataBundle:
+        rng = self._draw_rng()
 
-    @staticmethod
-    def _translate_vertex(row: pd.Series, vertex_col: str, translation: Tuple[float, float, float, float]) -> Tuple[float, float, float, float]:
-        """
-        if (final state or status==1) and decayvertex traduction then (-1,-1,-1,-1)
-        else vertex + translation (4-vector sum).
-        """
-        if ( ((row.get("nChildren", 0) == 0) or (row.get("status", 0) == 1)) and ("prodVertex" not in vertex_col) ):
-            return (-1.0, -1.0, -1.0, -1.0)
-        v = _parse_fourvec(row[vertex_col])
-        return _add_fourvec(v, translation)
+        #if multiple pid.
+        mask_pid = (bundle.LLPs["PID"].astype(int) == self.llp_pid).to_numpy()
 
+        llps = self._ensure_fourvectors(bundle.LLPs, ["decayVertex"])
+        children = self._ensure_fourvectors(bundle.LLPchildren, ["prodVertex", "decayVertex"])
 
-    def apply(self, bundle: DataBundle) -> DataBundle:
-        llps = bundle.LLPs.copy()
-        children = bundle.LLPchildren.copy()
-
-        if self.seed_for_compat is not None and self.seed_for_compat != "":
-            try:
-                s = int(self.seed_for_compat)
-            except ValueError:
-                import hashlib
-                s = int(hashlib.sha256(str(self.seed_for_compat).encode("utf-8")).hexdigest()[:16], 16)
-            np.random.seed(s)
-    
-        #if multiple pid.
-        mask_pid = (llps["PID"].astype(int) == self.llp_pid)
+        gamma = llps["boost"].to_numpy(dtype=float)
+        beta = llps["beta"].to_numpy(dtype=float)
+        eta = llps["eta"].to_numpy(dtype=float)
+        phi = llps["phi"].to_numpy(dtype=float)
+        denom = np.maximum(gamma * beta, 1e-300)
 
-        llps = self._ensure_fourvectors(llps, ["decayVertex"])
-        children = self._ensure_fourvectors(children, ["prodVertex", "decayVertex"])
+        # Distances (mm) only for target pid
+        lengths = self._sample_lengths(llps.loc[mask_pid], rng) if mask_pid.any() else None
 
-        for kernel in self.kernels:
+        new_cols = {}
+        for k, kernel in enumerate(self.kernels):
             name = kernel.name  # "weighted", "posWeighted", "restWeighted"
 
-            # Distances (mm) only for target pid
             dist = np.zeros(len(llps), dtype=float)
-            if mask_pid.any():
-                dist[mask_pid.to_numpy()] = kernel.sample_decay_length_mm(
-                    llps.loc[mask_pid], self.lifetime_s, self.rng
-                )
-
-            col_dist = f"decayVertexDist_{name}"
-            col_ctau = f"ctau_{name}"
-            llps[col_dist] = dist
-            # ctau in s : L(mm) / (γβ c (mm/s))
-            gamma = llps["boost"].to_numpy(dtype=float, copy=False)
-            beta = llps["beta"].to_numpy(dtype=float, copy=False)
-            denom = np.maximum(gamma * beta, 1e-300)
-            llps[col_ctau] = llps[col_dist].to_numpy() / denom
+            if lengths is not None:
+                dist[mask_pid] = lengths[k]
 
-            llps[f"decayVertex_{name}"] = [
-                _get_reweighted_decay_position_row(row, col_dist) for _, row in llps.iterrows()
-            ]
+            new_cols[f"decayVertexDist_{name}"] = dist
+            # ctau in s : L(mm) / (γβ c (mm/s))
+            new_cols[f"ctau_{name}"] = dist / denom
+            new_cols[f"decayVertex_{name}"] = _to_cartesian_arrays(dist, eta, phi)
 
         # Principal vector for translation based on the kernel “weighted”
         # Δ = decayVertex_weighted - decayVertex ; Δt = 0
-        if "decayVertex_weighted" not in llps.columns:
+        if "decayVertex_weighted" not in new_cols:
             raise RuntimeError("Kernel 'weighted' needed for decayVertex_translation.")
-        llps["decayVertex_translation"] = self._build_translation(llps["decayVertex"], llps["decayVertex_weighted"])
+        translation = np.zeros((len(llps), 4), dtype=float)
+        translation[:, :3] = new_cols["decayVertex_weighted"] - _fourvec_array(llps["decayVertex"])[:, :3]
+
+        for name, col in new_cols.items():
+            llps[name] = col.tolist() if col.ndim > 1 else col
+        llps["decayVertex_translation"] = _as_tuples(translation)
 
         # Propagation to children
         if "LLPindex" not in children.columns:
             raise ValueError("LLPchildren needs the columns 'LLPindex'.")
+        if not llps.index.is_unique:
+            raise ValueError("LLPs index must be unique to propagate the translation to LLPchildren.")
+
+        # translation of each child's LLP (NaN for an unknown LLPindex)
+        owner = llps.index.get_indexer(children["LLPindex"])
+        child_translation = np.where((owner >= 0)[:, None], translation[owner], np.nan)
 
-        child = children.merge(
-            llps[["decayVertex_translation"]], how="left",
-            left_on="LLPindex", right_index=True, validate="many_to_one"
-        )
+        prod = _as_tuples(_fourvec_array(children["prodVertex"]) + child_translation)
+        # final states (or status 1) have no decay vertex: (-1,-1,-1,-1)
+        n_children = children["nChildren"].to_numpy() if "nChildren" in children.columns else np.zeros(len(children))
+        status = children["status"].to_numpy() if "status" in children.columns else np.zeros(len(children))
+        no_decay = (n_children == 0) | (status == 1)
+        decay = np.where(no_decay[:, None], -1.0, _fourvec_array(children["decayVertex"]) + child_translation)
+        decay = _as_tuples(decay)
 
         for kernel in self.kernels:
-            name = kernel.name
-
-            # prodVertex_<name>
-            tgt_col = f"prodVertex_{name}"
-            child[tgt_col] = [
-                self._translate_vertex(row, "prodVertex", row["decayVertex_translation"])
-                for _, row in child.iterrows()
-            ]
-
-            # decayVertex_<name>
-            tgt_col2 = f"decayVertex_{name}"
-            child[tgt_col2] = [
-                self._translate_vertex(row, "decayVertex", row["decayVertex_translation"])
-                for _, row in child.iterrows()
-            ]
-
-        return replace(bundle, LLPs=llps, LLPchildren=child.drop(columns=["decayVertex_translation"]))
+            children[f"prodVertex_{kernel.name}"] = prod
+            children[f"decayVertex_{kernel.name}"] = decay
+
+        return replace(bundle, LLPs=llps, LLPchildren=children)
+
+
+def _sample_chunk(columns: Dict[str, np.ndarray], kernels: List[ReweightKernel], lifetime_s: float,
+                  stream: np.random.SeedSequence) -> List[np.ndarray]:
+    rng = np.random.default_rng(stream)
+    df_llp = pd.DataFrame(columns, copy=False)
+    return [kernel.sample_decay_length_mm(df_llp, lifetime_s, rng) for kernel in kernels]
+
+
+class DecayProbabilityWeights(Transformer):
+    """
+    Analytic alternative to ReweightDecayPositions: no decay position is drawn. For each LLP ray (IP origin,
+    (eta, phi) direction, as decayVertex_<name>) the fiducial intervals of the selection volume (cavern or
+    shaft, outside ATLAS) are found once; the exponential decay probability inside them is then exact for
+    any lifetime, with the LifetimeKernel mean decay length.
+    Add in LLPs: decayProb_<lifetime> for each lifetime (0 for other PIDs).
+    """
+    def __init__(
+        self,
+        geometry,
+        lifetimes_s: Iterable[float],
+        llp_pid: int,
+        kernel: Optional[LifetimeKernel] = None,
+        max_distance_mm: float = DEFAULT_MAX_DISTANCE_MM,
+    ) -> None:
+        self.geometry = geometry
+        self.lifetimes_s = np.atleast_1d(np.asarray(list(lifetimes_s), dtype=float))
+        self.llp_pid = int(llp_pid)
+        self.kernel = kernel if kernel is not None else LifetimeKernel()
+        self.max_distance_mm = float(max_distance_mm)
+
+    @staticmethod
+    def column_name(lifetime_s: float) -> str:
+        return f"decayProb_{float(lifetime_s):g}"
+
+    def intervals(self, llps: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Fiducial (offsets, start, stop) distance intervals (mm) of every LLP ray, see fiducial_intervals."""
+        ux, uy, uz = directions(llps["eta"].to_numpy(dtype=float), llps["phi"].to_numpy(dtype=float))
+        return fiducial_intervals(self.geometry, ux, uy, uz, self.max_distance_mm)
+
+    def probabilities(self, llps: pd.DataFrame) -> np.ndarray:
+        """(n_llp, n_lifetimes) probabilities of decaying in the fiducial volume."""
+        mask_pid = (llps["PID"].astype(int) == self.llp_pid).to_numpy()
+        out = np.zeros((len(llps), self.lifetimes_s.size), dtype=float)
+        if mask_pid.any():
+            target = llps.loc[mask_pid]
+            lam = self.kernel.mean_decay_length_mm(target, self.lifetimes_s)
+            out[mask_pid] = decay_probability(*self.intervals(target), lam)
+        return out
+
+    def apply(self, bundle: DataBundle) -> DataBundle:
+        prob = self.probabilities(bundle.LLPs)
+        cols = {self.column_name(tau): prob[:, j] for j, tau in enumerate(self.lifetimes_s)}
+        return replace(bundle, LLPs=bundle.LLPs.assign(**cols))
 
 
 if __name__ == "__main__":
@@ -1,12 +1,32 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Dict, Iterable, Optional, Tuple, Any, List
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Any, List
 
 import numpy as np
 import pandas as pd
 
 from SetAnubis.core.Selection.ports.input.ISelectionGeometry import ISelectionGeometry
+from SetAnubis.core.Geometry.domain.utils import extract_xyz_arrays
+from SetAnubis.core.Selection.domain.cutflow import CutFlowMask
+from SetAnubis.core.Selection.domain.ray_intervals import volume_of
+
+# Bits of the cut-flow mask after the cavern/shaft cut, in pipeline order.
+CUT_KEYS_AFTER_GEOMETRY: Tuple[str, ...] = (
+    "nLLP_NotInATLAS", "nLLP_Geometry", "nLLP_Tracker", "nLLP_MET",
+    "nLLP_isoJet", "nLLP_isoCharged", "nLLP_isoAll", "nLLP_Final",
+)
+
+# Relative cost of each cut stage, used by the "cheap_first" execution plan.
+# Column cuts are free, batched geometry is cheap, intersections/children/isolation are not.
+CUT_COSTS: Dict[str, int] = {
+    "LLPdecay": 0, "MET": 0,
+    "InCavern": 1, "InShaft": 1, "NotInATLAS": 1,
+    "Geometry": 2, "Tracker": 3, "Isolation": 4,
+}
+CUT_ORDERS = ("canonical", "cheap_first")
+# cheap_first: cuts up to this cost run on every LLP, the others only on the LLPs passing every cut before them.
+FULL_POPULATION_COST = 1
 
 
 
@@ -17,6 +37,18 @@ def _vertex_col_in_df(df: pd.DataFrame, base: str, run_cfg: "RunConfig") -> str:
     return base
 
 
+def _with_jets_for(SDFs: Dict[str, Any], rows: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Bundle view where a lazy jet table (finalStatePromptJets with a for_events method) is replaced
+    by the jets of the events of `rows`, clustered on demand.
+    """
+    jets = SDFs.get("finalStatePromptJets")
+    if jets is None or not hasattr(jets, "for_events"):
+        return SDFs
+    events = rows["eventNumber"].to_numpy() if "eventNumber" in rows.columns else np.array([], dtype=int)
+    return {**SDFs, "finalStatePromptJets": jets.for_events(events)}
+
+
 def sel_check_in_cavern(row: pd.Series, geo: ISelectionGeometry, rpc_max_radius: float, decay_vertex_col: str) -> bool:
     return geo.in_cavern(row[decay_vertex_col], rpc_max_radius)
 
@@ -29,6 +61,14 @@ def sel_check_in_atlas(row: pd.Series, geo: ISelectionGeometry, strict: bool, de
     return geo.in_atlas(row[decay_vertex_col], strict)
 
 
+def _has_intersections_batch(geo: ISelectionGeometry) -> bool:
+    """Batched ANUBIS intersections available: the method exists and the wrapped geometry can serve it."""
+    if not hasattr(geo, "llp_intersections_batch"):
+        return False
+    probe = getattr(geo, "has_llp_intersections_batch", None)
+    return bool(probe()) if callable(probe) else True
+
+
 def sel_check_llp_intersections(
     row: pd.Series,
     geo: ISelectionGeometry,
@@ -112,9 +152,22 @@ class SelectionEngine:
     """
     Selection Pipeline, structure in multiple steps.
     
-    Return {cutFlow, cutIndices, finalDF}
+    Return {cutFlow, cutIndices, cutMask, finalDF}
+    cutMask is a CutFlowMask (one bit per cut for each input LLP), cutIndices a lazy view over it.
+
+    cut_order:
+      - "canonical"   : cuts run in the cut-flow order, every stage count is exact.
+      - "cheap_first" : the column and batched-geometry cuts (cost <= FULL_POPULATION_COST) run first on
+                        every LLP; the intersection, tracker and isolation cuts then run, in canonical order,
+                        only on the LLPs passing every cut before them.
+                        Same finalDF and the same (exact, canonical order) cut-flow as "canonical".
     """
 
+    def __init__(self, cut_order: str = "canonical") -> None:
+        if cut_order not in CUT_ORDERS:
+            raise ValueError(f"Unknown cut order: {cut_order} (expected one of {CUT_ORDERS})")
+        self.cut_order = cut_order
+
 
     @staticmethod
     def _compute_min_delta_r_for_rows(
@@ -123,55 +176,15 @@ class SelectionEngine:
         selection: "SelectionConfig",
     ) -> pd.DataFrame:
         """
-        Recompute minDeltaR_Jets and minDeltaR_Tracks for the given rows,
-        using the same logic as the legacy helper.
+        Recompute minDeltaR_Jets and minDeltaR_Tracks for the given rows with the
+        CSR isolation engine (same thresholds, -1 when no object, Δφ wrapped).
         """
-        jets_all   = SDFs.get("finalStatePromptJets", pd.DataFrame())
-        tracks_all = SDFs.get("chargedFinalStates",   pd.DataFrame())
-
-        # if we cannot compute anything, fill with -1 (legacy convention from Paul)
-        if jets_all.empty and tracks_all.empty:
-            out = rows.copy()
-            out["minDeltaR_Jets"]   = -1.0
-            out["minDeltaR_Tracks"] = -1.0
-            return out
-
-        def _delta_r_min_for_event(ev: int, eta0: float, phi0: float) -> tuple[float, float]:
-            # select same-event jets/tracks
-            j = jets_all[jets_all["eventNumber"] == ev] if not jets_all.empty else pd.DataFrame()
-            t = tracks_all[tracks_all["eventNumber"] == ev] if not tracks_all.empty else pd.DataFrame()
-
-            # apply kinematic thresholds
-            if not j.empty:
-                j = j[(j["pt"] > selection.minPt.jet) & (j["p"] > selection.minP.jet)]
-            if not t.empty:
-                t = t[(t["pt"] > selection.minPt.chargedTrack)]
-
-            def _min_dr(df: pd.DataFrame) -> float:
-                if df.empty:
-                    return -1.0  # legacy “no object” convention from Paul
-                d_eta = eta0 - df["eta"].to_numpy(dtype=float, copy=False)
-                d_phi = phi0 - df["phi"].to_numpy(dtype=float, copy=False)
-                dr = np.sqrt(d_eta * d_eta + d_phi * d_phi)
-                return float(dr.min()) if dr.size else -1.0
-
-            return _min_dr(j), _min_dr(t)
-
-        jets_vals   = []
-        tracks_vals = []
-        # use itertuples for speed and safety
-        for r in rows.itertuples(index=True):
-            ev   = getattr(r, "eventNumber")
-            eta0 = float(getattr(r, "eta"))
-            phi0 = float(getattr(r, "phi"))
-            drj, drt = _delta_r_min_for_event(ev, eta0, phi0)
-            jets_vals.append(drj)
-            tracks_vals.append(drt)
-
-        out = rows.copy()
-        out["minDeltaR_Jets"]   = jets_vals
-        out["minDeltaR_Tracks"] = tracks_vals
-        return out
+        from SetAnubis.core.Selection.domain.isolation import IsolationComputer
+        cols = IsolationComputer(selection=selection).compute_for_llps(rows, _with_jets_for(SDFs, rows))
+        return rows.assign(
+            minDeltaR_Jets=cols["minDeltaR_Jets"].to_numpy(),
+            minDeltaR_Tracks=cols["minDeltaR_Tracks"].to_numpy(),
+        )
 
     def apply_selection(
         self,
@@ -179,10 +192,45 @@ class SelectionEngine:
         run_config: RunConfig,
         selection: SelectionConfig,
     ) -> Dict[str, Any]:
+        if self.cut_order == "cheap_first":
+            return self._run_selection_planned(SDFs, run_config, selection)
+        return self._run_selection(SDFs, run_config, selection, shared={})
+
+    def apply_selection_sweep(
+        self,
+        SDFs: Dict[str, pd.DataFrame],
+        run_config: RunConfig,
+        selections: Sequence[SelectionConfig],
+    ) -> List[Dict[str, Any]]:
+        """
+        Run apply_selection for several SelectionConfig variants on the same bundle.
+
+        Geometry-dependent work (cavern/shaft, ATLAS veto, ANUBIS intersections, child-track hits,
+        min ΔR) is done once per geometry and reused; only the threshold cuts run per variant.
+        The reuse includes the RPC efficiency draw: with RPCeff < 1 the variants of one geometry share it.
+        cheap_first runs each variant on its own (fresh draw per variant).
+        Returns one result dict per variant, in the same order.
+        """
+        if self.cut_order == "cheap_first":
+            return [self._run_selection_planned(SDFs, run_config, selection) for selection in selections]
+        shared: Dict[tuple, Any] = {}
+        return [self._run_selection(SDFs, run_config, selection, shared) for selection in selections]
+
+    def _run_selection(
+        self,
+        SDFs: Dict[str, pd.DataFrame],
+        run_config: RunConfig,
+        selection: SelectionConfig,
+        shared: Dict[tuple, Any],
+    ) -> Dict[str, Any]:
+        """
+        Selection steps; `shared` caches the geometry-dependent stages between calls on the same bundle.
+        Intersections and track hits are evaluated on the loosest (nStations=2) geometry output,
+        then restricted to the LLPs of the current variant.
+        """
         pd.options.mode.chained_assignment = None
 
         cut_flow: Dict[str, float | int] = {}
-        cut_indices: Dict[str, List[int]] = {}
 
         llps = SDFs["LLPs"]
             
@@ -190,62 +238,222 @@ class SelectionEngine:
         cut_flow["nLLP_original"] = len(llps.index)
         cut_flow["nLLP_original_weighted"] = float(llps["weight"].sum() if "weight" in llps.columns else 0.0)
 
-        # LLPs which decays
-        step = self._select_decaying_llps(llps)
-        cut_flow.update(step["cutFlow"]); cut_indices.update(step["cutIndices"])
-        df = step["dataframe"]
-        print("_select_decaying_llps", step["cutFlow"])
-        
-        # Geometry selection (cavern/shaft)
-        geo_mode = (selection.geometry.geoMode or "").lower()
-        if "shaft" in geo_mode:
-            print("here")
-            step = self._select_in_shaft(df, selection, run_config)
-        elif (geo_mode == "") or ("ceiling" in geo_mode) or ("cavern" in geo_mode):
-            print("or here")
-            step = self._select_in_cavern(df, selection, run_config)
-        else:
-            raise ValueError(f"Unknown geometry mode: {selection.geometry.geoMode}")
-        cut_flow.update(step["cutFlow"]); cut_indices.update(step["cutIndices"])
-        df = step["dataframe"]
-        print("_select_in_cavern ", step["cutFlow"])
-        
-        # OUtside ATLAS
-        step = self._select_not_in_atlas(df, selection, run_config)
-        cut_flow.update(step["cutFlow"]); cut_indices.update(step["cutIndices"])
-        df = step["dataframe"]
-        print("_select_not_in_atlas ", step["cutFlow"])
-        
+        geo_key = f"nLLP_{self._volume_cut_name(selection)}"
+
+        # One bit per cut and per LLP; cutIndices lists are derived from it on demand.
+        cut_mask = CutFlowMask.empty(
+            llps.index,
+            llps["weight"].to_numpy(dtype=float) if "weight" in llps.columns else None,
+            ("nLLP_LLPdecay", geo_key) + CUT_KEYS_AFTER_GEOMETRY,
+        )
+
+        def _record(step: Dict[str, Any]) -> pd.DataFrame:
+            cut_flow.update(step["cutFlow"])
+            for key, kept in step["cutIndices"].items():
+                cut_mask.record(key, kept)
+            return step["dataframe"]
+
+        geo_id = id(selection.geometry)
+        if ("geometry", geo_id) not in shared:
+            # LLPs which decays
+            decay_step = self._select_decaying_llps(llps)
+            print("_select_decaying_llps", decay_step["cutFlow"])
+
+            # Geometry selection (cavern/shaft)
+            if geo_key == "nLLP_InShaft":
+                print("here")
+                volume_step = self._select_in_shaft(decay_step["dataframe"], selection, run_config)
+            else:
+                print("or here")
+                volume_step = self._select_in_cavern(decay_step["dataframe"], selection, run_config)
+            print("_select_in_cavern ", volume_step["cutFlow"])
+
+            # OUtside ATLAS
+            atlas_step = self._select_not_in_atlas(volume_step["dataframe"], selection, run_config)
+            print("_select_not_in_atlas ", atlas_step["cutFlow"])
+            shared[("geometry", geo_id)] = (decay_step, volume_step, atlas_step)
+
+        for step in shared[("geometry", geo_id)]:
+            df = _record(step)
+
         # Intersections ANUBIS (RPC nStations)
-        step = self._select_anubis_intersection(df, selection, run_config)
-        cut_flow.update(step["cutFlow"]); cut_indices.update(step["cutIndices"])
-        df = step["dataframe"]
+        inter_key = ("intersection", geo_id, selection.minP.LLP)
+        if inter_key not in shared:
+            shared[inter_key] = self._select_anubis_intersection(df, replace(selection, nStations=2), run_config)
+        step = self._restrict_n_stations(shared[inter_key]["dataframe"], selection.nStations)
+        df = _record(step)
         print("_select_anubis_intersection ", step["cutFlow"])
         
         # Tracking higs from desintegration product.
-        step = self._select_tracks(df, SDFs["LLPchildren"], selection, run_config)
-        cut_flow.update(step["cutFlow"]); cut_indices.update(step["cutIndices"])
-        df = step["dataframe"]
+        tracks_key = inter_key + ("tracks", selection.nIntersections, selection.nTracks)
+        if tracks_key not in shared:
+            shared[tracks_key] = self._select_tracks(
+                shared[inter_key]["dataframe"], SDFs["LLPchildren"], selection, run_config
+            )["dataframe"].index
+        step = self._apply_mask_and_pack(df, df.index.isin(shared[tracks_key]), "Tracker")
+        df = _record(step)
         print("_select_tracks ", step["cutFlow"])
         
         # 6) Minimal MET
         step = self._select_met(df, selection)
-        cut_flow.update(step["cutFlow"]); cut_indices.update(step["cutIndices"])
-        df = step["dataframe"]
+        df = _record(step)
         print("_select_met : ", step["cutFlow"])
         
         # 7) Isolation
+        df = self._attach_shared_min_delta_r(df, SDFs, selection, shared)
         step = self._select_isolation(df, selection, SDFs)
-        cut_flow.update(step["cutFlow"]); cut_indices.update(step["cutIndices"])
-        df = step["dataframe"]
+        df = _record(step)
 
         # Final
         cut_flow["nLLP_Final"] = len(df.index)
         cut_flow["nLLP_Final_weighted"] = float(df["weight"].sum() if "weight" in df.columns else 0.0)
-        cut_indices["nLLP_Final"] = df.index.tolist()
+        cut_mask.record("nLLP_Final", df.index)
 
         pd.options.mode.chained_assignment = "warn"
-        return {"cutFlow": cut_flow, "cutIndices": cut_indices, "finalDF": df}
+        return {"cutFlow": cut_flow, "cutIndices": cut_mask.cut_indices(), "cutMask": cut_mask, "finalDF": df}
+
+    @staticmethod
+    def _volume_cut_name(selection: SelectionConfig) -> str:
+        return volume_of(selection.geometry.geoMode)
+
+    @staticmethod
+    def plan_cuts(names: Sequence[str], cut_order: str = "cheap_first") -> List[int]:
+        """
+        Execution order (positions in `names`) of the canonical cut list `names`.
+        cheap_first is a stable sort on CUT_COSTS, so equal-cost cuts keep their canonical order.
+        """
+        if cut_order == "canonical":
+            return list(range(len(names)))
+        return sorted(range(len(names)), key=lambda i: CUT_COSTS.get(names[i], max(CUT_COSTS.values())))
+
+    def _run_selection_planned(
+        self,
+        SDFs: Dict[str, pd.DataFrame],
+        run_config: RunConfig,
+        selection: SelectionConfig,
+    ) -> Dict[str, Any]:
+        """
+        Selection with the cheap cuts run first on every LLP (in plan_cuts order) and recorded in the bitmask,
+        then the expensive ones in canonical order on the LLPs passing every cut before them.
+        Every canonical stage count is read from the bitmask (passed_all of the cuts up to that stage).
+        """
+        pd.options.mode.chained_assignment = None
+
+        llps = SDFs["LLPs"]
+        volume = self._volume_cut_name(selection)
+        stages = [
+            ("LLPdecay", lambda d: self._select_decaying_llps(d)),
+            (volume, lambda d: (self._select_in_shaft if volume == "InShaft" else self._select_in_cavern)(d, selection, run_config)),
+            ("NotInATLAS", lambda d: self._select_not_in_atlas(d, selection, run_config)),
+            ("Geometry", lambda d: self._select_anubis_intersection(d, selection, run_config)),
+            ("Tracker", lambda d: self._select_tracks(d, SDFs["LLPchildren"], selection, run_config)),
+            ("MET", lambda d: self._select_met(d, selection)),
+            ("Isolation", lambda d: self._select_isolation(d, selection, SDFs)),
+        ]
+        names = [name for name, _ in stages]
+
+        cut_mask = CutFlowMask.empty(
+            llps.index,
+            llps["weight"].to_numpy(dtype=float) if "weight" in llps.columns else None,
+            ("nLLP_LLPdecay", f"nLLP_{volume}") + CUT_KEYS_AFTER_GEOMETRY,
+        )
+
+        def _record(step: Dict[str, Any]) -> None:
+            for key, kept in step["cutIndices"].items():
+                cut_mask.record(key, kept)
+
+        full_steps: Dict[str, Dict[str, Any]] = {}
+        for i in self.plan_cuts(names, self.cut_order):
+            name, run = stages[i]
+            if CUT_COSTS.get(name, max(CUT_COSTS.values())) <= FULL_POPULATION_COST:
+                full_steps[name] = run(llps)
+                _record(full_steps[name])
+
+        df = llps
+        iso_flow: Dict[str, float | int] = {}
+        for name, run in stages:
+            if name in full_steps:
+                df = self._keep_rows_of(df, full_steps[name]["dataframe"])
+                continue
+            step = run(df)
+            _record(step)
+            if name == "Isolation":
+                iso_flow = step["cutFlow"]
+            df = step["dataframe"]
+
+        cut_flow: Dict[str, float | int] = {
+            "nLLP_original": len(llps.index),
+            "nLLP_original_weighted": float(llps["weight"].sum() if "weight" in llps.columns else 0.0),
+        }
+        for k, name in enumerate(names):
+            if name == "Isolation":
+                cut_flow.update(iso_flow)
+                continue
+            passed = cut_mask.passed_all([f"nLLP_{n}" for n in names[: k + 1]])
+            cut_flow[f"nLLP_{name}"] = int(np.count_nonzero(passed))
+            cut_flow[f"nLLP_{name}_weighted"] = float(cut_mask.weights[passed].sum())
+
+        cut_flow["nLLP_Final"] = len(df.index)
+        cut_flow["nLLP_Final_weighted"] = float(df["weight"].sum() if "weight" in df.columns else 0.0)
+        cut_mask.record("nLLP_Final", df.index)
+
+        pd.options.mode.chained_assignment = "warn"
+        return {"cutFlow": cut_flow, "cutIndices": cut_mask.cut_indices(), "cutMask": cut_mask, "finalDF": df}
+
+    @staticmethod
+    def _keep_rows_of(df: pd.DataFrame, selected: pd.DataFrame) -> pd.DataFrame:
+        """Rows of df also in `selected`, with the columns `selected` added (e.g. MET)."""
+        out = df[df.index.isin(selected.index)]
+        extra = [c for c in selected.columns if c not in out.columns]
+        if extra:
+            out = out.assign(**{c: selected[c].reindex(out.index).to_numpy() for c in extra})
+        return out
+
+    def _restrict_n_stations(self, df: pd.DataFrame, n_stations: int) -> Dict[str, Any]:
+        """
+        Keep LLPs with at least max(2, nStations) ANUBIS intersections, from either
+        the batched (nIntersectionsWithANUBIS) or the per-row (intersectionsWithANUBIS) columns.
+        """
+        n_needed = max(2, int(n_stations))
+        if "nIntersectionsWithANUBIS" in df.columns:
+            n_hits = df["nIntersectionsWithANUBIS"].to_numpy()
+        elif "intersectionsWithANUBIS" in df.columns:
+            n_hits = np.fromiter((len(v) for v in df["intersectionsWithANUBIS"]), dtype=np.int64, count=len(df))
+        else:
+            n_hits = np.full(len(df), n_needed)
+        return self._apply_mask_and_pack(df, n_hits >= n_needed, "Geometry")
+
+    @staticmethod
+    def _attach_shared_min_delta_r(
+        df: pd.DataFrame,
+        SDFs: Dict[str, pd.DataFrame],
+        selection: SelectionConfig,
+        shared: Dict[tuple, Any],
+    ) -> pd.DataFrame:
+        """
+        When min ΔR has to be recomputed, do it only for the LLPs reaching isolation, cached per
+        set of jet/track thresholds (sweep variants only compute the LLPs not seen yet), and attach
+        the columns to df so _select_isolation only applies the ΔR cuts.
+        """
+        if ("minDeltaR_Jets" in df.columns and "minDeltaR_Tracks" in df.columns) or (
+            "LLPs" in SDFs and {"minDeltaR_Jets", "minDeltaR_Tracks"} <= set(SDFs["LLPs"].columns)
+        ):
+            return df
+
+        iso_key = ("isolation", selection.minPt.jet, selection.minP.jet, selection.minPt.chargedTrack)
+        known = shared.get(iso_key)
+        todo = df if known is None else df[~df.index.isin(known.index)]
+        if len(todo) or known is None:
+            from SetAnubis.core.Selection.domain.isolation import IsolationComputer
+            cols = IsolationComputer(selection=selection).compute_for_llps(todo, _with_jets_for(SDFs, todo))
+            cols.index = todo.index
+            known = cols if known is None else pd.concat([known, cols])
+            shared[iso_key] = known
+        looked = known.reindex(df.index)
+        return df.assign(
+            minDeltaR_Jets=looked["minDeltaR_Jets"].to_numpy(),
+            minDeltaR_Tracks=looked["minDeltaR_Tracks"].to_numpy(),
+        )
 
     #TODO : 2dv case
     def apply_selection_2dv(
@@ -277,7 +485,7 @@ class SelectionEngine:
             "nLLP_LLPdecay": len(sel.index),
             "nLLP_LLPdecay_weighted": float(sel["weight"].sum() if "weight" in sel.columns else 0.0),
         }
-        cutIndices = {"nLLP_LLPdecay": sel.index.tolist()}
+        cutIndices = {"nLLP_LLPdecay": sel.index}
         return {"dataframe": sel, "cutFlow": cutFlow, "cutIndices": cutIndices}
 
     @staticmethod
@@ -286,41 +494,59 @@ class SelectionEngine:
         return {
             "dataframe": out,
             "cutFlow": {f"nLLP_{key}": len(out.index), f"nLLP_{key}_weighted": float(out["weight"].sum() if "weight" in out.columns else 0.0)},
-            "cutIndices": {f"nLLP_{key}": out.index.tolist()},
+            "cutIndices": {f"nLLP_{key}": out.index},
         }
         
     def _select_in_cavern(self, df: pd.DataFrame, selection: SelectionConfig, run_cfg: RunConfig) -> Dict[str, Any]:
         decay_col = _vertex_col_in_df(df, "decayVertex", run_cfg)
-        mask = df.apply(
-            sel_check_in_cavern,
-            axis=1,
-            args=(selection.geometry, selection.geometry.RPCMaxRadius, decay_col),
-        )
+        geo = selection.geometry
+        if hasattr(geo, "in_cavern_batch"):
+            x, y, z = extract_xyz_arrays(df[decay_col].tolist())
+            mask = pd.Series(geo.in_cavern_batch(x, y, z, geo.RPCMaxRadius), index=df.index)
+        else:
+            mask = df.apply(
+                sel_check_in_cavern,
+                axis=1,
+                args=(geo, geo.RPCMaxRadius, decay_col),
+            )
         return self._apply_mask_and_pack(df, mask, "InCavern")
 
 
     def _select_in_shaft(self, df: pd.DataFrame, selection: SelectionConfig, run_cfg: RunConfig) -> Dict[str, Any]:
         decay_col = _vertex_col_in_df(df, "decayVertex", run_cfg)
-        mask = df.apply(
-            sel_check_in_shaft,
-            axis=1,
-            args=(selection.geometry, selection.geometry.RPCMaxRadius, decay_col),
-        )
+        geo = selection.geometry
+        if hasattr(geo, "in_shaft_batch"):
+            x, y, z = extract_xyz_arrays(df[decay_col].tolist())
+            mask = pd.Series(geo.in_shaft_batch(x, y, z, geo.RPCMaxRadius), index=df.index)
+        else:
+            mask = df.apply(
+                sel_check_in_shaft,
+                axis=1,
+                args=(geo, geo.RPCMaxRadius, decay_col),
+            )
         return self._apply_mask_and_pack(df, mask, "InShaft")
 
 
     def _select_not_in_atlas(self, df: pd.DataFrame, selection: SelectionConfig, run_cfg: RunConfig) -> Dict[str, Any]:
         decay_col = _vertex_col_in_df(df, "decayVertex", run_cfg)
-        mask = ~df.apply(
-            sel_check_in_atlas,
-            axis=1,
-            args=(selection.geometry, True, decay_col),
-        )
+        geo = selection.geometry
+        if hasattr(geo, "in_atlas_batch"):
+            x, y, z = extract_xyz_arrays(df[decay_col].tolist())
+            mask = pd.Series(~geo.in_atlas_batch(x, y, z, True), index=df.index)
+        else:
+            mask = ~df.apply(
+                sel_check_in_atlas,
+                axis=1,
+                args=(geo, True, decay_col),
+            )
         return self._apply_mask_and_pack(df, mask, "NotInATLAS")
 
 
     def _select_anubis_intersection(self, df: pd.DataFrame, selection: SelectionConfig, run_cfg: RunConfig) -> Dict[str, Any]:
         decay_col = _vertex_col_in_df(df, "decayVertex", run_cfg)
+        if _has_intersections_batch(selection.geometry):
+            return self._select_anubis_intersection_batch(df, selection, decay_col)
+
         tmp = df.apply(
             sel_check_llp_intersections,
             axis=1,
@@ -336,7 +562,25 @@ class SelectionEngine:
             out_df = df
 
         cutFlow = {"nLLP_Geometry": len(out_df.index), "nLLP_Geometry_weighted": float(out_df["weight"].sum() if "weight" in out_df.columns else 0.0)}
-        cutIndices = {"nLLP_Geometry": out_df.index.tolist()}
+        cutIndices = {"nLLP_Geometry": out_df.index}
+        return {"dataframe": out_df, "cutFlow": cutFlow, "cutIndices": cutIndices}
+
+    def _select_anubis_intersection_batch(self, df: pd.DataFrame, selection: SelectionConfig, decay_col: str) -> Dict[str, Any]:
+        """
+        Same cut as _select_anubis_intersection with one batched geometry call.
+        Stores the number of hits and the bitmask of hit stations instead of per-row lists.
+        """
+        res = selection.geometry.llp_intersections_batch(df, decay_col, selection.minP.LLP)
+        n_hits = np.asarray(res.n_hits, dtype=np.int64)
+
+        n_needed = max(2, int(selection.nStations))
+        out_df = df.assign(
+            nIntersectionsWithANUBIS=n_hits,
+            intersectionStationMask=np.asarray(res.station_mask, dtype=np.int64),
+        )[n_hits >= n_needed]
+
+        cutFlow = {"nLLP_Geometry": len(out_df.index), "nLLP_Geometry_weighted": float(out_df["weight"].sum() if "weight" in out_df.columns else 0.0)}
+        cutIndices = {"nLLP_Geometry": out_df.index}
         return {"dataframe": out_df, "cutFlow": cutFlow, "cutIndices": cutIndices}
 
 
@@ -376,7 +620,7 @@ class SelectionEngine:
             "nLLP_Tracker": len(out.index),
             "nLLP_Tracker_weighted": float(out["weight"].sum() if "weight" in out.columns else 0.0),
         }
-        cutIndices = {"nLLP_Tracker": out.index.tolist()}
+        cutIndices = {"nLLP_Tracker": out.index}
         return {"dataframe": out, "cutFlow": cutFlow, "cutIndices": cutIndices}
 
     @staticmethod
@@ -410,7 +654,7 @@ class SelectionEngine:
             "nLLP_MET": len(out.index),
             "nLLP_MET_weighted": float(out["weight"].sum() if "weight" in out.columns else 0.0),
         }
-        cutIndices = {"nLLP_MET": out.index.tolist()}
+        cutIndices = {"nLLP_MET": out.index}
         return {"dataframe": out, "cutFlow": cutFlow, "cutIndices": cutIndices}
 
     @staticmethod
@@ -436,7 +680,7 @@ class SelectionEngine:
             # Recalculation if needed
             from SetAnubis.core.Selection.domain.isolation import IsolationComputer
             iso = IsolationComputer(selection=selection)
-            cols = iso.compute_for_llps(df2, SDFs)
+            cols = iso.compute_for_llps(df2, _with_jets_for(SDFs, df2))
             mdj = pd.to_numeric(cols["minDeltaR_Jets"],   errors="coerce")
             mdt = pd.to_numeric(cols["minDeltaR_Tracks"], errors="coerce")
 
@@ -461,9 +705,9 @@ class SelectionEngine:
             "nLLP_IsoAll_weighted": float(iso_all["weight"].sum() if "weight" in iso_all.columns else 0.0),
         }
         cutIndices = {
-            "nLLP_isoJet": iso_jets.index.tolist(),
-            "nLLP_isoCharged": iso_ch.index.tolist(),
-            "nLLP_isoAll": iso_all.index.tolist(),
+            "nLLP_isoJet": iso_jets.index,
+            "nLLP_isoCharged": iso_ch.index,
+            "nLLP_isoAll": iso_all.index,
         }
         return {
             "dataframe": iso_all,
@@ -1,6 +1,9 @@
 from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Optional, Any
+import multiprocessing
+import traceback
 
 import pandas as pd
 
@@ -20,39 +23,96 @@ class SampleResult:
     cutFlow: Dict[str, float | int]
     finalDF: pd.DataFrame
     details: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None   # traceback of a failed source when failures are isolated
 
 @dataclass
 class CombinedResult:
     per_sample: List[SampleResult]
     cutflow_sum: Dict[str, float | int]
 
+def _run_sample(
+    pipeline: SelectionPipeline,
+    name: str,
+    source: EventsBundleSource,
+    sel_cfg: SelectionConfig,
+    run_cfg: RunConfig,
+    isolate_failures: bool,
+) -> SampleResult:
+    """Run the pipeline on one source (in the caller or in a pool worker)."""
+    try:
+        res = pipeline.run(source, sel_cfg, run_cfg)
+    except Exception:
+        if not isolate_failures:
+            raise
+        return SampleResult(name=name, cutFlow={}, finalDF=pd.DataFrame(), error=traceback.format_exc())
+    return SampleResult(
+        name=name,
+        cutFlow=res.get("cutFlow", {}),
+        finalDF=res.get("finalDF", pd.DataFrame()),
+        details={k: v for k, v in res.items() if k not in {"cutFlow", "finalDF"}},
+    )
+
+
 class SelectionManager:
     """
     Use a unique pipeline on multiple sources. Do not construct a pipeline itself but 
     allows for GPU and CPU optimization.
+
+    max_workers > 1 runs the sources in a local process pool (at most max_workers at once).
+    The pipeline, sources and configs are pickled to the workers; file caches of the sources
+    are locked, so two workers never build the same bundle.
     """
-    def __init__(self, pipeline: SelectionPipeline) -> None:
+    def __init__(
+        self,
+        pipeline: SelectionPipeline,
+        max_workers: Optional[int] = None,
+        mp_context: Optional[str] = None,
+    ) -> None:
         self.pipeline = pipeline
+        self.max_workers = max_workers
+        self.mp_context = mp_context
 
     def run_many(
         self,
         named_sources: List[Tuple[str, EventsBundleSource]],
         sel_cfg: SelectionConfig,
         run_cfg: RunConfig,
+        max_workers: Optional[int] = None,
+        isolate_failures: bool = False,
     ) -> CombinedResult:
+        """
+        Run the pipeline on every source. Results keep the order of named_sources.
+
+        max_workers overrides the manager setting; None or 1 keeps the sequential run.
+        With isolate_failures, a failing source gives a SampleResult with `error` set
+        (and no cut-flow) instead of stopping the whole run.
+        """
+        workers = max_workers if max_workers is not None else self.max_workers
         per_sample: List[SampleResult] = []
         sum_cutflow: Dict[str, float | int] = {}
 
-        for name, source in named_sources:
-            res = self.pipeline.run(source, sel_cfg, run_cfg)
-            sample = SampleResult(
-                name=name,
-                cutFlow=res.get("cutFlow", {}),
-                finalDF=res.get("finalDF", pd.DataFrame()),
-                details={k: v for k, v in res.items() if k not in {"cutFlow", "finalDF"}},
-            )
-            per_sample.append(sample)
+        if workers is None or workers <= 1 or len(named_sources) <= 1:
+            for name, source in named_sources:
+                per_sample.append(_run_sample(self.pipeline, name, source, sel_cfg, run_cfg, isolate_failures))
+        else:
+            ctx = multiprocessing.get_context(self.mp_context) if self.mp_context else None
+            with ProcessPoolExecutor(max_workers=min(workers, len(named_sources)), mp_context=ctx) as pool:
+                futures = [
+                    pool.submit(_run_sample, self.pipeline, name, source, sel_cfg, run_cfg, isolate_failures)
+                    for name, source in named_sources
+                ]
+                for (name, _), fut in zip(named_sources, futures):
+                    try:
+                        per_sample.append(fut.result())
+                    except Exception:
+                        # Worker crash or unpicklable payload: isolated like any other failure.
+                        if not isolate_failures:
+                            for f in futures:
+                                f.cancel()
+                            raise
+                        per_sample.append(SampleResult(name=name, cutFlow={}, finalDF=pd.DataFrame(), error=traceback.format_exc()))
 
+        for sample in per_sample:
             for k, v in sample.cutFlow.items():
                 if isinstance(v, (int, float)):
                     sum_cutflow[k] = sum_cutflow.get(k, 0) + v
@@ -1,24 +1,31 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Callable, Dict, List, Optional, Protocol, Any, Iterable
+from collections.abc import Mapping
 
 import numpy as np
 import pandas as pd
 import os
 import pickle
 import gzip
+import shutil
+import copy
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 from SetAnubis.core.Selection.domain.SelectionEngine import (
     SelectionEngine, SelectionConfig, RunConfig
 )
 import dataclasses
-from SetAnubis.core.Selection.domain.JetBuilder import createJetDF
+from SetAnubis.core.Selection.domain.JetBuilder import createJetDF, LazyJetTable
 from SetAnubis.core.Selection.domain.isolation import IsolationComputer
 from SetAnubis.core.Selection.domain.ReweightTransformer import (
     DataBundle, ReweightDecayPositions, RandomProvider
 )
 
 from SetAnubis.core.Selection.domain.DatasetSource import EventsBundleSource, BundleIO, SourceConfig
+from SetAnubis.core.Selection.domain import bundle_store
+from SetAnubis.core.Selection.domain.cutflow import CutFlowMask
 
 class IDataSource(Protocol):
     """Return a df or and bundle already prepared."""
@@ -40,14 +47,27 @@ class InMemoryCache(ICache):
 
 
 class FileCache(ICache):
-    def __init__(self, root_dir: str) -> None:
+    """
+    Cache entries on disk. DataFrames and dicts of DataFrames use the columnar bundle format
+    (bundle_store: memory-mapped, compression None/"zlib"/"lz4"/"zstd"); other values are gzip pickles.
+    """
+    def __init__(self, root_dir: str, compression: Optional[str] = None) -> None:
         self.root = root_dir
+        self.compression = compression
         os.makedirs(self.root, exist_ok=True)
 
     def _path(self, key: str) -> str:
         return os.path.join(self.root, f"{key}.pkl.gz")
 
+    def _columnar_path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}{bundle_store.TABLE_SUFFIX}")
+
     def get(self, key: str) -> Optional[Any]:
+        c = self._columnar_path(key)
+        if os.path.isdir(c):
+            return bundle_store.read_bundle(c)
+        if os.path.isfile(c):
+            return bundle_store.read_table(c)
         p = self._path(key)
         if not os.path.isfile(p):
             return None
@@ -55,11 +75,24 @@ class FileCache(ICache):
             return pickle.load(f)
 
     def set(self, key: str, value: Any) -> None:
-        p = self._path(key)
-        tmp = f"{p}.tmp"
-        with gzip.open(tmp, "wb") as f:
-            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
-        os.replace(tmp, p)
+        p, c = self._path(key), self._columnar_path(key)
+        # drop an entry of the other kind, so get() never returns a stale value
+        if os.path.isdir(c) and not isinstance(value, Mapping):
+            shutil.rmtree(c, ignore_errors=True)
+        elif os.path.isfile(c) and not isinstance(value, pd.DataFrame):
+            os.remove(c)
+        if isinstance(value, (pd.DataFrame, Mapping)) and os.path.isfile(p):
+            os.remove(p)
+
+        if isinstance(value, pd.DataFrame):
+            bundle_store.write_table(value, c, self.compression)
+        elif isinstance(value, Mapping):
+            bundle_store.write_bundle(value, c, self.compression)
+        else:
+            tmp = f"{p}.tmp"
+            with gzip.open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, p)
 
 
 class PreDFTransform(Protocol):
@@ -80,6 +113,71 @@ class PipelineOptions:
     selection_mode: str = "standard"   # "standard" | "2dv"
     # Reweight: If True, we onl apply transfo if a reweighter is done.
     enable_reweight_gate: bool = True
+    # Lazy: jets and min ΔR only for the events/LLPs that reach the isolation cut (same cut-flow).
+    lazy_jets_isolation: bool = False
+
+def event_shard_edges(llps: pd.DataFrame, n_shards: int) -> List[float]:
+    """
+    Lower eventNumber edges of the shards, balanced on the events that contain LLPs.
+    Shard i covers [edges[i], edges[i+1]); the first starts at -inf and the last is open.
+    """
+    events = np.unique(llps["eventNumber"].to_numpy()) if "eventNumber" in llps.columns else np.array([])
+    chunks = [c for c in np.array_split(events, max(1, int(n_shards))) if c.size]
+    return [-np.inf] + [float(c[0]) for c in chunks[1:]]
+
+
+def split_bundle_by_events(bundle: Dict[str, pd.DataFrame], edges: List[float]) -> List[Dict[str, pd.DataFrame]]:
+    """Cut every table of the bundle on eventNumber ranges; tables without eventNumber go whole to each shard."""
+    bounds = list(zip(edges, edges[1:] + [np.inf]))
+    shards: List[Dict[str, pd.DataFrame]] = [{} for _ in bounds]
+    for key, table in bundle.items():
+        if not isinstance(table, pd.DataFrame) or "eventNumber" not in table.columns:
+            for shard in shards:
+                shard[key] = table
+            continue
+        ev = table["eventNumber"].to_numpy()
+        for shard, (lo, hi) in zip(shards, bounds):
+            shard[key] = table[(ev >= lo) & (ev < hi)]
+    return shards
+
+
+def _run_shard(
+    pipeline: "SelectionPipeline",
+    bundle: Dict[str, pd.DataFrame],
+    sel_cfg: SelectionConfig,
+    run_cfg: RunConfig,
+    seed: int,
+) -> Dict[str, Any]:
+    """
+    Per-event pipeline on one shard. The reweight kernels and the RPC efficiency draw random numbers,
+    so each shard seeds them with its own stream instead of replaying the parent's state.
+    """
+    np.random.seed(seed)
+    if pipeline.reweighter is not None:
+        pipeline = copy.copy(pipeline)
+        pipeline.reweighter = copy.copy(pipeline.reweighter)
+        pipeline.reweighter.seed_for_compat = None
+        pipeline.reweighter.reseed(seed)
+    return pipeline._run_bundle(bundle, sel_cfg, run_cfg)
+
+
+def merge_shard_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum the cut-flows, stack finalDF and the cut masks of event-disjoint shards (in shard order)."""
+    cut_flow: Dict[str, float | int] = {}
+    for res in results:
+        for k, v in res.get("cutFlow", {}).items():
+            cut_flow[k] = cut_flow.get(k, 0) + v
+    out: Dict[str, Any] = {
+        "cutFlow": cut_flow,
+        "finalDF": pd.concat([res["finalDF"] for res in results]) if results else pd.DataFrame(),
+        "shardCutFlows": [res.get("cutFlow", {}) for res in results],
+    }
+    masks = [res["cutMask"] for res in results if "cutMask" in res]
+    if masks and len(masks) == len(results):
+        out["cutMask"] = CutFlowMask.concat(masks)
+        out["cutIndices"] = out["cutMask"].cut_indices()
+    return out
+
 
 @dataclass
 class SelectionPipeline:
@@ -120,12 +218,23 @@ class SelectionPipeline:
 
         return out
 
-    def _ensure_jets_and_isolation(self, bundle: Dict[str, pd.DataFrame], sel_cfg: SelectionConfig) -> Dict[str, pd.DataFrame]:
+    def _ensure_jets_and_isolation(
+        self,
+        bundle: Dict[str, pd.DataFrame],
+        sel_cfg: SelectionConfig,
+        compute_isolation: Optional[bool] = None,
+    ) -> Dict[str, pd.DataFrame]:
         out = dict(bundle)
         LLPs = out.get("LLPs", pd.DataFrame())
         cfs  = out.get("chargedFinalStates", pd.DataFrame())
         nfs  = out.get("neutralFinalStates", pd.DataFrame())
 
+        if self.options.lazy_jets_isolation:
+            # The engine clusters (and computes ΔR) on demand at the isolation stage.
+            if self.options.add_jets and (not cfs.empty or not nfs.empty):
+                out["finalStatePromptJets"] = LazyJetTable(cfs, nfs)
+            return out
+
         if self.options.add_jets:
             if not cfs.empty or not nfs.empty:
                 ev = np.unique(np.concatenate([
@@ -134,7 +243,9 @@ class SelectionPipeline:
                 ]))
                 out["finalStatePromptJets"] = createJetDF(ev, cfs, nfs)
 
-        if self.options.compute_isolation and not LLPs.empty:
+        if compute_isolation is None:
+            compute_isolation = self.options.compute_isolation
+        if compute_isolation and not LLPs.empty:
             iso = IsolationComputer(selection=sel_cfg)
             out["LLPs"] = iso.attach_min_delta_r(out)
 
@@ -143,7 +254,61 @@ class SelectionPipeline:
     def run(self, source: EventsBundleSource, sel_cfg: SelectionConfig, run_cfg: RunConfig) -> Dict[str, Any]:
         # Bundle  (already cached by source)
         bundle = source.materialize()
+        return self._run_bundle(bundle, sel_cfg, run_cfg)
+
+    def run_sharded(
+        self,
+        source: EventsBundleSource,
+        sel_cfg: SelectionConfig,
+        run_cfg: RunConfig,
+        n_shards: int,
+        max_workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        mp_context: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Map-reduce version of run(): the bundle is split on eventNumber ranges and each shard runs
+        the whole per-event pipeline (transforms, reweight, jets, isolation, selection) in a worker.
+        Cut-flows are summed, finalDF and cutMask are stacked in event order.
+
+        max_workers=1 runs the shards in this process. `seed` fixes the per-shard random streams
+        (reweighting, RPC efficiency); with RPCeff=1 and no reweighting the result equals run().
+        """
+        bundle = source.materialize()
+        shards = split_bundle_by_events(bundle, event_shard_edges(bundle["LLPs"], n_shards))
+        seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(len(shards))]
+
+        if max_workers == 1 or len(shards) == 1:
+            # _run_shard seeds the global numpy RNG: keep the caller's state
+            state = np.random.get_state()
+            try:
+                results = [_run_shard(self, b, sel_cfg, run_cfg, s) for b, s in zip(shards, seeds)]
+            finally:
+                np.random.set_state(state)
+        else:
+            ctx = multiprocessing.get_context(mp_context) if mp_context else None
+            with ProcessPoolExecutor(max_workers=min(max_workers or len(shards), len(shards)), mp_context=ctx) as pool:
+                futures = [pool.submit(_run_shard, self, b, sel_cfg, run_cfg, s) for b, s in zip(shards, seeds)]
+                results = [f.result() for f in futures]
+
+        return merge_shard_results(results)
+
+    def run_streaming(
+        self,
+        source: EventsBundleSource,
+        sel_cfg: SelectionConfig,
+        run_cfg: RunConfig,
+        chunk_events: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        run() on the partial bundles of source.iter_bundles(chunk_events): one event chunk in memory
+        at a time, only the per-chunk results are kept. Results are merged like run_sharded
+        (with RPCeff=1 and no reweighting the result equals run()).
+        """
+        results = [self._run_bundle(bundle, sel_cfg, run_cfg) for bundle in source.iter_bundles(chunk_events)]
+        return merge_shard_results(results)
 
+    def _run_bundle(self, bundle: Dict[str, pd.DataFrame], sel_cfg: SelectionConfig, run_cfg: RunConfig) -> Dict[str, Any]:
         # Post-bundle transforms
         for t in self.post_bundle_transforms:
             bundle = t(bundle)
@@ -162,6 +327,39 @@ class SelectionPipeline:
 
         return result
 
+    def run_sweep(
+        self,
+        source: EventsBundleSource,
+        sel_cfgs: List[SelectionConfig],
+        run_cfg: RunConfig,
+    ) -> List[Dict[str, Any]]:
+        """
+        Same as run() for several SelectionConfig variants: the bundle is built once and
+        the engine shares the geometry-dependent stages between variants. Standard selection mode only.
+
+        With RPCeff < 1 the variants are not independent samples: the ANUBIS intersections, RPC efficiency
+        draw included, are computed once per geometry, so every variant on that geometry sees the same
+        draw (differences between variants are then free of RPC noise). With cut_order="cheap_first" each
+        variant draws again from the global numpy RNG. Seed numpy before the sweep for reproducible results.
+        """
+        if self.options.selection_mode.lower() in ("2dv", "two-dv", "twodv"):
+            raise NotImplementedError("run_sweep supports the standard selection mode only (no 2dv sweep).")
+        if not sel_cfgs:
+            return []
+
+        bundle = source.materialize()
+        for t in self.post_bundle_transforms:
+            bundle = t(bundle)
+        bundle = self._maybe_reweight(bundle, run_cfg)
+
+        # min ΔR depends on the jet/track thresholds: only attach it if every variant agrees on them.
+        iso_thresholds = {(c.minPt.jet, c.minP.jet, c.minPt.chargedTrack) for c in sel_cfgs}
+        bundle = self._ensure_jets_and_isolation(
+            bundle, sel_cfgs[0], compute_isolation=self.options.compute_isolation and len(iso_thresholds) == 1
+        )
+
+        return self.engine.apply_selection_sweep(bundle, run_cfg, sel_cfgs)
+
 
 @dataclass
 class SelectionPipelineBuilder:
@@ -0,0 +1,309 @@
+from __future__ import annotations
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, List, Optional, Sequence
+import json
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import zlib
+
+import numpy as np
+import pandas as pd
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # optional fast compressor
+    lz4_frame = None
+try:
+    import zstandard
+except ImportError:  # optional fast compressor
+    zstandard = None
+
+# Table file: MAGIC, header length (uint64 LE), JSON header, then the column blobs (ALIGN-byte aligned).
+# Bundle: a directory with one table file per DataFrame, and MANIFEST (key order) written last.
+MAGIC = b"SACOLS01"
+ALIGN = 64
+MANIFEST = "bundle.json"
+TABLE_SUFFIX = ".cols"
+CODECS = ("zlib", "lz4", "zstd")
+
+_NUMPY_KINDS = "biufcmM"
+
+
+def _compress(data: bytes, codec: Optional[str]) -> bytes:
+    if codec is None:
+        return data
+    if codec == "zlib":
+        return zlib.compress(data, 1)
+    if codec == "lz4" and lz4_frame is not None:
+        return lz4_frame.compress(data)
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    raise ValueError(f"Compression '{codec}' is not available (choose from None, {', '.join(CODECS)}; lz4/zstd need their package).")
+
+
+def _decompress(data, codec: Optional[str]) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "lz4":
+        return lz4_frame.decompress(data)
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown compression '{codec}'.")
+
+
+class _TableWriter:
+    def __init__(self, compression: Optional[str]) -> None:
+        self.compression = compression
+        self.blobs: List[bytes] = []
+        self.size = 0
+
+    def blob(self, data: bytes, **meta) -> Dict[str, Any]:
+        packed = _compress(data, self.compression)
+        entry = dict(meta, offset=self.size, nbytes=len(packed), codec=self.compression)
+        pad = (-len(packed)) % ALIGN
+        self.blobs.append(packed + b"\0" * pad)
+        self.size += len(packed) + pad
+        return entry
+
+    def array(self, arr: np.ndarray) -> Dict[str, Any]:
+        arr = np.ascontiguousarray(arr)
+        return self.blob(arr.tobytes(), dtype=arr.dtype.str, shape=list(arr.shape))
+
+    def pickled(self, obj: Any) -> Dict[str, Any]:
+        return self.blob(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def column(self, col: pd.Series) -> Dict[str, Any]:
+        dtype = col.dtype
+        if isinstance(dtype, np.dtype) and dtype.kind in _NUMPY_KINDS:
+            return {"kind": "array", "data": self.array(col.to_numpy())}
+        values = col.to_numpy() if isinstance(dtype, np.dtype) else col.array
+        return {"kind": "pickle", "data": self.pickled(values)}
+
+    def index(self, index: pd.Index) -> Dict[str, Any]:
+        if isinstance(index, pd.RangeIndex):
+            return {"kind": "range", "start": int(index.start), "stop": int(index.stop),
+                    "step": int(index.step), "name": index.name}
+        if (not isinstance(index, pd.MultiIndex) and isinstance(index.dtype, np.dtype)
+                and index.dtype.kind in _NUMPY_KINDS and _json_name(index.name)):
+            return {"kind": "array", "name": index.name, "data": self.array(index.to_numpy())}
+        return {"kind": "pickle", "data": self.pickled(index)}
+
+
+def _json_name(name) -> bool:
+    return name is None or (isinstance(name, (str, int)) and not isinstance(name, bool))
+
+
+def _columnar(df: pd.DataFrame) -> bool:
+    """Column by column storage needs unique, JSON-representable column names."""
+    return (not isinstance(df.columns, pd.MultiIndex) and df.columns.is_unique
+            and all(_json_name(c) for c in df.columns) and _json_name(df.columns.name))
+
+
+def _atomic_write(filepath: str, chunks: Sequence[bytes]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    tmp = f"{filepath}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        for chunk in chunks:
+            fh.write(chunk)
+    os.replace(tmp, filepath)
+
+
+def write_table(df: pd.DataFrame, filepath: str, compression: Optional[str] = None) -> None:
+    """
+    Write one DataFrame as a table file, one blob per column: numeric/bool/datetime columns as raw
+    arrays (dtype in the header), other columns (vertex tuples, index lists, strings...) pickled on
+    their own, which reads back faster than rebuilding the Python objects from arrays.
+    Uncompressed arrays are memory-mapped by read_table. Written through a temporary file.
+    """
+    writer = _TableWriter(compression)
+    header: Dict[str, Any] = {"rows": len(df)}
+    if _columnar(df):
+        header["columns_name"] = df.columns.name
+        header["index"] = writer.index(df.index)
+        header["columns"] = [dict(writer.column(df[c]), name=c) for c in df.columns]
+    else:
+        header["frame"] = writer.pickled(df)
+
+    head = json.dumps(header).encode()
+    start = len(MAGIC) + 8 + len(head)
+    start += (-start) % ALIGN
+    prefix = MAGIC + struct.pack("<Q", len(head)) + head
+    _atomic_write(filepath, [prefix, b"\0" * (start - len(prefix))] + writer.blobs)
+
+
+def is_table_file(filepath: str) -> bool:
+    try:
+        with open(filepath, "rb") as fh:
+            return fh.read(len(MAGIC)) == MAGIC
+    except (FileNotFoundError, IsADirectoryError):
+        return False
+
+
+class TableReader:
+    """
+    Reader of one table file: header parsed on open, columns decoded on demand.
+    Uncompressed arrays are views of a private (copy-on-write) memory map of the file: loading a
+    numeric column reads nothing up front, and writing to it never touches the file.
+    """
+    def __init__(self, filepath: str) -> None:
+        self.path = filepath
+        with open(filepath, "rb") as fh:
+            if fh.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{filepath} is not a columnar table file.")
+            (n,) = struct.unpack("<Q", fh.read(8))
+            self.header = json.loads(fh.read(n))
+            self._start = len(MAGIC) + 8 + n
+            self._start += (-self._start) % ALIGN
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    @property
+    def columns(self) -> List:
+        if "frame" in self.header:
+            return list(self._frame().columns)
+        return [c["name"] for c in self.header["columns"]]
+
+    def __len__(self) -> int:
+        return int(self.header["rows"])
+
+    def _bytes(self, entry: Dict[str, Any]):
+        lo = self._start + entry["offset"]
+        view = memoryview(self._map)[lo: lo + entry["nbytes"]]
+        return view if entry["codec"] is None else _decompress(view, entry["codec"])
+
+    def _array(self, entry: Dict[str, Any]) -> np.ndarray:
+        dtype, shape = np.dtype(entry["dtype"]), tuple(entry["shape"])
+        if entry["codec"] is None:
+            return np.frombuffer(self._bytes(entry), dtype=dtype).reshape(shape)
+        return np.frombuffer(bytearray(self._bytes(entry)), dtype=dtype).reshape(shape)
+
+    def _unpickle(self, entry: Dict[str, Any]) -> Any:
+        return pickle.loads(self._bytes(entry))
+
+    def _frame(self) -> pd.DataFrame:
+        return self._unpickle(self.header["frame"])
+
+    def _column(self, meta: Dict[str, Any]):
+        if meta["kind"] == "array":
+            return self._array(meta["data"])
+        return self._unpickle(meta["data"])
+
+    def _index(self) -> pd.Index:
+        meta = self.header["index"]
+        if meta["kind"] == "range":
+            return pd.RangeIndex(meta["start"], meta["stop"], meta["step"], name=meta["name"])
+        if meta["kind"] == "array":
+            return pd.Index(self._array(meta["data"]), name=meta["name"], copy=False)
+        return self._unpickle(meta["data"])
+
+    def read(self, columns: Optional[Sequence] = None) -> pd.DataFrame:
+        """The table, or only `columns` (in that order). Unknown columns raise KeyError."""
+        if "frame" in self.header:
+            frame = self._frame()
+            return frame if columns is None else frame[list(columns)]
+        metas = {c["name"]: c for c in self.header["columns"]}
+        names = list(metas) if columns is None else list(columns)
+        missing = [c for c in names if c not in metas]
+        if missing:
+            raise KeyError(f"Columns not in {self.path}: {missing}")
+        data = {c: self._column(metas[c]) for c in names}
+        df = pd.DataFrame(data, index=self._index(), copy=False)
+        df.columns.name = self.header["columns_name"]
+        return df
+
+
+def read_table(filepath: str, columns: Optional[Sequence] = None) -> pd.DataFrame:
+    return TableReader(filepath).read(columns)
+
+
+def write_bundle(bundle: Mapping[str, Any], dirpath: str, compression: Optional[str] = None) -> None:
+    """
+    Write a bundle as a directory: one table file per DataFrame (other values are pickled) and a
+    manifest with the key order. Built in a temporary directory swapped in at the end, so readers
+    never see a partial bundle.
+    """
+    dirpath = os.path.abspath(dirpath)
+    tmp = f"{dirpath}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    entries = []
+    for i, (key, value) in enumerate(bundle.items()):
+        if isinstance(value, pd.DataFrame):
+            name = f"t{i:03d}{TABLE_SUFFIX}"
+            write_table(value, os.path.join(tmp, name), compression)
+        else:
+            name = f"t{i:03d}.pkl"
+            _atomic_write(os.path.join(tmp, name), [pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)])
+        entries.append({"key": key, "file": name})
+    _atomic_write(os.path.join(tmp, MANIFEST), [json.dumps({"format": 1, "tables": entries}).encode()])
+
+    old = f"{dirpath}.{os.getpid()}.old"
+    if os.path.exists(dirpath):
+        os.replace(dirpath, old)
+    os.replace(tmp, dirpath)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def is_bundle_dir(dirpath: str) -> bool:
+    return os.path.isfile(os.path.join(dirpath, MANIFEST))
+
+
+class StoredBundle(MutableMapping):
+    """
+    Dict[str->df] view of a bundle directory (write_bundle). A table is read the first time it is
+    accessed and then kept; table(key, columns) reads only some columns without caching.
+    Assigned tables replace the stored ones in memory only. Pickles as a plain dict of frames.
+    """
+    def __init__(self, dirpath: str) -> None:
+        self.path = dirpath
+        with open(os.path.join(dirpath, MANIFEST)) as fh:
+            manifest = json.load(fh)
+        self._files: Dict[str, str] = {e["key"]: e["file"] for e in manifest["tables"]}
+        self._frames: Dict[str, Any] = {}
+        self._keys: List[str] = list(self._files)
+
+    def table(self, key: str, columns: Optional[Sequence] = None) -> pd.DataFrame:
+        if key in self._frames or columns is None:
+            frame = self[key]
+            return frame if columns is None else frame[list(columns)]
+        return TableReader(os.path.join(self.path, self._files[key])).read(columns)
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._frames[key]
+        except KeyError:
+            pass
+        path = os.path.join(self.path, self._files[key])
+        if path.endswith(TABLE_SUFFIX):
+            value = TableReader(path).read()
+        else:
+            with open(path, "rb") as fh:
+                value = pickle.load(fh)
+        self._frames[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self._keys:
+            self._keys.append(key)
+        self._files.pop(key, None)
+        self._frames[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        self._keys.remove(key)
+        self._files.pop(key, None)
+        self._frames.pop(key, None)
+
+    def __iter__(self):
+        return iter(list(self._keys))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __reduce__(self):
+        return (dict, (dict(self.items()),))
+
+
+def read_bundle(dirpath: str) -> StoredBundle:
+    return StoredBundle(dirpath)
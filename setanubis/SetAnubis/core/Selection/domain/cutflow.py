@@ -0,0 +1,111 @@
+from __future__ import annotations
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _bits_dtype(n_keys: int) -> np.dtype:
+    for dt in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if n_keys <= np.iinfo(dt).bits:
+            return np.dtype(dt)
+    raise ValueError(f"Too many cuts for a bitmask: {n_keys} (max 64).")
+
+
+@dataclass
+class CutFlowMask:
+    """
+    Cut-flow of a selection stored as one integer per LLP, one bit per cut.
+    Bit k of an LLP is set when the LLP is in the output of cut `keys[k]`.
+
+    Counts, weighted yields and index lists are derived on demand:
+      - count(key), weighted(key), passed(key), indices(key)
+      - cut_indices() : read-only mapping key -> list of indices (lazy)
+      - to_frame()/from_frame() : store and reload the full selection result.
+    """
+    index: pd.Index
+    bits: np.ndarray
+    weights: np.ndarray
+    keys: Tuple[str, ...]
+
+    @classmethod
+    def empty(cls, index: pd.Index, weights: Optional[np.ndarray], keys: Sequence[str]) -> "CutFlowMask":
+        keys = tuple(keys)
+        w = np.zeros(len(index), dtype=float) if weights is None else np.asarray(weights, dtype=float)
+        return cls(index=index, bits=np.zeros(len(index), dtype=_bits_dtype(len(keys))), weights=w, keys=keys)
+
+    def bit(self, key: str) -> int:
+        try:
+            return self.keys.index(key)
+        except ValueError:
+            raise KeyError(key) from None
+
+    def record(self, key: str, kept: pd.Index) -> None:
+        """Set the bit of `key` for the LLPs whose index is in `kept`."""
+        self.bits[self.index.isin(kept)] |= self.bits.dtype.type(1 << self.bit(key))
+
+    def passed(self, key: str) -> np.ndarray:
+        return (self.bits >> self.bits.dtype.type(self.bit(key))) & 1 == 1
+
+    def passed_all(self, keys: Sequence[str]) -> np.ndarray:
+        want = self.bits.dtype.type(sum(1 << self.bit(k) for k in keys))
+        return (self.bits & want) == want
+
+    def count(self, key: str) -> int:
+        return int(np.count_nonzero(self.passed(key)))
+
+    def weighted(self, key: str) -> float:
+        return float(self.weights[self.passed(key)].sum())
+
+    def indices(self, key: str) -> List:
+        return self.index[self.passed(key)].tolist()
+
+    def cut_indices(self) -> "CutIndices":
+        return CutIndices(self)
+
+    @classmethod
+    def concat(cls, masks: Sequence["CutFlowMask"]) -> "CutFlowMask":
+        """Stack the masks of disjoint LLP sets (e.g. event shards) that used the same cuts."""
+        keys = masks[0].keys
+        if any(m.keys != keys for m in masks):
+            raise ValueError("Cannot concatenate cut-flow masks with different cuts.")
+        return cls(
+            index=masks[0].index.append([m.index for m in masks[1:]]) if len(masks) > 1 else masks[0].index,
+            bits=np.concatenate([m.bits for m in masks]),
+            weights=np.concatenate([m.weights for m in masks]),
+            keys=keys,
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per LLP: (cutMask, weight), indexed like the input LLPs. Cut names are kept in attrs."""
+        out = pd.DataFrame({"cutMask": self.bits, "weight": self.weights}, index=self.index)
+        out.attrs["cutKeys"] = list(self.keys)
+        return out
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, keys: Optional[Sequence[str]] = None) -> "CutFlowMask":
+        keys = tuple(keys if keys is not None else frame.attrs["cutKeys"])
+        bits = frame["cutMask"].to_numpy().astype(_bits_dtype(len(keys)))
+        weights = frame["weight"].to_numpy(dtype=float) if "weight" in frame.columns else np.zeros(len(frame))
+        return cls(index=frame.index, bits=bits, weights=weights, keys=keys)
+
+
+class CutIndices(Mapping):
+    """Read-only `cutIndices` view over a CutFlowMask; lists are only built when a key is read."""
+
+    def __init__(self, mask: CutFlowMask) -> None:
+        self._mask = mask
+
+    def __getitem__(self, key: str) -> List:
+        return self._mask.indices(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._mask.keys)
+
+    def __len__(self) -> int:
+        return len(self._mask.keys)
+
+    def __repr__(self) -> str:
+        return f"CutIndices({', '.join(f'{k}={self._mask.count(k)}' for k in self._mask.keys)})"
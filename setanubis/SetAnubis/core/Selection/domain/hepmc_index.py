@@ -0,0 +1,195 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+import io
+import mmap
+import os
+
+import numpy as np
+
+INDEX_SUFFIX = ".evtidx.npz"
+_COMPRESSED_MAGIC = (b"\x1f\x8b", b"BZh", b"\xfd7zXZ", b"\x28\xb5\x2f\xfd")
+
+
+class _SlicedFile(io.RawIOBase):
+    """Read-only stream: header bytes, then file[start:stop], then footer bytes (nothing is loaded upfront)."""
+
+    def __init__(self, path: str, header: bytes, start: int, stop: int, footer: bytes) -> None:
+        self._parts = [header, (start, stop), footer]
+        self._fh = open(path, "rb")
+        self._fh.seek(start)
+        self._part = 0
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while self._part < len(self._parts):
+            part = self._parts[self._part]
+            if isinstance(part, bytes):
+                chunk = part[self._pos: self._pos + len(b)]
+            else:
+                start, stop = part
+                chunk = self._fh.read(min(len(b), stop - start - self._pos))
+            if chunk:
+                b[: len(chunk)] = chunk
+                self._pos += len(chunk)
+                return len(chunk)
+            self._part += 1
+            self._pos = 0
+        return 0
+
+    def close(self) -> None:
+        self._fh.close()
+        super().close()
+
+
+@dataclass
+class HepmcEventIndex:
+    """
+    Byte offset of every event record ("E ..." line) of an uncompressed ASCII HepMC file (v2 or v3).
+    Any event range can then be streamed (header + records + footer) to pyhepmc without scanning the file:
+    parallel parsing, stop_after_events and event sampling are all O(1) seeks.
+
+    The index is stored next to the file (`<file>.evtidx.npz`) and reused while size/mtime match.
+    """
+    path: str
+    offsets: np.ndarray        # start of each event record, plus the end of the last one
+    header: bytes              # everything before the first event (version, run info)
+    footer: bytes              # everything after the last event (END_EVENT_LISTING)
+    size: int
+    mtime_ns: int
+
+    def __len__(self) -> int:
+        return max(len(self.offsets) - 1, 0)
+
+    @staticmethod
+    def index_path(path: str) -> str:
+        return f"{path}{INDEX_SUFFIX}"
+
+    @classmethod
+    def build(cls, path: str) -> "HepmcEventIndex":
+        st = os.stat(path)
+        with open(path, "rb") as fh:
+            if fh.read(4).startswith(_COMPRESSED_MAGIC):
+                raise ValueError(f"Cannot index compressed HepMC file {path}: decompress it first.")
+            if st.st_size == 0:
+                return cls(path, np.zeros(1, dtype=np.int64), b"", b"", 0, st.st_mtime_ns)
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                starts: List[int] = [0] if mm[:2] == b"E " else []
+                pos = mm.find(b"\nE ")
+                while pos != -1:
+                    starts.append(pos + 1)
+                    pos = mm.find(b"\nE ", pos + 1)
+
+                if not starts:
+                    end = header_end = st.st_size
+                else:
+                    header_end = starts[0]
+                    # footer: first "HepMC::" line after the last record (END_EVENT_LISTING)
+                    footer_at = mm.find(b"\nHepMC::", starts[-1])
+                    end = footer_at + 1 if footer_at != -1 else st.st_size
+                header, footer = mm[:header_end], mm[end:]
+        offsets = np.asarray(starts + [end], dtype=np.int64)
+        return cls(path, offsets, header, footer, st.st_size, st.st_mtime_ns)
+
+    def save(self, index_path: Optional[str] = None) -> str:
+        index_path = index_path or self.index_path(self.path)
+        tmp = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez(
+                fh, offsets=self.offsets,
+                header=np.frombuffer(self.header, dtype=np.uint8), footer=np.frombuffer(self.footer, dtype=np.uint8),
+                stamp=np.asarray([self.size, self.mtime_ns], dtype=np.int64),
+            )
+        os.replace(tmp, index_path)
+        return index_path
+
+    @classmethod
+    def load(cls, path: str, index_path: Optional[str] = None) -> Optional["HepmcEventIndex"]:
+        """Stored index of `path`, None if missing or stale (file changed since)."""
+        index_path = index_path or cls.index_path(path)
+        try:
+            with np.load(index_path) as data:
+                size, mtime_ns = (int(x) for x in data["stamp"])
+                idx = cls(path, data["offsets"].astype(np.int64), data["header"].tobytes(),
+                          data["footer"].tobytes(), size, mtime_ns)
+        except (OSError, KeyError, ValueError):
+            return None
+        st = os.stat(path)
+        return idx if (st.st_size, st.st_mtime_ns) == (size, mtime_ns) else None
+
+    @classmethod
+    def load_or_build(cls, path: str, persist: bool = True) -> "HepmcEventIndex":
+        idx = cls.load(path)
+        if idx is None:
+            idx = cls.build(path)
+            if persist:
+                try:
+                    idx.save()
+                except OSError:
+                    pass  # read-only location: index kept in memory only
+        return idx
+
+    def open_range(self, start: int, stop: int) -> io.BufferedReader:
+        """Binary stream of events [start, stop) as a standalone HepMC file."""
+        start, stop = max(int(start), 0), min(int(stop), len(self))
+        stop = max(stop, start)
+        return io.BufferedReader(_SlicedFile(self.path, self.header, int(self.offsets[start]),
+                                             int(self.offsets[stop]), self.footer), buffer_size=1 << 20)
+
+    @property
+    def format(self) -> str:
+        """pyhepmc reader format; a sliced stream cannot be sniffed, so it comes from the header."""
+        return "hepmc2" if b"HepMC::IO_GenEvent" in self.header else "hepmc3"
+
+    def iter_events(self, start: int = 0, stop: Optional[int] = None) -> Iterator[object]:
+        """pyhepmc events [start, stop)."""
+        import pyhepmc
+
+        with self.open_range(start, len(self) if stop is None else stop) as stream:
+            with pyhepmc.open(stream, format=self.format) as reader:
+                yield from reader
+
+    def split(self, n_parts: int, events: Optional[Sequence[int]] = None) -> List[List[Tuple[int, int]]]:
+        """
+        Split events (all, or the given event positions) into n_parts groups of contiguous runs
+        [start, stop), balanced on bytes. Each group keeps the file order.
+        """
+        runs = _contiguous_runs(np.arange(len(self)) if events is None else np.unique(np.asarray(events, dtype=np.int64)))
+        if not runs:
+            return []
+        sizes = np.asarray([self.offsets[b] - self.offsets[a] for a, b in runs], dtype=float)
+        # cut long runs so that every part can get its share
+        target = max(sizes.sum() / max(int(n_parts), 1), 1.0)
+        pieces: List[Tuple[int, int]] = []
+        for a, b in runs:
+            while b - a > 1 and self.offsets[b] - self.offsets[a] > target:
+                cut = int(np.searchsorted(self.offsets, self.offsets[a] + target, side="right")) - 1
+                cut = min(max(cut, a + 1), b - 1)
+                pieces.append((a, cut))
+                a = cut
+            pieces.append((a, b))
+        # a piece goes to the part holding its middle byte
+        size = np.asarray([self.offsets[b] - self.offsets[a] for a, b in pieces], dtype=float)
+        middle = np.cumsum(size) - size / 2
+        part_of = np.minimum(middle // target, n_parts - 1).astype(int)
+        groups: List[List[Tuple[int, int]]] = [[] for _ in range(int(part_of.max()) + 1)]
+        for piece, g in zip(pieces, part_of):
+            groups[g].append(piece)
+        return [g for g in groups if g]
+
+    def sample(self, n: int, seed: Optional[int] = None) -> np.ndarray:
+        """n distinct event positions drawn uniformly, in file order."""
+        rng = np.random.default_rng(seed)
+        return np.sort(rng.choice(len(self), size=min(int(n), len(self)), replace=False))
+
+
+def _contiguous_runs(events: np.ndarray) -> List[Tuple[int, int]]:
+    if events.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(events) != 1) + 1
+    starts = np.concatenate([[0], breaks])
+    stops = np.concatenate([breaks, [events.size]])
+    return [(int(events[a]), int(events[b - 1]) + 1) for a, b in zip(starts, stops)]
@@ -10,6 +10,88 @@ def _wrap_delta_phi(dphi: np.ndarray) -> np.ndarray:
     """Replie Δφ sur [-π, π]."""
     return (dphi + np.pi) % (2.0 * np.pi) - np.pi
 
+@dataclass(frozen=True)
+class EventCSR:
+    """
+    (eta, phi) of objects sorted by event, CSR layout:
+    objects offsets[i]:offsets[i+1] belong to events[i] (events sorted, unique).
+    """
+    events: np.ndarray
+    offsets: np.ndarray
+    eta: np.ndarray
+    phi: np.ndarray
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "EventCSR":
+        if df is None or df.empty:
+            return cls(np.zeros(0, dtype=np.int64), np.zeros(1, dtype=np.int64), np.zeros(0), np.zeros(0))
+        ev = df["eventNumber"].to_numpy().astype(np.int64)
+        order = np.argsort(ev, kind="stable")
+        events, start = np.unique(ev[order], return_index=True)
+        return cls(
+            events=events,
+            offsets=np.append(start, ev.size).astype(np.int64),
+            eta=df["eta"].to_numpy(dtype=float)[order],
+            phi=df["phi"].to_numpy(dtype=float)[order],
+        )
+
+    def segments(self, event_numbers: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(start, stop) of the objects of each requested event; empty segment if the event has none."""
+        ev = np.asarray(event_numbers).astype(np.int64)
+        pos = np.searchsorted(self.events, ev)
+        if self.events.size == 0:
+            return np.zeros(ev.size, dtype=np.int64), np.zeros(ev.size, dtype=np.int64)
+        pos_c = np.minimum(pos, self.events.size - 1)
+        found = (pos < self.events.size) & (self.events[pos_c] == ev)
+        start = np.where(found, self.offsets[pos_c], 0)
+        stop = np.where(found, self.offsets[pos_c + 1], 0)
+        return start, stop
+
+
+def min_delta_r(
+    eta0: np.ndarray,
+    phi0: np.ndarray,
+    events0: np.ndarray,
+    objects: EventCSR,
+    max_pairs: int = 1 << 22,
+) -> np.ndarray:
+    """
+    Min ΔR between each (eta0, phi0) and the objects of the same event, with Δφ wrapped to [-π, π].
+    -1 when the event has no object or no finite ΔR (legacy convention).
+    Pairs are expanded segment by segment and reduced with np.minimum.reduceat, in chunks of ~max_pairs.
+    """
+    eta0 = np.asarray(eta0, dtype=float)
+    phi0 = np.asarray(phi0, dtype=float)
+    out = np.full(eta0.size, -1.0)
+    start, stop = objects.segments(events0)
+    counts = stop - start
+    rows = np.flatnonzero(counts > 0)
+    if rows.size == 0:
+        return out
+
+    cum = np.cumsum(counts[rows])
+    lo = 0
+    while lo < rows.size:
+        hi = max(int(np.searchsorted(cum, (cum[lo - 1] if lo else 0) + max_pairs, side="right")), lo + 1)
+        r = rows[lo:hi]
+        n = counts[r]
+        seg = np.zeros(r.size, dtype=np.int64)
+        np.cumsum(n[:-1], out=seg[1:])
+        obj = np.repeat(start[r] - seg, n) + np.arange(int(n.sum()))
+        who = np.repeat(np.arange(r.size), n)
+
+        d_eta = objects.eta[obj] - eta0[r][who]
+        d_phi = _wrap_delta_phi(objects.phi[obj] - phi0[r][who])
+        dr2 = d_eta * d_eta + d_phi * d_phi
+        dr2[np.isnan(dr2)] = np.inf
+
+        m = np.minimum.reduceat(dr2, seg)
+        ok = np.isfinite(m)
+        out[r[ok]] = np.sqrt(m[ok])
+        lo = hi
+    return out
+
+
 @dataclass
 class IsolationComputer:
     """
@@ -17,70 +99,19 @@ class IsolationComputer:
     - Jets   : pt > minPt.jet AND p > minP.jet
     - Tracks : pt > minPt.chargedTrack
     If an even doesn't contain any object of a given type, minΔR = -1.
+    Jets and tracks are stored event-sorted (EventCSR), all LLPs are reduced at once.
     """
     selection: "SelectionConfig"
 
-    def _prepare_event_maps(
-        self,
-        jets: pd.DataFrame,
-        tracks: pd.DataFrame,
-    ) -> Tuple[Dict[int, Tuple[np.ndarray, np.ndarray]],
-               Dict[int, Tuple[np.ndarray, np.ndarray]]]:
-        """
-        eventNumber → maps:
-          jets_map[event]   = (eta_jets, phi_jets)
-          tracks_map[event] = (eta_tracks, phi_tracks)
-        """
-
+    def _prepare_event_csr(self, jets: pd.DataFrame, tracks: pd.DataFrame) -> Tuple[EventCSR, EventCSR]:
         if not jets.empty:
-            j = jets[
+            jets = jets[
                 (jets["pt"].to_numpy() > float(self.selection.minPt.jet)) &
                 (jets["p"].to_numpy()  > float(self.selection.minP.jet))
-            ][["eventNumber", "eta", "phi"]]
-        else:
-            j = jets
-
+            ]
         if not tracks.empty:
-            t = tracks[
-                (tracks["pt"].to_numpy() > float(self.selection.minPt.chargedTrack))
-            ][["eventNumber", "eta", "phi"]]
-        else:
-            t = tracks
-
-        jets_map: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
-        tracks_map: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
-
-        if not j.empty:
-            for ev, g in j.groupby("eventNumber", sort=False):
-                jets_map[int(ev)] = (
-                    g["eta"].to_numpy(dtype=float, copy=False),
-                    g["phi"].to_numpy(dtype=float, copy=False),
-                )
-
-        if not t.empty:
-            for ev, g in t.groupby("eventNumber", sort=False):
-                tracks_map[int(ev)] = (
-                    g["eta"].to_numpy(dtype=float, copy=False),
-                    g["phi"].to_numpy(dtype=float, copy=False),
-                )
-
-        return jets_map, tracks_map
-
-    @staticmethod
-    def _min_delta_r_to_set(eta0: float, phi0: float,
-                            etas: np.ndarray, phis: np.ndarray) -> float:
-        """
-        Min ΔR between (eta0, phi0) and object scatter (etas, phis).
-        Return -1 if empty set.
-        """
-        if etas.size == 0:
-            return -1.0
-        dEta = etas - eta0
-        dPhi = _wrap_delta_phi(phis - phi0)
-        dR2  = dEta * dEta + dPhi * dPhi
-
-        m = np.nanmin(dR2)
-        return float(np.sqrt(m)) if np.isfinite(m) else -1.0
+            tracks = tracks[tracks["pt"].to_numpy() > float(self.selection.minPt.chargedTrack)]
+        return EventCSR.from_frame(jets), EventCSR.from_frame(tracks)
 
     def compute_for_llps(
         self,
@@ -94,36 +125,18 @@ class IsolationComputer:
         """
         jets = sample_dfs.get("finalStatePromptJets", pd.DataFrame())
         tracks = sample_dfs.get("chargedFinalStates", pd.DataFrame())
+        jets_csr, tracks_csr = self._prepare_event_csr(jets, tracks)
 
-        jets_map, tracks_map = self._prepare_event_maps(jets, tracks)
-
-        out_min_dR_j = np.empty(len(llps), dtype=float)
-        out_min_dR_t = np.empty(len(llps), dtype=float)
-
-        ev_arr  = llps["eventNumber"].to_numpy(copy=False)
-        eta_arr = llps["eta"].to_numpy(dtype=float, copy=False)
-        phi_arr = llps["phi"].to_numpy(dtype=float, copy=False)
-
-        for i in range(len(llps)):
-            ev = int(ev_arr[i])
-            eta0 = float(eta_arr[i])
-            phi0 = float(phi_arr[i])
-
-            if ev in jets_map:
-                etas_j, phis_j = jets_map[ev]
-                out_min_dR_j[i] = self._min_delta_r_to_set(eta0, phi0, etas_j, phis_j)
-            else:
-                out_min_dR_j[i] = -1.0
+        if llps.empty:
+            return pd.DataFrame({"minDeltaR_Jets": np.zeros(0), "minDeltaR_Tracks": np.zeros(0)})
 
-            if ev in tracks_map:
-                etas_t, phis_t = tracks_map[ev]
-                out_min_dR_t[i] = self._min_delta_r_to_set(eta0, phi0, etas_t, phis_t)
-            else:
-                out_min_dR_t[i] = -1.0
+        ev_arr  = llps["eventNumber"].to_numpy()
+        eta_arr = llps["eta"].to_numpy(dtype=float)
+        phi_arr = llps["phi"].to_numpy(dtype=float)
 
         return pd.DataFrame({
-            "minDeltaR_Jets": out_min_dR_j,
-            "minDeltaR_Tracks": out_min_dR_t,
+            "minDeltaR_Jets": min_delta_r(eta_arr, phi_arr, ev_arr, jets_csr),
+            "minDeltaR_Tracks": min_delta_r(eta_arr, phi_arr, ev_arr, tracks_csr),
         })
 
     def attach_min_delta_r(
@@ -0,0 +1,107 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Legacy (Paul) charge of particles unknown to the model: neither charged nor neutral for LLPAnalyzer.
+UNKNOWN_CHARGE = -0.555
+
+
+class PidPropertyTable:
+    """
+    Charge and mass per PDG id, resolved once through the model (neo) and kept in sorted dense arrays.
+    Lookups on arrays of PIDs are a single searchsorted; PIDs not seen yet are resolved on the fly.
+
+    Unknown PIDs (no model entry, no charge) get UNKNOWN_CHARGE and a NaN mass. PID 0 (missing) is
+    unknown but never reported in unknown_pids.
+    """
+
+    def __init__(self, neo_manager: Any, pids: Iterable[int] = ()) -> None:
+        self.neo = neo_manager
+        self._pids = np.zeros(0, dtype=np.int64)
+        self._charge = np.zeros(0, dtype=float)
+        self._mass = np.zeros(0, dtype=float)
+        self._known = np.zeros(0, dtype=bool)
+        self._scalar: Dict[int, Optional[float]] = {}
+        self.add(pids)
+
+    def _info(self, pid: int) -> Optional[dict]:
+        try:
+            info = self.neo.get_particle(pid) if hasattr(self.neo, "get_particle") else self.neo.get_particle_info(pid)
+        except Exception:
+            return None
+        return info if isinstance(info, dict) else None
+
+    def _mass_of(self, pid: int, info: dict) -> float:
+        m = info.get("mass")
+        if isinstance(m, complex):
+            return float(m.real)
+        try:
+            return float(m)
+        except (TypeError, ValueError):
+            pass
+        # mass given as a model parameter name
+        try:
+            return float(np.real(self.neo.get_particle_mass(pid)))
+        except Exception:
+            return np.nan
+
+    def _resolve(self, pid: int) -> Tuple[bool, float, float]:
+        if pid == 0:
+            return False, UNKNOWN_CHARGE, np.nan
+        info = self._info(pid)
+        if info is None or "charge" not in info:
+            return False, UNKNOWN_CHARGE, np.nan
+        try:
+            charge = float(info["charge"])
+        except Exception:
+            return False, UNKNOWN_CHARGE, np.nan
+        return True, charge, self._mass_of(pid, info)
+
+    def add(self, pids: Iterable[int]) -> None:
+        """Resolve (once) the PIDs not in the table yet."""
+        new = np.setdiff1d(np.fromiter(pids, dtype=np.int64) if not isinstance(pids, np.ndarray) else pids.astype(np.int64), self._pids)
+        if new.size == 0:
+            return
+        resolved = [self._resolve(int(pid)) for pid in new]
+        pids = np.concatenate([self._pids, new])
+        order = np.argsort(pids, kind="stable")
+        self._pids = pids[order]
+        self._known = np.concatenate([self._known, [r[0] for r in resolved]])[order]
+        self._charge = np.concatenate([self._charge, [r[1] for r in resolved]])[order]
+        self._mass = np.concatenate([self._mass, [r[2] for r in resolved]])[order]
+
+    def _positions(self, pids: Any) -> np.ndarray:
+        pids = np.asarray(pids, dtype=np.int64)
+        self.add(np.unique(pids))
+        return np.searchsorted(self._pids, pids)
+
+    def lookup(self, pids: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(known, charge, mass) arrays for an array of PIDs."""
+        pos = self._positions(pids)
+        return self._known[pos], self._charge[pos], self._mass[pos]
+
+    def charges(self, pids: Any, unknown: float = UNKNOWN_CHARGE) -> np.ndarray:
+        pos = self._positions(pids)
+        return np.where(self._known[pos], self._charge[pos], unknown)
+
+    def masses(self, pids: Any) -> np.ndarray:
+        pos = self._positions(pids)
+        return np.where(self._known[pos], self._mass[pos], np.nan)
+
+    def charge(self, pid: Optional[int]) -> Optional[float]:
+        """Scalar lookup; None for a missing or unknown PID (legacy build_from_events convention)."""
+        if pid is None:
+            return None
+        try:
+            return self._scalar[pid]
+        except KeyError:
+            pass
+        pos = self._positions([pid])[0]
+        charge = float(self._charge[pos]) if self._known[pos] else None
+        self._scalar[pid] = charge
+        return charge
+
+    @property
+    def unknown_pids(self) -> List[int]:
+        return [int(p) for p in self._pids[~self._known] if p != 0]
@@ -0,0 +1,159 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from SetAnubis.core.Geometry.domain import intervals as ri
+
+# Distances along a ray from the IP, in mm.
+# beyond the top of the PX14 shaft (the legacy shaft check has no upper end: raise it to follow that)
+DEFAULT_MAX_DISTANCE_MM = 100_000.0
+
+# (offsets, start, stop) CSR arrays: the intervals [start, stop) of ray i are [offsets[i], offsets[i+1])
+Intervals = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def volume_of(geo_mode: str) -> str:
+    """Fiducial volume cut ("InCavern" / "InShaft") of a geometry mode."""
+    mode = (geo_mode or "").lower()
+    if "shaft" in mode:
+        return "InShaft"
+    if (mode == "") or ("ceiling" in mode) or ("cavern" in mode):
+        return "InCavern"
+    raise ValueError(f"Unknown geometry mode: {geo_mode}")
+
+
+def volume_ray_intervals(geo, ux: np.ndarray, uy: np.ndarray, uz: np.ndarray) -> ri.Intervals:
+    """Padded (lo, hi) distances (mm) along the rays where the InCavern/InShaft cut of geoMode holds."""
+    if volume_of(geo.geoMode) == "InShaft":
+        return geo.in_shaft_ray_intervals(ux, uy, uz, geo.RPCMaxRadius)
+    return geo.in_cavern_ray_intervals(ux, uy, uz, geo.RPCMaxRadius)
+
+
+def outside_atlas_ray_intervals(geo, ux: np.ndarray, uy: np.ndarray, uz: np.ndarray,
+                                max_distance_mm: float = DEFAULT_MAX_DISTANCE_MM) -> ri.Intervals:
+    """Padded (lo, hi) distances (mm) in [0, max_distance_mm] where NotInATLAS holds (nothing for NaN directions)."""
+    ux, uy, uz = (np.asarray(u, dtype=float) for u in (ux, uy, uz))
+    ray = ri.interval(np.zeros(ux.shape), float(max_distance_mm))
+    out = ri.difference(ray, geo.in_atlas_ray_intervals(ux, uy, uz, True))
+    return ri.empty_where(out, ~(np.isfinite(ux) & np.isfinite(uy) & np.isfinite(uz)))
+
+
+def fiducial_intervals(
+    geo,
+    ux: np.ndarray,
+    uy: np.ndarray,
+    uz: np.ndarray,
+    max_distance_mm: float = DEFAULT_MAX_DISTANCE_MM,
+) -> Intervals:
+    """
+    Distance intervals [start, stop) along each ray t * (ux, uy, uz) (IP origin, mm) inside the decay volume
+    of the selection: cavern or shaft (by geoMode), outside ATLAS, up to max_distance_mm.
+    The ends are the exact crossings of the volume boundaries (geometry ray intervals combined).
+    Returns CSR arrays (offsets, start, stop): the intervals of ray i are [offsets[i], offsets[i+1]).
+    """
+    volume = volume_ray_intervals(geo, ux, uy, uz)
+    return ri.to_csr(ri.intersect(volume, outside_atlas_ray_intervals(geo, ux, uy, uz, max_distance_mm)))
+
+
+def directions(eta: np.ndarray, phi: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Unit flight directions from (eta, phi), with the reweighting conventions (NaN eta: no direction)."""
+    theta = 2 * np.arctan(np.exp(-np.asarray(eta, dtype=float)))
+    phi = np.asarray(phi, dtype=float)
+    return np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)
+
+
+def decay_probability(
+    offsets: np.ndarray, start: np.ndarray, stop: np.ndarray, decay_length_mm: np.ndarray
+) -> np.ndarray:
+    """
+    Probability of an exponential decay (mean lab decay lengths decay_length_mm, shape (n,) or (n, m))
+    inside the ray intervals: sum over intervals of exp(-start/L) - exp(-stop/L).
+    """
+    lam = np.asarray(decay_length_mm, dtype=float)
+    squeeze = lam.ndim == 1
+    lam = lam.reshape(lam.shape[0], -1)
+    owner = np.repeat(np.arange(lam.shape[0]), np.diff(offsets))
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        l_own = lam[owner]
+        part = np.exp(-start[:, None] / l_own) - np.exp(-stop[:, None] / l_own)
+    part = np.nan_to_num(part, nan=0.0)
+    out = np.column_stack([np.bincount(owner, weights=part[:, j], minlength=lam.shape[0]) for j in range(lam.shape[1])])
+    return out[:, 0] if squeeze else out
+
+
+def _contains(intervals: Intervals, distance_mm: np.ndarray, span: float) -> np.ndarray:
+    """distance_mm[i] in one of the intervals of ray i (one lookup: rays laid end to end, span apart)."""
+    offsets, start, stop = intervals
+    n = offsets.size - 1
+    d = np.asarray(distance_mm, dtype=float)
+    owner = np.repeat(np.arange(n), np.diff(offsets))
+    key = np.arange(n) * span + np.clip(np.nan_to_num(d, nan=-1.0), -1.0, span - 1.0)
+    pos = np.searchsorted(start + owner * span, key, side="right") - 1
+    pos_ok = np.clip(pos, 0, None)
+    found = (pos >= offsets[:-1]) & (pos < offsets[1:]) & (key < stop[pos_ok] + owner[pos_ok] * span) if start.size else np.zeros(n, bool)
+    return found & (d >= 0)
+
+
+@dataclass
+class RayIntervalIndex:
+    """
+    Per-LLP distance intervals (mm, along the (eta, phi) ray from the IP) where a decay point passes each
+    geometry cut: InCavern, InShaft, NotInATLAS, and Geometry. Geometry is cumulative like the cut-flow:
+    in the geoMode volume, outside ATLAS and at least max(2, n_stations) station hits (RPC efficiency not
+    applied; nothing for LLPs below min_p_llp).
+    Built once per LLP sample from the geometry ray intervals; a decay length drawn later
+    (decayVertexDist_<name>) is then classified by an interval lookup instead of geometry queries.
+    Decays beyond max_distance_mm pass no cut.
+    """
+    index: pd.Index
+    intervals: Dict[str, Intervals]
+    max_distance_mm: float
+    n_stations: int
+
+    CUTS = ("InCavern", "InShaft", "NotInATLAS", "Geometry")
+
+    @classmethod
+    def build(
+        cls,
+        geo,
+        llps: pd.DataFrame,
+        n_stations: int = 2,
+        min_p_llp: float = 0.0,
+        max_distance_mm: float = DEFAULT_MAX_DISTANCE_MM,
+    ) -> "RayIntervalIndex":
+        ux, uy, uz = directions(llps["eta"].to_numpy(dtype=float), llps["phi"].to_numpy(dtype=float))
+        # rays below the LLP momentum threshold get no station hits (as llp_intersections_batch)
+        if "p" in llps.columns:
+            p = pd.to_numeric(llps["p"], errors="coerce").to_numpy(dtype=float)
+        else:
+            p = np.full(len(llps), np.nan)
+        eligible = ~(p < float(min_p_llp))
+
+        ray = ri.interval(np.zeros(ux.shape), float(max_distance_mm))
+        sets = {
+            "InCavern": ri.intersect(ray, geo.in_cavern_ray_intervals(ux, uy, uz, geo.RPCMaxRadius)),
+            "InShaft": ri.intersect(ray, geo.in_shaft_ray_intervals(ux, uy, uz, geo.RPCMaxRadius)),
+            "NotInATLAS": outside_atlas_ray_intervals(geo, ux, uy, uz, max_distance_mm),
+        }
+        stations = geo.station_hits_ray_intervals(ux, uy, uz, max(2, int(n_stations)))
+        geometry = ri.intersect(sets[volume_of(geo.geoMode)], sets["NotInATLAS"], stations)
+        sets["Geometry"] = ri.empty_where(geometry, ~eligible)
+
+        intervals = {cut: ri.to_csr(sets[cut]) for cut in cls.CUTS}
+        return cls(llps.index, intervals, float(max_distance_mm), int(n_stations))
+
+    def contains(self, cut: str, distance_mm: np.ndarray) -> np.ndarray:
+        """Mask of the LLPs (index order) whose decay at distance_mm passes `cut`."""
+        return _contains(self.intervals[cut], distance_mm, self.max_distance_mm + 1.0)
+
+    def cut_masks(self, llps: pd.DataFrame, distance_col: str) -> Dict[str, np.ndarray]:
+        """{cut: mask aligned with llps} for decay distances llps[distance_col] (LLPs looked up by index)."""
+        rows = self.index.get_indexer(llps.index)
+        if (rows < 0).any():
+            raise KeyError("LLPs missing from the RayIntervalIndex.")
+        distance = np.full(len(self.index), np.nan)
+        distance[rows] = llps[distance_col].to_numpy(dtype=float)
+        return {cut: self.contains(cut, distance)[rows] for cut in self.CUTS}
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from typing import Any, Dict, Iterable, List, Optional, Protocol, Tuple
 
@@ -8,7 +9,16 @@ class ISelectionGeometry(Protocol):
       in_cavern(decay_vertex_mm, rpc_max_radius) -> bool
       in_shaft(decay_vertex_mm, rpc_max_radius) -> bool
       in_atlas(decay_vertex_mm, strict) -> bool
+      in_cavern_batch(x_mm, y_mm, z_mm, rpc_max_radius) -> np.ndarray[bool]
+      in_shaft_batch(x_mm, y_mm, z_mm, rpc_max_radius) -> np.ndarray[bool]
+      in_atlas_batch(x_mm, y_mm, z_mm, strict) -> np.ndarray[bool]
+      in_cavern_ray_intervals(ux, uy, uz, rpc_max_radius) -> (lo, hi) distances (mm)
+      in_shaft_ray_intervals(ux, uy, uz, rpc_max_radius) -> (lo, hi) distances (mm)
+      in_atlas_ray_intervals(ux, uy, uz, strict) -> (lo, hi) distances (mm)
+      station_hits_ray_intervals(ux, uy, uz, n_hits) -> (lo, hi) distances (mm)
       llp_intersections(row, decay_vertex_col, min_p_llp, plot_trajectory) -> (list, list)
+      llp_intersections_batch(llps_df, decay_vertex_col, min_p_llp, return_points) -> .n_hits, .station_mask arrays
+      has_llp_intersections_batch() -> bool (optional; False: the engine falls back to llp_intersections per row)
       decay_hits(llps_df, children_df, nIntersections, nTracks, requireCharge, prodVertex, decayVertex) -> DataFrame
     """
 
@@ -21,6 +31,23 @@ class ISelectionGeometry(Protocol):
     def in_shaft(self, decay_vertex_mm: Tuple[float, float, float, float], rpc_max_radius: float) -> bool: ...
     def in_atlas(self, decay_vertex_mm: Tuple[float, float, float, float], strict: bool) -> bool: ...
 
+    # Same checks on arrays of decay vertex coordinates (mm), one boolean per vertex.
+    def in_cavern_batch(self, x_mm: np.ndarray, y_mm: np.ndarray, z_mm: np.ndarray, rpc_max_radius: float) -> np.ndarray: ...
+    def in_shaft_batch(self, x_mm: np.ndarray, y_mm: np.ndarray, z_mm: np.ndarray, rpc_max_radius: float) -> np.ndarray: ...
+    def in_atlas_batch(self, x_mm: np.ndarray, y_mm: np.ndarray, z_mm: np.ndarray, strict: bool) -> np.ndarray: ...
+
+    # Same checks along rays from the IP with unit directions (ux, uy, uz): padded (lo, hi) arrays of shape
+    # (n, k), the distances (mm) where the check holds (unused slots are (inf, inf)).
+    def in_cavern_ray_intervals(self, ux: np.ndarray, uy: np.ndarray, uz: np.ndarray,
+                                rpc_max_radius: float) -> Tuple[np.ndarray, np.ndarray]: ...
+    def in_shaft_ray_intervals(self, ux: np.ndarray, uy: np.ndarray, uz: np.ndarray,
+                               rpc_max_radius: float) -> Tuple[np.ndarray, np.ndarray]: ...
+    def in_atlas_ray_intervals(self, ux: np.ndarray, uy: np.ndarray, uz: np.ndarray,
+                               strict: bool) -> Tuple[np.ndarray, np.ndarray]: ...
+    # Distances where a decay along the ray gets at least n_hits station hits (RPC efficiency not applied).
+    def station_hits_ray_intervals(self, ux: np.ndarray, uy: np.ndarray, uz: np.ndarray,
+                                   n_hits: int) -> Tuple[np.ndarray, np.ndarray]: ...
+
     def llp_intersections(
         self,
         row: pd.Series,
@@ -29,6 +56,14 @@ class ISelectionGeometry(Protocol):
         plot_trajectory: bool = False,
     ) -> Tuple[List[Any], List[Any]]: ...
 
+    def llp_intersections_batch(
+        self,
+        llps_df: pd.DataFrame,
+        decay_vertex_col: str,
+        min_p_llp: float,
+        return_points: bool = False,
+    ) -> Any: ...
+
     def decay_hits(
         self,
         llps_df: pd.DataFrame,
@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from SetAnubis.core.Geometry.domain.builder import GeometryBuilder, GeometryBuildConfig
+from SetAnubis.core.Geometry.adapters.geometry_builder import CavernGeometryBuilder
+from SetAnubis.core.Geometry.adapters.selection_adapter import GeometrySelectionAdapter
+from SetAnubis.core.Selection.adapters.input.SelectionGeometryAdapter import SelectionGeometryAdapter
+
+
+def build_selection_geometry(path, geometry_type=""):
+    cfg = GeometryBuildConfig(geo_cache_file=str(path), origin="IP", geometryType=geometry_type)
+    return SelectionGeometryAdapter(GeometrySelectionAdapter(GeometryBuilder(CavernGeometryBuilder(cfg)).build()))
+
+
+@pytest.fixture(scope="session")
+def selection_geometry():
+    return build_selection_geometry
+
+
+@pytest.fixture(scope="session")
+def ceiling_geo(tmp_path_factory):
+    return build_selection_geometry(tmp_path_factory.mktemp("geo") / "ceiling.pkl")
+
+
+@pytest.fixture(scope="session")
+def synthetic_bundle():
+    return make_bundle
+
+
+def make_bundle(n_llp=300, seed=1, n_events=None):
+    """
+    Synthetic sample bundle: LLPs flying towards the cavern ceiling, 1-3 children each, prompt final states.
+    Vertices are (x,y,z,t) tuples in mm relative to the IP, as produced by HepmcFrameBuilder.
+    """
+    rng = np.random.default_rng(seed)
+    n_events = n_events or n_llp
+    ev = np.sort(rng.integers(0, n_events, n_llp))
+    phi = (rng.uniform(-0.5, 3.6, n_llp) + np.pi) % (2 * np.pi) - np.pi
+    eta = rng.uniform(-1.2, 1.2, n_llp)
+    theta = 2 * np.arctan(np.exp(-eta))
+    L = rng.uniform(2, 30, n_llp) * 1000
+    x, y, z = L * np.sin(theta) * np.cos(phi), L * np.sin(theta) * np.sin(phi), L * np.cos(theta)
+    pabs = rng.uniform(0.05, 300, n_llp)
+    E = np.sqrt(pabs ** 2 + 1.0)
+    llps = pd.DataFrame({
+        "eventNumber": ev, "particleIndex": np.arange(n_llp) + 5, "PID": 9900012,
+        "status": np.where(rng.uniform(size=n_llp) < 0.05, 1, 2),
+        "px": pabs * np.sin(theta) * np.cos(phi), "py": pabs * np.sin(theta) * np.sin(phi), "pz": pabs * np.cos(theta),
+        "E": E, "p": pabs, "pt": pabs * np.sin(theta), "eta": eta, "phi": phi, "theta": theta,
+        "boost": E, "beta": pabs / E, "weight": rng.uniform(0.5, 1.5, n_llp),
+        "decayVertex": [tuple(v) for v in np.c_[x, y, z, L]], "prodVertex": [(0.0, 0.0, 0.0, 0.0)] * n_llp,
+        "MET": rng.uniform(0, 100, n_llp), "nChildren": 2, "charge": 0.0,
+    }, index=rng.permutation(np.arange(1000, 1000 + 3 * n_llp))[:n_llp])
+
+    rows = []
+    for li, r in llps.iterrows():
+        for _ in range(int(rng.integers(1, 4))):
+            dphi, deta = rng.normal(0, 0.2, 2)
+            rows.append({"eventNumber": r.eventNumber, "LLPindex": li, "eta": r.eta + deta,
+                         "phi": (r.phi + dphi + np.pi) % (2 * np.pi) - np.pi,
+                         "charge": rng.choice([-1.0, 0.0, 1.0, -0.555]), "prodVertex": r.decayVertex,
+                         "decayVertex": (-1.0, -1.0, -1.0, -1.0), "status": 1, "nChildren": 0,
+                         "pt": rng.uniform(1, 50), "PID": 11})
+    children = pd.DataFrame(rows, index=np.arange(50000, 50000 + len(rows)))
+
+    nfs = 4 * n_events
+    fs = pd.DataFrame({"eventNumber": rng.integers(0, n_events, nfs), "eta": rng.uniform(-3, 3, nfs),
+                       "phi": rng.uniform(-np.pi, np.pi, nfs), "pt": rng.uniform(0, 60, nfs),
+                       "px": rng.normal(0, 20, nfs), "py": rng.normal(0, 20, nfs), "pz": rng.normal(0, 40, nfs)})
+    fs["p"] = np.sqrt(fs.px ** 2 + fs.py ** 2 + fs.pz ** 2)
+    fs["E"] = fs["p"] + 0.1
+    fs["weight"] = 1.0
+    jets = fs.sample(frac=0.3, random_state=seed).copy()
+    jets["pt"] += 10
+    return {
+        "finalStates": fs, "LLPs": llps, "LLPchildren": children, "finalStates_NoLLP": fs,
+        "finalStates_Neutrinos": fs.iloc[:0], "chargedFinalStates": fs.iloc[: nfs // 2],
+        "neutralFinalStates": fs.iloc[nfs // 2:], "finalStatePromptJets": jets,
+    }
+
+
+class StubNeo:
+    """Charge lookup standing in for SetAnubisInterface: unknown PIDs give None like the real manager."""
+    CHARGES = {11: -1.0, -11: 1.0, 13: -1.0, -13: 1.0, 211: 1.0, -211: -1.0, 22: 0.0, 111: 0.0, 2212: 1.0, 9900012: 0.0}
+
+    def get_particle_info(self, pid):
+        if pid not in self.CHARGES:
+            return None
+        return {"pdg_code": pid, "charge": self.CHARGES[pid]}
+
+
+def make_hepmc_events(n_events=20, seed=0):
+    """
+    Small pyhepmc events: two beam protons -> hard vertex -> prompt final states and one HNL (9900012)
+    decaying at a displaced vertex into two charged leptons; some events use an unknown PID (999999).
+    """
+    import pyhepmc
+
+    rng = np.random.default_rng(seed)
+    events = []
+    for ev in range(n_events):
+        evt = pyhepmc.GenEvent(pyhepmc.Units.GEV, pyhepmc.Units.MM)
+        evt.weights = [float(rng.uniform(0.5, 2.0))]
+        b1 = pyhepmc.GenParticle(pyhepmc.FourVector(0, 0, 6500, 6500), 2212, 4)
+        b2 = pyhepmc.GenParticle(pyhepmc.FourVector(0, 0, -6500, 6500), 2212, 4)
+        hard = pyhepmc.GenVertex(pyhepmc.FourVector(*rng.normal(0, 0.01, 3), 0.0))
+        hard.add_particle_in(b1)
+        hard.add_particle_in(b2)
+        evt.add_vertex(hard)
+
+        for _ in range(int(rng.integers(2, 8))):
+            px, py, pz = rng.normal(0, 15, 3)
+            pid = int(rng.choice([211, -211, 22, 11, 999999 if ev % 5 == 0 else 111]))
+            m = 0.0 if pid == 22 else 0.14
+            hard.add_particle_out(pyhepmc.GenParticle(
+                pyhepmc.FourVector(px, py, pz, float(np.sqrt(px * px + py * py + pz * pz + m * m))), pid, 1))
+
+        px, py, pz = rng.normal(0, 40, 3)
+        hnl = pyhepmc.GenParticle(pyhepmc.FourVector(px, py, pz, float(np.sqrt(px * px + py * py + pz * pz + 1.0))), 9900012, 2)
+        hnl.generated_mass = 1.0
+        hard.add_particle_out(hnl)
+        L = rng.uniform(100, 20000)
+        norm = np.sqrt(px * px + py * py + pz * pz)
+        decay = pyhepmc.GenVertex(pyhepmc.FourVector(px / norm * L, py / norm * L, pz / norm * L, L))
+        decay.add_particle_in(hnl)
+        for sign in (1, -1):
+            qx, qy, qz = rng.normal(0, 5, 3)
+            decay.add_particle_out(pyhepmc.GenParticle(
+                pyhepmc.FourVector(qx, qy, qz, float(np.sqrt(qx * qx + qy * qy + qz * qz + 0.011))), 13 * sign, 1))
+        evt.add_vertex(decay)
+        events.append(evt)
+    return events
+
+
+@pytest.fixture(scope="session")
+def synthetic_hepmc():
+    return make_hepmc_events
+
+
+@pytest.fixture(scope="session")
+def stub_neo():
+    return StubNeo()
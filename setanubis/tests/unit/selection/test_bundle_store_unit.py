@@ -0,0 +1,135 @@
+import gzip
+import mmap
+import pickle
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from SetAnubis.core.Selection.domain import bundle_store
+from SetAnubis.core.Selection.domain.DatasetSource import BundleIO, EventsBundleSource
+from SetAnubis.core.Selection.domain.HepMCFrameBuilder import HepmcFrameBuilder
+from SetAnubis.core.Selection.domain.SelectionPipeline import FileCache
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_bundle_round_trip(synthetic_bundle, tmp_path, compression):
+    bundle = synthetic_bundle(80, seed=5)
+    bundle["extra"] = pd.DataFrame({"s": ["a", "b", None], "c": pd.Categorical(["x", "y", "x"]),
+                                    "t": pd.to_datetime(["2020-01-01"] * 3), "l": [[], [1], [2, 3]]},
+                                   index=pd.Index(["r", "s", "t"], name="lbl"))
+    BundleIO.save_bundle(bundle, str(tmp_path / "b.cols"), compression)
+    loaded = BundleIO.load_bundle(str(tmp_path / "b.cols"))
+
+    assert isinstance(loaded, bundle_store.StoredBundle)
+    assert list(loaded) == list(bundle)
+    for key, table in bundle.items():
+        pd.testing.assert_frame_equal(loaded[key], table)
+    pd.testing.assert_frame_equal(pickle.loads(pickle.dumps(loaded))["LLPs"], bundle["LLPs"])
+
+
+def test_tables_are_memory_mapped_and_read_by_column(synthetic_bundle, tmp_path):
+    llps = synthetic_bundle(80, seed=6)["LLPs"]
+    path = str(tmp_path / "llps.cols")
+    bundle_store.write_table(llps, path)
+
+    part = bundle_store.read_table(path, ["eta", "decayVertex"])
+    assert list(part.columns) == ["eta", "decayVertex"]
+    pd.testing.assert_frame_equal(part, llps[["eta", "decayVertex"]])
+    base = part["eta"].to_numpy()
+    while isinstance(base, np.ndarray):
+        base = base.base
+    assert isinstance(base, memoryview) and isinstance(base.obj, mmap.mmap)
+    with pytest.raises(KeyError):
+        bundle_store.read_table(path, ["nope"])
+
+    # writes land in a private copy, never in the file
+    table = bundle_store.read_table(path)
+    table.loc[table.index[0], "eta"] = 99.0
+    assert bundle_store.read_table(path)["eta"].iloc[0] == llps["eta"].iloc[0]
+
+
+def test_legacy_gzip_pickle_still_loads(synthetic_bundle, tmp_path):
+    bundle = synthetic_bundle(40, seed=7)
+    with gzip.open(tmp_path / "old.pkl.gz", "wb") as f:
+        pickle.dump(bundle, f)
+    with gzip.open(tmp_path / "df.pkl.gz", "wb") as f:
+        pickle.dump(bundle["LLPs"], f)
+
+    pd.testing.assert_frame_equal(BundleIO.load_bundle(str(tmp_path / "old.pkl.gz"))["LLPs"], bundle["LLPs"])
+    pd.testing.assert_frame_equal(BundleIO.load_df(str(tmp_path / "df.pkl.gz"), ["eta"]), bundle["LLPs"][["eta"]])
+
+
+def test_source_falls_back_to_legacy_cache_names(synthetic_bundle, synthetic_hepmc, stub_neo, tmp_path):
+    bundle = synthetic_bundle(40, seed=7)
+    with gzip.open(tmp_path / "bundle-k_bundle.pkl.gz", "wb") as f:
+        pickle.dump(bundle, f)
+    df, _ = HepmcFrameBuilder(stub_neo).build_from_events(synthetic_hepmc(20, seed=3))
+
+    source = EventsBundleSource.from_events_dataframe(df, cache_dir=str(tmp_path), df_cache_key="k")
+    pd.testing.assert_frame_equal(source.materialize()["LLPs"], bundle["LLPs"])
+    assert not (tmp_path / "bundle-k_bundle.cols").exists()
+
+    # recomputing writes the columnar entry, which then wins over the legacy file
+    source.force_recompute = True
+    rebuilt = source.materialize()
+    source.force_recompute = False
+    assert (tmp_path / "bundle-k_bundle.cols").is_dir()
+    pd.testing.assert_frame_equal(source.materialize()["LLPs"], rebuilt["LLPs"])
+
+
+def test_source_cache_hit_reads_stored_bundle(synthetic_hepmc, stub_neo, tmp_path):
+    df, _ = HepmcFrameBuilder(stub_neo).build_from_events(synthetic_hepmc(60, seed=3))
+    source = EventsBundleSource.from_events_dataframe(df, cache_dir=str(tmp_path), df_cache_key="k")
+
+    built = dict(source.materialize())
+    cached = source.materialize()
+    assert isinstance(cached, bundle_store.StoredBundle)
+    assert (tmp_path / "bundle-k_bundle.cols" / bundle_store.MANIFEST).is_file()
+    for key, table in built.items():
+        pd.testing.assert_frame_equal(cached[key], table)
+
+
+def test_source_reads_columnar_loader_output(synthetic_hepmc, stub_neo, tmp_path):
+    builder = HepmcFrameBuilder(stub_neo)
+    events = synthetic_hepmc(40, seed=8)
+    columns, _ = builder.build_columnar_from_events(events)
+    calls = []
+
+    def loader(paths):
+        calls.append(paths)
+        return columns
+
+    source = EventsBundleSource.from_hepmc(["a.hepmc"], loader, cache_dir=str(tmp_path))
+    built = source.materialize()
+    assert built["LLPs"]["decayVertex"].tolist() == columns.to_legacy_frame().loc[built["LLPs"].index, "decayVertex"].tolist()
+
+    # df cache: the columnar tables come back as HepmcColumns, without calling the loader
+    df_path = next(tmp_path.glob("hepmc-*_df.cols"))
+    cached = BundleIO.load_df(str(df_path))
+    pd.testing.assert_frame_equal(cached.particles, columns.particles)
+    np.testing.assert_array_equal(cached.children_ids, columns.children_ids)
+    shutil.rmtree(next(tmp_path.glob("hepmc-*_bundle.cols")))
+    again = EventsBundleSource.from_hepmc(["a.hepmc"], loader, cache_dir=str(tmp_path)).materialize()
+    assert len(calls) == 1
+    for key, table in built.items():
+        pd.testing.assert_frame_equal(again[key], table)
+
+
+def test_file_cache_formats(synthetic_bundle, tmp_path):
+    cache = FileCache(str(tmp_path))
+    bundle = synthetic_bundle(30, seed=2)
+
+    cache.set("bundle", bundle)
+    cache.set("df", bundle["LLPs"])
+    cache.set("other", {"a": 1, "b": [1, 2]})
+    cache.set("scalar", 3.5)
+    assert cache.get("missing") is None
+    pd.testing.assert_frame_equal(cache.get("bundle")["LLPchildren"], bundle["LLPchildren"])
+    pd.testing.assert_frame_equal(cache.get("df"), bundle["LLPs"])
+    assert dict(cache.get("other")) == {"a": 1, "b": [1, 2]}
+    assert cache.get("scalar") == 3.5
+
+    cache.set("df", 1)
+    assert cache.get("df") == 1
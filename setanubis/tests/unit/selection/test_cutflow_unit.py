@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from SetAnubis.core.Selection.domain.cutflow import CutFlowMask
+from SetAnubis.core.Selection.domain.SelectionEngine import (
+    SelectionEngine, SelectionConfig, RunConfig, MinThresholds,
+)
+
+
+def test_cutflow_mask_counts_and_roundtrip():
+    index = pd.Index([10, 11, 12, 13])
+    mask = CutFlowMask.empty(index, np.array([1.0, 2.0, 3.0, 4.0]), ["a", "b"])
+    mask.record("a", pd.Index([10, 12, 13]))
+    mask.record("b", pd.Index([12]))
+
+    assert mask.bits.dtype == np.uint8
+    assert mask.count("a") == 3 and mask.weighted("a") == 8.0
+    assert mask.indices("b") == [12]
+    assert dict(mask.cut_indices()) == {"a": [10, 12, 13], "b": [12]}
+
+    back = CutFlowMask.from_frame(mask.to_frame())
+    assert back.keys == ("a", "b")
+    assert back.indices("a") == [10, 12, 13]
+    with pytest.raises(KeyError):
+        mask.count("c")
+
+
+def test_apply_selection_cut_mask_matches_cut_flow(ceiling_geo, synthetic_bundle):
+    sel = SelectionConfig(geometry=ceiling_geo, minMET=30.0,
+                          minP=MinThresholds(LLP=0.1, chargedTrack=0.1, neutralTrack=0.1, jet=0.1),
+                          nStations=2, nIntersections=2, nTracks=1)
+    res = SelectionEngine().apply_selection(synthetic_bundle(400, seed=3), RunConfig(), sel)
+
+    cut_mask, cut_flow = res["cutMask"], res["cutFlow"]
+    assert cut_flow["nLLP_Final"] > 0
+    for key in ("nLLP_LLPdecay", "nLLP_InCavern", "nLLP_NotInATLAS", "nLLP_Geometry", "nLLP_Tracker", "nLLP_MET", "nLLP_Final"):
+        assert cut_mask.count(key) == cut_flow[key]
+        assert cut_mask.weighted(key) == pytest.approx(cut_flow[f"{key}_weighted"])
+    assert res["cutIndices"]["nLLP_Final"] == res["finalDF"].index.tolist()
+    # sequential cuts: passing a later stage implies passing every earlier one
+    assert np.all(cut_mask.passed("nLLP_Tracker") <= cut_mask.passed("nLLP_Geometry"))
+
+
+def test_apply_selection_sweep_matches_single_runs(ceiling_geo, synthetic_bundle):
+    from dataclasses import replace
+    from SetAnubis.core.Selection.domain.SelectionEngine import MinDR
+
+    base = SelectionConfig(geometry=ceiling_geo, minMET=30.0,
+                           minP=MinThresholds(LLP=0.1, chargedTrack=0.1, neutralTrack=0.1, jet=0.1))
+    variants = [
+        base,
+        replace(base, nStations=3, minMET=10.0),
+        replace(base, nIntersections=1, minDR=MinDR(jet=0.8, chargedTrack=0.2, neutralTrack=0.4)),
+        replace(base, minP=MinThresholds(LLP=50.0, chargedTrack=0.1, neutralTrack=0.1, jet=0.1)),
+        replace(base, minPt=MinThresholds(jet=40.0)),
+    ]
+    bundle = synthetic_bundle(400, seed=4)
+    engine = SelectionEngine()
+
+    swept = engine.apply_selection_sweep(bundle, RunConfig(), variants)
+    assert len(swept) == len(variants)
+    for sel, res in zip(variants, swept):
+        single = engine.apply_selection(bundle, RunConfig(), sel)
+        assert res["cutFlow"] == pytest.approx(single["cutFlow"])
+        assert res["finalDF"].index.tolist() == single["finalDF"].index.tolist()
+    assert len({r["cutFlow"]["nLLP_Final"] for r in swept}) > 1
+
+
+def test_cheap_first_plan_keeps_final_selection_and_exact_counts(ceiling_geo, synthetic_bundle):
+    sel = SelectionConfig(geometry=ceiling_geo, minMET=30.0,
+                          minP=MinThresholds(LLP=0.1, chargedTrack=0.1, neutralTrack=0.1, jet=0.1))
+    bundle = synthetic_bundle(400, seed=6)
+
+    canonical = SelectionEngine().apply_selection(bundle, RunConfig(), sel)
+    planned = SelectionEngine(cut_order="cheap_first").apply_selection(bundle, RunConfig(), sel)
+
+    assert planned["finalDF"].index.tolist() == canonical["finalDF"].index.tolist()
+    assert planned["finalDF"].columns.tolist() == canonical["finalDF"].columns.tolist()
+    assert "cutFlowInexact" not in planned
+    assert list(planned["cutFlow"]) == list(canonical["cutFlow"])
+    assert planned["cutFlow"] == pytest.approx(canonical["cutFlow"])
+    for key in ("nLLP_LLPdecay", "nLLP_InCavern", "nLLP_MET", "nLLP_Final"):
+        assert planned["cutMask"].count(key) >= planned["cutFlow"][key]
+    assert planned["cutMask"].count("nLLP_MET") > canonical["cutMask"].count("nLLP_MET")
+
+
+def test_plan_cuts_orders_by_cost():
+    names = ["LLPdecay", "InCavern", "NotInATLAS", "Geometry", "Tracker", "MET", "Isolation"]
+    assert SelectionEngine.plan_cuts(names, "canonical") == list(range(len(names)))
+    assert [names[i] for i in SelectionEngine.plan_cuts(names)] == [
+        "LLPdecay", "MET", "InCavern", "NotInATLAS", "Geometry", "Tracker", "Isolation"]
+    with pytest.raises(ValueError):
+        SelectionEngine(cut_order="fastest")
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from SetAnubis.core.Selection.domain.LLPAnalyzer import ChildrenHunter, EventGraph, LLPAnalyzer
+
+HNL = 9900012
+
+
+def _event_frame(children_as_str=False):
+    # event 0: p(1) -> HNL(2) -> HNL copy(3) -> mu(4) + pi(5) ; pi(5) -> gamma(6) + gamma(7) ; 4 also points to a missing 99
+    # event 1: HNL(1) -> mu(2) + nu(3)
+    rows = [
+        (0, 1, 2212, [2], 4), (0, 2, HNL, [3], 2), (0, 3, HNL, [4, 5], 2), (0, 4, 13, [99], 1),
+        (0, 5, 211, [6, 7], 2), (0, 6, 22, [], 1), (0, 7, 22, [], 1),
+        (1, 1, HNL, [2, 3], 2), (1, 2, -13, [], 1), (1, 3, 14, [], 1),
+    ]
+    df = pd.DataFrame(rows, columns=["eventNumber", "particleIndex", "PID", "childrenIndices", "status"])
+    df["nChildren"] = df["childrenIndices"].map(len)
+    if children_as_str:
+        df["childrenIndices"] = df["childrenIndices"].map(str)
+    df["px"] = df["py"] = df["pt"] = 1.0
+    df["charge"] = np.where(df["PID"].isin([13, -13, 211]), 1.0, 0.0)
+    df["prodVertexDist"] = 0.0
+    df.index = df.index + 100
+    return df
+
+
+def test_scalar_accessors():
+    g = EventGraph(_event_frame(children_as_str=True))
+    assert g.row_of(0, 5) == 104 and g.row_of(3, 1) is None
+    assert g.children_of(0, 5) == [6, 7] and g.children_of(7, 7) == []
+    assert g.pid_of(1, 1) == HNL and g.pid_of(9, 9) == 0
+    assert g.nchildren_of(0, 3) == 2
+    assert g.child_rows[g.child_offsets[3]: g.child_offsets[4]].tolist() == [-1]
+
+
+def test_batched_hunt_skips_llp_copies():
+    g = EventGraph(_event_frame())
+    hunter = ChildrenHunter(g, llp_pids=[HNL])
+    roots = np.flatnonzero(g.pid == HNL)
+    owner, rows = hunter.hunt_rows(roots)
+    found = {int(g.labels[roots[o]]): sorted(g.labels[rows[owner == o]].tolist()) for o in range(roots.size)}
+
+    assert found == {101: [], 102: [103, 104, 105, 106], 107: [108, 109]}
+    assert sorted(hunter.hunt(0, 3)) == [4, 5, 6, 7]
+    assert hunter.hunt(0, 2) == []
+
+
+def test_llp_children_table():
+    bundle = LLPAnalyzer(_event_frame(), pt_min_cfg={}).create_sample_dataframes(llpid=HNL)
+    children = bundle["LLPchildren"]
+    assert children.index.tolist() == [103, 104, 105, 106, 108, 109]
+    assert children["LLPindex"].tolist() == [102, 102, 102, 102, 107, 107]
+    assert bundle["LLPs"].index.tolist() == [102, 107]
+
+
+def test_sample_tables_are_lazy_row_selections():
+    df = _event_frame()
+    # event 1 also has a prompt photon (px=py=1) and a neutrino, not coming from the HNL
+    extra = df.loc[[108, 108]].assign(particleIndex=[4, 5], PID=[22, 12], charge=0.0)
+    df = pd.concat([df, extra.set_axis([110, 111])])
+    df["extra"] = "x"
+    analyzer = LLPAnalyzer(df, pt_min_cfg={}, columns=["extra"])
+    assert analyzer.df.columns.tolist() == df.columns.tolist()
+    bundle = LLPAnalyzer(df, pt_min_cfg={}, columns=[]).create_sample_dataframes(llpid=HNL)
+
+    assert list(bundle) == ["finalStates", "LLPs", "LLPchildren", "finalStates_NoLLP",
+                            "finalStates_Neutrinos", "chargedFinalStates", "neutralFinalStates"]
+    assert "extra" not in bundle.base.columns and not bundle._frames
+    assert bundle.rows("finalStates_Neutrinos").tolist() == [11]
+    assert bundle["neutralFinalStates"].index.tolist() == [110]
+    assert bundle["LLPs"][["METx", "MET"]].to_numpy().tolist() == [[0.0, 0.0], [1.0, np.sqrt(2)]]
+    assert set(bundle._frames) == {"LLPs"} and set(bundle._shared) == {"neutralFinalStates"}
+
+    bundle["LLPs"] = bundle["LLPs"].iloc[:1]
+    del bundle["finalStates"]
+    assert len(bundle) == 6 and len(bundle["LLPs"]) == 1
+
+
+def test_sample_tables_pickle_as_dict():
+    import pickle
+
+    df = _event_frame()
+    bundle = pickle.loads(pickle.dumps(LLPAnalyzer(df, pt_min_cfg={}).create_sample_dataframes(llpid=HNL)))
+    assert type(bundle) is dict and len(bundle["LLPchildren"]) == 6
+    assert df.columns.tolist() == _event_frame().columns.tolist()
+
+
+def test_species_tables_share_final_states():
+    # event 1 HNL replaced by a second species decaying to the same mu + nu
+    df = _event_frame()
+    df.loc[107, "PID"] = 9900014
+    analyzer = LLPAnalyzer(df, pt_min_cfg={})
+    tables = analyzer.create_species_dataframes([HNL, 9900014])
+
+    assert list(tables) == [HNL, 9900014]
+    assert tables[HNL]["LLPs"].index.tolist() == [102]
+    assert tables[HNL]["LLPchildren"].index.tolist() == [103, 104, 105, 106]
+    assert tables[9900014]["LLPchildren"]["LLPindex"].tolist() == [107, 107]
+    assert tables[HNL]["finalStates_NoLLP"] is tables[9900014]["finalStates_NoLLP"]
+    assert tables[HNL]["finalStates_NoLLP"].empty
+
+    single = analyzer.create_sample_dataframes(HNL)
+    for key in ("LLPs", "LLPchildren"):
+        pd.testing.assert_frame_equal(single[key], tables[HNL][key])
+    # alone, the other species' decay products are prompt final states again
+    assert single["finalStates_NoLLP"].index.tolist() == [108]
+    assert single["finalStates_Neutrinos"].index.tolist() == [109]
+
+
+def test_columnar_input_matches_legacy_frame(synthetic_hepmc, stub_neo):
+    from SetAnubis.core.Selection.domain.HepMCFrameBuilder import HepmcFrameBuilder
+    from SetAnubis.core.Selection.domain.pid_table import UNKNOWN_CHARGE
+
+    builder = HepmcFrameBuilder(stub_neo)
+    events = synthetic_hepmc(30, seed=4)
+    legacy, _ = builder.build_from_events(events)
+    columns, _ = builder.build_columnar_from_events(events)
+    # unknown PIDs: None in the legacy frame, the -0.555 sentinel in the columnar one
+    legacy = legacy.assign(charge=pd.to_numeric(legacy["charge"]).astype(float).fillna(UNKNOWN_CHARGE))
+
+    g, g_col = EventGraph(legacy), EventGraph(columns)
+    np.testing.assert_array_equal(g_col.child_offsets, g.child_offsets)
+    np.testing.assert_array_equal(g_col.child_rows, g.child_rows)
+
+    expected = LLPAnalyzer(legacy, pt_min_cfg={"chargedTrack": 1.0}).create_sample_dataframes(HNL)
+    tables = LLPAnalyzer(columns, pt_min_cfg={"chargedTrack": 1.0}).create_sample_dataframes(HNL)
+    assert len(expected["LLPs"]) and len(expected["LLPchildren"])
+    for key, table in expected.items():
+        np.testing.assert_array_equal(tables.rows(key), expected.rows(key))
+        got = tables[key]
+        assert not {"childrenIndices", "parentIndices"} & set(got.columns)
+        shared = [c for c in table.columns if c in got.columns]
+        pd.testing.assert_frame_equal(got[shared], table[shared], check_dtype=False)
+    # the cuts read 4-tuple vertices on the LLP tables only
+    for key in ("LLPs", "LLPchildren"):
+        assert tables[key]["decayVertex"].tolist() == expected[key]["decayVertex"].tolist()
+        assert tables[key]["prodVertex"].tolist() == expected[key]["prodVertex"].tolist()
+    assert "decayVertex" not in tables["finalStates"].columns
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from SetAnubis.core.Geometry.domain.utils import extract_xyz_arrays
+from SetAnubis.core.Selection.adapters.input import SelectionGeometryAdapter as sel_geo_module
+from SetAnubis.core.Selection.domain.SelectionEngine import SelectionEngine, SelectionConfig, RunConfig
+
+
+@pytest.fixture(scope="module", params=["", "shaft+cone"])
+def sel_geo(request, tmp_path_factory, selection_geometry):
+    return selection_geometry(tmp_path_factory.mktemp("geo") / "cavern.pkl", request.param)
+
+
+@pytest.fixture(scope="module")
+def points_mm():
+    rng = np.random.default_rng(7)
+    n = 3000
+    return (rng.uniform(-25e3, 25e3, n), rng.uniform(-20e3, 60e3, n), rng.uniform(-40e3, 40e3, n))
+
+
+def _scalar(check, x, y, z, arg):
+    return np.array([check((xi, yi, zi, 0.0), arg) for xi, yi, zi in zip(x, y, z)])
+
+
+def test_in_cavern_batch_matches_scalar(sel_geo, points_mm):
+    for radius in (sel_geo.RPCMaxRadius, float("inf")):
+        expected = _scalar(sel_geo.in_cavern, *points_mm, radius)
+        got = sel_geo.in_cavern_batch(*points_mm, radius)
+        assert got.dtype == bool
+        assert np.array_equal(got, expected)
+        assert expected.any()
+
+
+def test_in_shaft_batch_matches_scalar(sel_geo, points_mm):
+    expected = _scalar(sel_geo.in_shaft, *points_mm, sel_geo.RPCMaxRadius)
+    assert np.array_equal(sel_geo.in_shaft_batch(*points_mm, sel_geo.RPCMaxRadius), expected)
+
+
+@pytest.mark.parametrize("strict", [True, False])
+def test_in_atlas_batch_matches_scalar(sel_geo, points_mm, strict):
+    expected = _scalar(sel_geo.in_atlas, *points_mm, strict)
+    assert np.array_equal(sel_geo.in_atlas_batch(*points_mm, strict), expected)
+
+
+def test_unparsable_vertex_never_passes(sel_geo):
+    df = pd.DataFrame({"decayVertex": [(0.0, 5000.0, 0.0, 0.0), "not a vertex", "(0.0, 15000.0, 0.0, 0.0)"]})
+    out = SelectionEngine()._select_in_cavern(df, SelectionConfig(geometry=sel_geo), RunConfig())
+    assert 1 not in out["dataframe"].index
+    assert out["cutFlow"]["nLLP_InCavern"] == len(out["dataframe"])
+
+
+def test_intersect_stations_batch_matches_scalar(sel_geo):
+    query = sel_geo._g.geometry
+    rng = np.random.default_rng(11)
+    n = 1500
+    theta, phi = rng.uniform(0.1, 3.0, n), rng.uniform(-np.pi, np.pi, n)
+    phi[:20] = np.pi / 2
+    X, Y, Z = rng.uniform(-15, 15, n), rng.uniform(-10, 19, n), rng.uniform(-25, 25, n)
+
+    res = query.intersect_stations_simple_batch(theta, phi, (X, Y, Z), None, return_points=True)
+
+    expected_points = []
+    for k in range(n):
+        single = query.intersect_stations_simple(theta[k], phi[k], (X[k], Y[k], Z[k]), None)
+        assert res.n_hits[k] == len(single.points)
+        expected_points.extend(single.points)
+
+    assert res.n_hits.sum() > 0
+    assert np.allclose(res.points, np.asarray(expected_points).reshape(-1, 3))
+    assert np.array_equal(np.diff(res.offsets), res.n_hits)
+    assert np.all((res.station_mask != 0) == (res.n_hits > 0))
+
+
+@pytest.mark.parametrize("n_intersections,n_tracks", [(1, 1), (2, 1), (2, 2), (1, 0)])
+def test_decay_hits_batch_matches_row_loop(ceiling_geo, synthetic_bundle, monkeypatch, n_intersections, n_tracks):
+    bundle = synthetic_bundle(250, seed=5)
+    args = (bundle["LLPs"], bundle["LLPchildren"], n_intersections, n_tracks, True, "prodVertex", "decayVertex")
+
+    batched = ceiling_geo.decay_hits(*args)
+    monkeypatch.setattr(sel_geo_module, "_get_intersect_batch_fn", lambda g: None)
+    looped = ceiling_geo.decay_hits(*args)
+
+    assert len(looped) > 0
+    assert set(batched.index) == set(looped.index)
+
+
+class _NoBatchIntersections:
+    """Geometry adapter proxy without checkIntersectionsWithANUBISBatch (pre-batch geometries)."""
+    def __init__(self, inner):
+        self._inner = inner
+
+    def __getattr__(self, name):
+        if name == "checkIntersectionsWithANUBISBatch":
+            raise AttributeError(name)
+        return getattr(self._inner, name)
+
+
+def test_intersection_cut_without_batch_geometry_uses_row_path(ceiling_geo, synthetic_bundle):
+    llps = synthetic_bundle(150, seed=12)["LLPs"]
+    sel = SelectionConfig(geometry=ceiling_geo)
+    legacy = SelectionConfig(geometry=sel_geo_module.SelectionGeometryAdapter(_NoBatchIntersections(ceiling_geo._g)))
+    assert not legacy.geometry.has_llp_intersections_batch()
+
+    batched = SelectionEngine()._select_anubis_intersection(llps, sel, RunConfig())
+    rows = SelectionEngine()._select_anubis_intersection(llps, legacy, RunConfig())
+
+    assert "intersectionsWithANUBIS" in rows["dataframe"].columns
+    assert len(rows["dataframe"]) > 0
+    assert rows["dataframe"].index.tolist() == batched["dataframe"].index.tolist()
+
+
+def test_intersect_stations_batch_three_rays(sel_geo):
+    query = sel_geo._g.geometry
+    theta, phi = np.array([0.9, 1.4, 2.1]), np.array([1.2, 1.6, 2.0])
+    X, Y, Z = np.array([1.0, -3.0, 5.0]), np.array([2.0, 0.5, -1.0]), np.array([-4.0, 6.0, 0.0])
+    expected = [len(query.intersect_stations_simple(theta[k], phi[k], (X[k], Y[k], Z[k]), None).points) for k in range(3)]
+
+    for run in (query.intersect_stations_simple_batch, query._intersect_stations_loop):
+        res = run(theta, phi, (X, Y, Z), None, False)
+        assert res.n_hits.tolist() == expected
+    assert sum(expected) > 0
+    with pytest.raises(ValueError):
+        query.intersect_stations_simple_batch(theta[:2], phi[:2], np.c_[X, Y, Z][:2], None)
+
+
+def test_extract_xyz_arrays_reads_every_vertex_form():
+    values = [(1.0, 2.0, 3.0, 0.0), "(4.0, 5.0, 6.0, 1.0)", [7, 8, 9], {"x": 1.5, "y": 2.5, "z": 3.5},
+              pd.Series([0.5, 0.25, 0.125]), (np.nan, 1.0, 1.0, 0.0), "not a vertex", (1.0, 2.0)]
+    x, y, z = extract_xyz_arrays(values)
+    assert np.allclose(np.c_[x, y, z][:5], [[1, 2, 3], [4, 5, 6], [7, 8, 9], [1.5, 2.5, 3.5], [0.5, 0.25, 0.125]])
+    assert np.isnan(x[5]) and np.isnan(np.c_[x, y, z][6:]).all()
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from SetAnubis.core.Selection.domain.HepMCFrameBuilder import HepmcFrameBuilder
+from SetAnubis.core.Selection.domain.pid_table import UNKNOWN_CHARGE
+
+
+def test_columnar_builder_matches_legacy_frame(synthetic_hepmc, stub_neo):
+    builder = HepmcFrameBuilder(stub_neo)
+    events = synthetic_hepmc(25, seed=2)
+
+    legacy, unknown = builder.build_from_events(events)
+    columns, unknown_col = builder.build_columnar_from_events(events)
+
+    assert unknown_col == unknown == [999999]
+    assert not any(dt == object for dt in columns.particles.dtypes)
+    assert len(columns.particles) == len(legacy)
+
+    rebuilt = columns.to_legacy_frame()
+    # unknown PIDs: None in the legacy frame, the -0.555 sentinel in the columnar one
+    legacy = legacy.assign(charge=pd.to_numeric(legacy["charge"]).astype(float).fillna(UNKNOWN_CHARGE))
+    pd.testing.assert_frame_equal(rebuilt, legacy, check_dtype=False)
+
+
+def test_columnar_parent_child_offsets(synthetic_hepmc, stub_neo):
+    columns, _ = HepmcFrameBuilder(stub_neo).build_columnar_from_events(synthetic_hepmc(3, seed=3))
+    df = columns.particles
+    hnl = int(np.flatnonzero(df["PID"].to_numpy() == 9900012)[0])
+
+    children = columns.children_of(hnl)
+    assert len(children) == 2
+    same_event = df[df["eventNumber"] == df["eventNumber"].iat[hnl]]
+    assert set(same_event.set_index("particleIndex").loc[children, "PID"]) == {13, -13}
+    assert columns.parent_offsets[-1] == len(columns.parent_ids) == df["nParents"].sum()
+
+
+
+def test_numpy_fast_path_matches_object_path(synthetic_hepmc, stub_neo):
+    import pyhepmc
+    from SetAnubis.core.Selection.domain.HepMCFrameBuilder import HepmcFrameOptions
+
+    events = synthetic_hepmc(12, seed=5)
+    # particle attached to no vertex: root vertex as production vertex, no parents, no decay
+    events[3].add_particle(pyhepmc.GenParticle(pyhepmc.FourVector(0.0, 0.0, 5.0, 5.0), 22, 1))
+
+    fast, unknown_fast = HepmcFrameBuilder(stub_neo).build_columnar_from_events(events)
+    slow, unknown_slow = HepmcFrameBuilder(
+        stub_neo, options=HepmcFrameOptions(numpy_fast_path=False)
+    ).build_columnar_from_events(events)
+
+    assert unknown_fast == unknown_slow
+    pd.testing.assert_frame_equal(fast.particles, slow.particles)
+    for name in ("parent_offsets", "parent_ids", "children_offsets", "children_ids"):
+        np.testing.assert_array_equal(getattr(fast, name), getattr(slow, name))
+
+    photon = fast.particles[(fast.particles["eventNumber"] == 3) & (fast.particles["pz"] == 5.0)].iloc[0]
+    assert photon["nParents"] == 0 and photon["decayVertexDist"] == 0.0 and photon["eta"] == 1E9
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from SetAnubis.core.Selection.domain.HepMCFrameBuilder import HepmcFrameBuilder, HepmcFrameOptions
+from SetAnubis.core.Selection.domain.hepmc_index import HepmcEventIndex
+
+
+@pytest.fixture
+def hepmc_file(tmp_path, synthetic_hepmc):
+    import pyhepmc
+
+    path = str(tmp_path / "events.hepmc")
+    with pyhepmc.open(path, "w") as f:
+        for evt in synthetic_hepmc(40, seed=7):
+            f.write(evt)
+    return path
+
+
+def test_index_offsets_and_persistence(hepmc_file):
+    idx = HepmcEventIndex.load_or_build(hepmc_file)
+    assert len(idx) == 40
+    assert os.path.exists(HepmcEventIndex.index_path(hepmc_file))
+
+    with open(hepmc_file, "rb") as fh:
+        data = fh.read()
+    assert all(data[o: o + 2] == b"E " for o in idx.offsets[:-1])
+    assert idx.header.startswith(b"HepMC::Version") and b"END_EVENT_LISTING" in idx.footer
+
+    reloaded = HepmcEventIndex.load(hepmc_file)
+    np.testing.assert_array_equal(reloaded.offsets, idx.offsets)
+    with open(hepmc_file, "ab") as fh:
+        fh.write(b"\n")
+    assert HepmcEventIndex.load(hepmc_file) is None  # stale after the file changed
+
+
+def test_split_covers_events_in_order(hepmc_file):
+    idx = HepmcEventIndex.build(hepmc_file)
+    groups = idx.split(3)
+    assert len(groups) == 3
+    covered = [ev for g in groups for a, b in g for ev in range(a, b)]
+    assert covered == list(range(40))
+
+    picked = idx.sample(9, seed=1)
+    covered = [ev for g in idx.split(4, picked) for a, b in g for ev in range(a, b)]
+    assert covered == picked.tolist()
+
+
+def test_build_from_file_matches_serial_build(hepmc_file, stub_neo):
+    import pyhepmc
+
+    builder = HepmcFrameBuilder(stub_neo)
+    with pyhepmc.open(hepmc_file) as stream:
+        ref, unknown = builder.build_from_events(stream)
+
+    df, unknown_par = builder.build_from_file(hepmc_file, n_workers=2)
+    pd.testing.assert_frame_equal(df, ref)
+    assert unknown_par == unknown
+
+    columns, _ = builder.build_from_file(hepmc_file, columnar=True)
+    assert columns.particles["eventNumber"].tolist() == ref["eventNumber"].tolist()
+
+    picked = [3, 4, 5, 17, 30]
+    sampled, _ = builder.build_from_file(hepmc_file, events=picked)
+    expected = ref[ref["eventNumber"].isin(picked)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(sampled, expected)
+
+    first, _ = HepmcFrameBuilder(stub_neo, options=HepmcFrameOptions(stop_after_events=6)).build_from_file(hepmc_file)
+    assert sorted(first["eventNumber"].unique()) == list(range(6))
+
+
+def test_build_from_file_uses_an_explicit_empty_index(hepmc_file, stub_neo):
+    full = HepmcEventIndex.build(hepmc_file)
+    empty = HepmcEventIndex(path=full.path, offsets=full.offsets[:1], header=full.header, footer=full.footer,
+                            size=full.size, mtime_ns=full.mtime_ns)
+    assert len(empty) == 0
+
+    df, _ = HepmcFrameBuilder(stub_neo).build_from_file(hepmc_file, index=empty)
+    assert df.empty
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from SetAnubis.core.Selection.domain.isolation import EventCSR, min_delta_r
+
+
+def _brute_force(eta0, phi0, ev0, objects):
+    out = []
+    for e, p, ev in zip(eta0, phi0, ev0):
+        sub = objects[objects.eventNumber == ev]
+        if sub.empty:
+            out.append(-1.0)
+            continue
+        dphi = (sub.phi.to_numpy() - p + np.pi) % (2 * np.pi) - np.pi
+        out.append(float(np.sqrt(np.min((sub.eta.to_numpy() - e) ** 2 + dphi ** 2))))
+    return np.array(out)
+
+
+def test_min_delta_r_matches_brute_force_in_chunks():
+    rng = np.random.default_rng(1)
+    objects = pd.DataFrame({"eventNumber": rng.integers(0, 50, 400),
+                            "eta": rng.uniform(-3, 3, 400), "phi": rng.uniform(-np.pi, np.pi, 400)})
+    ev0 = rng.integers(0, 60, 300)
+    eta0, phi0 = rng.uniform(-3, 3, 300), rng.uniform(-np.pi, np.pi, 300)
+
+    csr = EventCSR.from_frame(objects)
+    expected = _brute_force(eta0, phi0, ev0, objects)
+    np.testing.assert_allclose(min_delta_r(eta0, phi0, ev0, csr), expected)
+    np.testing.assert_allclose(min_delta_r(eta0, phi0, ev0, csr, max_pairs=5), expected)
+
+
+def test_min_delta_r_wraps_phi_and_flags_missing_events():
+    csr = EventCSR.from_frame(pd.DataFrame({"eventNumber": [1, 1], "eta": [0.0, 2.0], "phi": [np.pi - 0.05, 0.0]}))
+    out = min_delta_r(np.array([0.0, 0.0, np.nan]), np.array([-np.pi + 0.05, 0.0, 0.0]), np.array([1, 2, 1]), csr)
+    np.testing.assert_allclose(out, [0.1, -1.0, -1.0])
+    assert min_delta_r(np.zeros(2), np.zeros(2), np.zeros(2), EventCSR.from_frame(pd.DataFrame())).tolist() == [-1.0, -1.0]
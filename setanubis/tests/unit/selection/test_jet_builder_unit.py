@@ -0,0 +1,30 @@
+import numpy as np
+
+from SetAnubis.core.Selection.domain.JetBuilder import JetClustering
+
+
+def test_cluster_events_matches_per_event_clustering():
+    rng = np.random.default_rng(0)
+    counts = rng.integers(0, 25, 200)
+    counts[:3] = 0
+    n = int(counts.sum())
+    px, py, pz = rng.normal(0, 20, (3, n))
+    E = np.sqrt(px ** 2 + py ** 2 + pz ** 2) + 0.1
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    clustering = JetClustering()
+    jpx, jpy, jpz, jE, jet_offsets = clustering.cluster_events(px, py, pz, E, offsets)
+
+    assert jet_offsets.size == counts.size + 1 and jet_offsets[-1] == jpx.size
+    for i in range(counts.size):
+        a, b = offsets[i], offsets[i + 1]
+        ref = clustering.cluster_event(px[a:b], py[a:b], pz[a:b], E[a:b]) if b > a else []
+        ja, jb = jet_offsets[i], jet_offsets[i + 1]
+        assert jb - ja == len(ref)
+        np.testing.assert_allclose(jpx[ja:jb], [j.px for j in ref])
+        np.testing.assert_allclose(jE[ja:jb], [j.E for j in ref])
+
+
+def test_cluster_events_without_constituents():
+    out = JetClustering().cluster_events(np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(4, dtype=int))
+    assert out[0].size == 0 and out[4].tolist() == [0, 0, 0, 0]
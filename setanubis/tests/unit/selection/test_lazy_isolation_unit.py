@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from SetAnubis.core.Selection.domain.DatasetSource import EventsBundleSource
+from SetAnubis.core.Selection.domain.JetBuilder import LazyJetTable, createJetDF
+from SetAnubis.core.Selection.domain.SelectionEngine import SelectionConfig, RunConfig, MinThresholds
+from SetAnubis.core.Selection.domain.SelectionPipeline import SelectionPipelineBuilder
+
+
+def _bundle_without_jets(synthetic_bundle, seed):
+    bundle = synthetic_bundle(300, seed=seed, n_events=150)
+    del bundle["finalStatePromptJets"]
+    return bundle
+
+
+def test_lazy_jet_table_matches_eager_clustering(synthetic_bundle):
+    bundle = _bundle_without_jets(synthetic_bundle, 11)
+    cfs, nfs = bundle["chargedFinalStates"], bundle["neutralFinalStates"]
+    lazy = LazyJetTable(cfs, nfs)
+    assert lazy.n_clustered_events == 0
+
+    wanted = [3, 7, 7, 42]
+    jets = lazy.for_events(wanted)
+    eager = createJetDF(np.unique(np.concatenate([cfs.eventNumber, nfs.eventNumber])), cfs, nfs)
+
+    assert lazy.n_clustered_events == 3
+    expected = eager[eager.eventNumber.isin(wanted)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(jets.reset_index(drop=True), expected)
+    lazy.for_events([3])
+    assert lazy.n_clustered_events == 3
+
+    # later requests mix cached and new events, across the accumulated parts
+    wanted = [3, 42, 60, 61, 10**6]
+    jets = lazy.for_events(wanted)
+    assert lazy.n_clustered_events == 6
+    expected = eager[eager.eventNumber.isin(wanted)].sort_values("eventNumber", kind="stable").reset_index(drop=True)
+    pd.testing.assert_frame_equal(jets.sort_values("eventNumber", kind="stable").reset_index(drop=True), expected)
+    assert lazy.for_events([10**6]).empty
+
+
+def test_lazy_pipeline_keeps_cut_flow(ceiling_geo, synthetic_bundle):
+    sel = SelectionConfig(geometry=ceiling_geo, minMET=30.0,
+                          minP=MinThresholds(LLP=0.1, chargedTrack=0.1, neutralTrack=0.1, jet=0.1))
+    source = EventsBundleSource.from_bundle_dict(_bundle_without_jets(synthetic_bundle, 12))
+
+    eager = SelectionPipelineBuilder().build().run(source, sel, RunConfig())
+    lazy = SelectionPipelineBuilder().set_options(lazy_jets_isolation=True).build().run(source, sel, RunConfig())
+
+    assert lazy["cutFlow"] == pytest.approx(eager["cutFlow"])
+    assert lazy["finalDF"].index.tolist() == eager["finalDF"].index.tolist()
+    assert lazy["cutFlow"]["nLLP_IsoAll"] < lazy["cutFlow"]["nLLP_MET"]
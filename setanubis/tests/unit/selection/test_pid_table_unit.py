@@ -0,0 +1,50 @@
+import numpy as np
+
+from SetAnubis.core.Selection.domain.pid_table import PidPropertyTable, UNKNOWN_CHARGE
+
+
+class CountingNeo:
+    def __init__(self):
+        self.calls = []
+
+    def get_particle(self, pid):
+        self.calls.append(pid)
+        if pid == 9900012:
+            return {"charge": 0, "mass": "MN1"}
+        if pid in (13, -13):
+            return {"charge": -np.sign(pid), "mass": complex(0.10566, 0.0)}
+        if pid == 666:
+            raise KeyError(pid)
+        return None
+
+    def get_particle_mass(self, pid):
+        return 1.5 if pid == 9900012 else None
+
+
+def test_vectorised_lookup_resolves_each_pid_once():
+    neo = CountingNeo()
+    table = PidPropertyTable(neo)
+    pids = np.array([13, -13, 9900012, 13, 999999, 0, 13, 666])
+
+    np.testing.assert_allclose(table.charges(pids), [-1, 1, 0, -1, UNKNOWN_CHARGE, UNKNOWN_CHARGE, -1, UNKNOWN_CHARGE])
+    np.testing.assert_allclose(table.masses(pids[:3]), [0.10566, 0.10566, 1.5])
+    assert np.isnan(table.masses([999999, 0])).all()
+
+    table.charges(pids)
+    assert table.charge(-13) == 1.0 and table.charge(999999) is None and table.charge(None) is None
+    assert sorted(neo.calls) == sorted([13, -13, 9900012, 999999, 666])
+    assert table.unknown_pids == [666, 999999]
+
+
+def test_builder_shares_table_across_builds(synthetic_hepmc, stub_neo):
+    from SetAnubis.core.Selection.domain.HepMCFrameBuilder import HepmcFrameBuilder
+
+    table = PidPropertyTable(stub_neo, pids=[11, -11])
+    first = HepmcFrameBuilder(stub_neo, pid_table=table)
+    second = HepmcFrameBuilder(stub_neo, pid_table=table)
+    _, unknown = first.build_columnar_from_events(synthetic_hepmc(25, seed=2))
+    n_resolved = len(table._pids)
+    _, unknown2 = second.build_from_events(synthetic_hepmc(25, seed=2))
+
+    assert unknown == unknown2 == [999999]
+    assert len(table._pids) == n_resolved
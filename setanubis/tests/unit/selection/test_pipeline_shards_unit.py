@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from SetAnubis.core.Selection.domain.DatasetSource import EventsBundleSource
+from SetAnubis.core.Selection.domain.SelectionEngine import SelectionConfig, RunConfig, MinThresholds
+from SetAnubis.core.Selection.domain.SelectionPipeline import (
+    SelectionPipelineBuilder, event_shard_edges, split_bundle_by_events,
+)
+
+
+def test_split_bundle_by_events_partitions_every_table(synthetic_bundle):
+    bundle = synthetic_bundle(200, seed=8)
+    shards = split_bundle_by_events(bundle, event_shard_edges(bundle["LLPs"], 4))
+
+    assert len(shards) == 4
+    for key in ("LLPs", "LLPchildren", "finalStates"):
+        assert sum(len(s[key]) for s in shards) == len(bundle[key])
+        events = [set(s[key]["eventNumber"]) for s in shards]
+        assert all(a.isdisjoint(b) for i, a in enumerate(events) for b in events[i + 1:])
+    assert all(len(s["LLPs"]) for s in shards)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_sharded_matches_single_run(ceiling_geo, synthetic_bundle, workers):
+    pipeline = SelectionPipelineBuilder().set_options(add_jets=False).build()
+    sel = SelectionConfig(geometry=ceiling_geo, minMET=30.0,
+                          minP=MinThresholds(LLP=0.1, chargedTrack=0.1, neutralTrack=0.1, jet=0.1))
+    source = EventsBundleSource.from_bundle_dict(synthetic_bundle(300, seed=9, n_events=120))
+
+    single = pipeline.run(source, sel, RunConfig())
+    sharded = pipeline.run_sharded(source, sel, RunConfig(), n_shards=3, max_workers=workers, mp_context="fork")
+
+    assert len(sharded["shardCutFlows"]) == 3
+    assert sharded["cutFlow"] == pytest.approx(single["cutFlow"])
+    assert sorted(sharded["finalDF"].index) == sorted(single["finalDF"].index)
+    assert sorted(sharded["cutIndices"]["nLLP_Geometry"]) == sorted(single["cutIndices"]["nLLP_Geometry"])
+
+
+def test_in_process_shards_keep_global_rng_state(ceiling_geo, synthetic_bundle):
+    pipeline = SelectionPipelineBuilder().set_options(add_jets=False).build()
+    sel = SelectionConfig(geometry=ceiling_geo, minP=MinThresholds(LLP=0.1, chargedTrack=0.1, neutralTrack=0.1, jet=0.1))
+    source = EventsBundleSource.from_bundle_dict(synthetic_bundle(60, seed=3))
+
+    np.random.seed(123)
+    expected = np.random.random(3)
+    np.random.seed(123)
+    pipeline.run_sharded(source, sel, RunConfig(), n_shards=2, max_workers=1, seed=5)
+    assert np.array_equal(np.random.random(3), expected)
+
+
+def test_run_sweep_rejects_2dv_mode(ceiling_geo, synthetic_bundle):
+    pipeline = SelectionPipelineBuilder().set_options(add_jets=False, selection_mode="2dv").build()
+    source = EventsBundleSource.from_bundle_dict(synthetic_bundle(20, seed=1))
+    with pytest.raises(NotImplementedError):
+        pipeline.run_sweep(source, [SelectionConfig(geometry=ceiling_geo)], RunConfig())
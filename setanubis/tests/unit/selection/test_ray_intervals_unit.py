@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from SetAnubis.core.Selection.domain.ray_intervals import RayIntervalIndex, decay_probability, directions, fiducial_intervals
+from SetAnubis.core.Selection.domain.ReweightTransformer import DataBundle, DecayProbabilityWeights, LifetimeKernel
+
+KEYS = ["finalStates", "LLPs", "LLPchildren", "finalStates_NoLLP", "finalStates_Neutrinos",
+        "chargedFinalStates", "neutralFinalStates"]
+
+
+@pytest.fixture(scope="module", params=["", "shaft+cone"])
+def sel_geo(request, tmp_path_factory, selection_geometry):
+    return selection_geometry(tmp_path_factory.mktemp("geo") / "cavern.pkl", request.param)
+
+
+def test_fiducial_intervals_match_point_checks(sel_geo):
+    rng = np.random.default_rng(11)
+    n = 300
+    ux, uy, uz = directions(rng.uniform(-1.5, 1.5, n), rng.uniform(0.2, np.pi - 0.2, n))
+    ux[0] = np.nan
+    offsets, start, stop = fiducial_intervals(sel_geo, ux, uy, uz, max_distance_mm=60000.0)
+    assert offsets[1] == 0 and np.diff(offsets[1:]).sum() > 10
+
+    dist = np.linspace(0.0, 60000.0, 2001)[1:-1]
+    ray = np.repeat(np.arange(n), dist.size)
+    d = np.tile(dist, n)
+    x, y, z = ux[ray] * d, uy[ray] * d, uz[ray] * d
+    volume = sel_geo.in_shaft_batch if "shaft" in sel_geo.geoMode else sel_geo.in_cavern_batch
+    expected = volume(x, y, z, sel_geo.RPCMaxRadius) & ~sel_geo.in_atlas_batch(x, y, z, True) & np.isfinite(x)
+
+    inside = np.zeros(d.size, dtype=bool)
+    for i in range(np.diff(offsets).max()):
+        has = offsets[ray] + i < offsets[ray + 1]
+        j = offsets[ray[has]] + i
+        inside[has] |= (d[has] > start[j]) & (d[has] < stop[j])
+    assert np.array_equal(inside, expected)
+
+
+def test_decay_probability():
+    offsets, start, stop = np.array([0, 2, 3, 3]), np.array([1000.0, 1500.0, 1000.0]), np.array([1400.0, 2000.0, 2000.0])
+    lam = np.array([[500.0, 5000.0]] * 3)
+    p = decay_probability(offsets, start, stop, lam)
+    expected = np.exp(-1000 / lam[1]) - np.exp(-2000 / lam[1])
+    assert np.allclose(p[1], expected) and (p[0] < p[1]).all() and (p[2] == 0).all()
+    assert np.allclose(decay_probability(offsets, start, stop, lam[:, 0]), p[:, 0])
+
+
+def test_decay_probability_weights(ceiling_geo, synthetic_bundle):
+    bundle = synthetic_bundle(n_llp=60, seed=2)
+    llps = bundle["LLPs"]
+    llps.loc[llps.index[0], "PID"] = 5
+    taus = [1e-10, 1e-9]
+    weights = DecayProbabilityWeights(ceiling_geo, taus, llp_pid=9900012)
+    prob = weights.probabilities(llps)
+
+    assert prob.shape == (60, 2) and prob[0].tolist() == [0.0, 0.0]
+    assert ((prob >= 0) & (prob <= 1)).all() and prob.sum() > 0
+
+    # same value as the fraction of LifetimeKernel draws landing in the fiducial intervals of each ray
+    offsets, start, stop = weights.intervals(llps)
+    rng = np.random.default_rng(0)
+    sub = llps.iloc[1:].loc[np.repeat(llps.index[1:], 4000)]
+    L = LifetimeKernel().sample_decay_length_mm(sub, 1e-10, rng).reshape(59, 4000)
+    ray = np.arange(1, 60)
+    inside = np.zeros(L.shape, dtype=bool)
+    for i in range(offsets.max()):
+        has = offsets[ray] + i < offsets[ray + 1]
+        j = offsets[ray[has]] + i
+        inside[has] |= (L[has] >= start[j, None]) & (L[has] < stop[j, None])
+    assert abs(inside.mean(axis=1).sum() - prob[1:, 0].sum()) < 5 * np.sqrt(prob[1:, 0].sum() / 4000) + 1e-3
+
+    out = weights.apply(DataBundle.from_dict({k: bundle[k] for k in KEYS}))
+    assert np.array_equal(out.LLPs["decayProb_1e-09"], prob[:, 1])
+
+
+def test_ray_interval_index_matches_geometry(sel_geo, synthetic_bundle):
+    llps = synthetic_bundle(n_llp=40, seed=5)["LLPs"]
+    index = RayIntervalIndex.build(sel_geo, llps, n_stations=2, min_p_llp=0.1)
+
+    ux, uy, uz = directions(llps["eta"].to_numpy(), llps["phi"].to_numpy())
+    L = np.random.default_rng(3).uniform(0, 40000, (5, len(llps)))
+    for dist in L:
+        x, y, z = ux * dist, uy * dist, uz * dist
+        df = llps.assign(dist=dist, vertex=list(zip(x, y, z, dist))).iloc[::-1]
+        masks = index.cut_masks(df, "dist")
+
+        x, y, z = x[::-1], y[::-1], z[::-1]
+        in_cavern = sel_geo.in_cavern_batch(x, y, z, sel_geo.RPCMaxRadius)
+        in_shaft = sel_geo.in_shaft_batch(x, y, z, sel_geo.RPCMaxRadius)
+        not_in_atlas = ~sel_geo.in_atlas_batch(x, y, z, True)
+        hits = np.asarray(sel_geo.llp_intersections_batch(df, "vertex", 0.1).n_hits)
+        volume = in_shaft if "shaft" in sel_geo.geoMode else in_cavern
+        assert np.array_equal(masks["InCavern"], in_cavern)
+        assert np.array_equal(masks["InShaft"], in_shaft)
+        assert np.array_equal(masks["NotInATLAS"], not_in_atlas)
+        assert np.array_equal(masks["Geometry"], volume & not_in_atlas & (hits >= 2))
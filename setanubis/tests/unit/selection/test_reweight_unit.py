@@ -0,0 +1,65 @@
+import numpy as np
+
+from SetAnubis.core.Selection.domain.ReweightTransformer import DataBundle, RandomProvider, ReweightDecayPositions, _copy_on_write
+
+KEYS = ["finalStates", "LLPs", "LLPchildren", "finalStates_NoLLP", "finalStates_Neutrinos",
+        "chargedFinalStates", "neutralFinalStates"]
+
+
+def _bundle(synthetic_bundle):
+    b = synthetic_bundle(n_llp=50, seed=4)
+    return DataBundle.from_dict({k: b[k] for k in KEYS})
+
+
+def test_draws_come_from_injected_rng(synthetic_bundle):
+    bundle = _bundle(synthetic_bundle)
+    np.random.seed(0)
+    state = np.random.get_state()[1].copy()
+    a = ReweightDecayPositions(1e-10, 9900012, rng=RandomProvider(seed=5)).apply(bundle)
+    b = ReweightDecayPositions(1e-10, 9900012, rng=RandomProvider(seed=5)).apply(bundle)
+
+    assert (np.random.get_state()[1] == state).all()
+    assert np.array_equal(a.LLPs["decayVertexDist_weighted"], b.LLPs["decayVertexDist_weighted"])
+    assert (a.LLPs["decayVertexDist_weighted"] > 0).all()
+
+
+def test_children_follow_their_llp(synthetic_bundle):
+    out = ReweightDecayPositions(1e-10, 9900012, rng=RandomProvider(seed=1)).apply(_bundle(synthetic_bundle))
+    llps, children = out.LLPs, out.LLPchildren
+
+    new_pos = np.array(llps["decayVertex_weighted"].tolist())
+    assert np.allclose(np.linalg.norm(new_pos, axis=1), llps["decayVertexDist_weighted"])
+
+    shift = np.array(llps.loc[children["LLPindex"], "decayVertex_translation"].tolist())
+    moved = np.array(children["prodVertex_posWeighted"].tolist()) - np.array(children["prodVertex"].tolist())
+    assert np.allclose(moved, shift)
+    # children are final states: no decay vertex
+    assert set(children["decayVertex_weighted"]) == {(-1.0, -1.0, -1.0, -1.0)}
+
+
+def test_chunked_streams_do_not_depend_on_workers(synthetic_bundle):
+    bundle = _bundle(synthetic_bundle)
+
+    def run(n_workers, seed="run-7"):
+        rw = ReweightDecayPositions(1e-10, 9900012, rng=RandomProvider(seed=seed), chunk_size=16, n_workers=n_workers)
+        return rw.apply(bundle).LLPs
+
+    serial, parallel = run(1), run(3)
+    for name in ("weighted", "posWeighted", "restWeighted"):
+        col = f"decayVertexDist_{name}"
+        assert np.array_equal(serial[col], parallel[col])
+    assert not np.array_equal(serial["decayVertexDist_weighted"], run(1, seed=8)["decayVertexDist_weighted"])
+
+
+def test_bundle_shares_data_until_written(synthetic_bundle):
+    tables = {k: synthetic_bundle(n_llp=50, seed=4)[k] for k in KEYS}
+    bundle = DataBundle.from_dict(tables)
+    out = bundle.to_dict()
+    original = tables["LLPs"]["px"].to_numpy()
+    if _copy_on_write():
+        assert np.shares_memory(out["LLPs"]["px"].to_numpy(), original)
+
+    out["LLPs"].loc[out["LLPs"].index[0], "px"] = 1e9
+    tables["LLPs"].loc[tables["LLPs"].index[1], "px"] = -1e9
+    assert bundle.LLPs["px"].iloc[0] != 1e9 and bundle.LLPs["px"].iloc[1] != -1e9
+    assert out["LLPs"]["px"].iloc[1] != -1e9
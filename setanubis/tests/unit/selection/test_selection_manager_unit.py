@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from SetAnubis.core.Selection.domain import DatasetSource as dataset_source
+from SetAnubis.core.Selection.domain.DatasetSource import EventsBundleSource
+from SetAnubis.core.Selection.domain.SelectionManager import SelectionManager
+
+
+class _CountingPipeline:
+    """Picklable stand-in for SelectionPipeline: cut-flow = number of LLPs, fails on a 'bad' bundle."""
+
+    def run(self, source, sel_cfg, run_cfg):
+        bundle = source.materialize()
+        if "bad" in bundle:
+            raise RuntimeError("broken sample")
+        return {"cutFlow": {"nLLP_original": len(bundle["LLPs"])}, "finalDF": bundle["LLPs"], "pid": os.getpid()}
+
+
+def _sources(n):
+    return [(f"s{i}", EventsBundleSource.from_bundle_dict({"LLPs": pd.DataFrame({"x": range(i + 1)})})) for i in range(n)]
+
+
+@pytest.mark.parametrize("workers", [None, 3])
+def test_run_many_keeps_order_and_sums(workers):
+    mgr = SelectionManager(_CountingPipeline(), max_workers=workers, mp_context="fork")
+    combined = mgr.run_many(_sources(6), sel_cfg=None, run_cfg=None)
+
+    assert [s.name for s in combined.per_sample] == [f"s{i}" for i in range(6)]
+    assert [s.cutFlow["nLLP_original"] for s in combined.per_sample] == [1, 2, 3, 4, 5, 6]
+    assert combined.cutflow_sum["nLLP_original"] == 21
+
+
+def test_run_many_isolates_failures_in_pool():
+    sources = _sources(3)
+    sources.insert(1, ("broken", EventsBundleSource.from_bundle_dict({"bad": pd.DataFrame()})))
+    mgr = SelectionManager(_CountingPipeline(), mp_context="fork")
+
+    combined = mgr.run_many(sources, None, None, max_workers=2, isolate_failures=True)
+    assert [s.name for s in combined.per_sample] == ["s0", "broken", "s1", "s2"]
+    assert "broken sample" in combined.per_sample[1].error
+    assert combined.cutflow_sum["nLLP_original"] == 6
+
+    with pytest.raises(RuntimeError):
+        mgr.run_many(sources, None, None, max_workers=2)
+
+
+class _SlowAnalyzer:
+    def __init__(self, df, pt_min_cfg=None):
+        self.df = df
+
+    def create_sample_dataframes(self, llpid):
+        with open(self.df.attrs["log"], "a") as f:
+            f.write("built\n")
+        time.sleep(0.3)
+        return {"LLPs": self.df}
+
+
+def _materialize(source):
+    return len(source.materialize()["LLPs"])
+
+
+def test_bundle_cache_is_built_once_by_concurrent_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_source, "LLPAnalyzer", _SlowAnalyzer)
+    df = pd.DataFrame({"x": range(10)})
+    df.attrs["log"] = str(tmp_path / "builds.log")
+    source = EventsBundleSource.from_events_dataframe(df, cache_dir=str(tmp_path / "cache"), df_cache_key="k")
+
+    with multiprocessing.get_context("fork").Pool(3) as pool:
+        assert pool.map(_materialize, [source] * 3) == [10, 10, 10]
+    assert open(df.attrs["log"]).read().count("built") == 1
@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from SetAnubis.core.Selection.domain.DatasetSource import EventsBundleSource
+from SetAnubis.core.Selection.domain.HepMCFrameBuilder import HepmcFrameBuilder
+from SetAnubis.core.Selection.domain.SelectionEngine import SelectionConfig, RunConfig, MinThresholds
+from SetAnubis.core.Selection.domain.SelectionPipeline import SelectionPipelineBuilder
+
+
+@pytest.fixture
+def events_df(synthetic_hepmc, stub_neo):
+    df, _ = HepmcFrameBuilder(stub_neo).build_from_events(synthetic_hepmc(120, seed=11))
+    return df
+
+
+def test_iter_frames_continues_numbering(synthetic_hepmc, stub_neo, events_df):
+    chunks = list(HepmcFrameBuilder(stub_neo).iter_frames(synthetic_hepmc(120, seed=11), chunk_events=50))
+    assert [c["eventNumber"].nunique() for c in chunks] == [50, 50, 20]
+    pd.testing.assert_frame_equal(pd.concat(chunks), events_df)
+
+
+def test_iter_bundles_concatenate_to_full_bundle(events_df, tmp_path):
+    full = EventsBundleSource.from_events_dataframe(events_df).materialize()
+    source = EventsBundleSource.from_events_dataframe(events_df, cache_dir=str(tmp_path))
+
+    for replay in (False, True):  # second pass reads the spilled chunks back
+        parts = list(source.iter_bundles(chunk_events=32))
+        assert len(parts) == 4
+        for key, table in full.items():
+            pd.testing.assert_frame_equal(pd.concat([p[key] for p in parts]), table, check_dtype=False)
+    assert len(list(tmp_path.glob("*_c32_chunk*_bundle.cols"))) == 4
+
+
+def test_chunk_spill_holds_the_cache_lock(events_df, tmp_path):
+    fcntl = pytest.importorskip("fcntl")
+    source = EventsBundleSource.from_events_dataframe(events_df, cache_dir=str(tmp_path))
+    stream = source.iter_bundles(chunk_events=32)
+    next(stream)
+
+    lock = next(tmp_path.glob("*_c32_chunks.txt.lock"))
+    with open(lock, "a+") as fh:
+        with pytest.raises(BlockingIOError):
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        assert len(list(stream)) == 3
+        fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def test_run_streaming_matches_run(ceiling_geo, events_df):
+    pipeline = SelectionPipelineBuilder().set_options(add_jets=False).build()
+    sel = SelectionConfig(geometry=ceiling_geo, minMET=0.0,
+                          minP=MinThresholds(LLP=0.1, chargedTrack=0.1, neutralTrack=0.1, jet=0.1))
+    source = EventsBundleSource.from_events_dataframe(events_df)
+
+    single = pipeline.run(source, sel, RunConfig())
+    streamed = pipeline.run_streaming(source, sel, RunConfig(), chunk_events=25)
+
+    assert len(streamed["shardCutFlows"]) == 5
+    assert single["cutFlow"]["nLLP_original"] == 120
+    assert streamed["cutFlow"] == pytest.approx(single["cutFlow"])
+    assert sorted(streamed["finalDF"].index) == sorted(single["finalDF"].index)